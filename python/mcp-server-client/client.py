@@ -1,15 +1,99 @@
 import asyncio
+import argparse
+import json
+import os
+import sys
+import time
 from typing import Optional
-from contextlib import AsyncExitStack
-from mcp import ClientSession, StdioServerParameters
+from contextlib import AsyncExitStack, redirect_stdout
+import anyio
+from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
 
-async def connect_to_server(server_script_path: str, exit_stack: AsyncExitStack):
+# Seconds a fetched tool list is reused when the server sends no list_changed notification
+TOOL_CACHE_TTL = float(os.environ.get("MCP_TOOL_CACHE_TTL", "300"))
+
+# Pooled servers: seconds between health-check pings of idle instances, and how long
+# a ping (or waiting for any instance to come back) may take
+HEALTH_CHECK_INTERVAL = float(os.environ.get("MCP_HEALTH_CHECK_INTERVAL", "5"))
+HEALTH_CHECK_TIMEOUT = float(os.environ.get("MCP_HEALTH_CHECK_TIMEOUT", "5"))
+
+
+class ToolCatalog:
     """
-    Args:
-        server_script_path, file name of the server script (.py).
-        Enter the full path if file is not in the same directory.
+    Client-side cache of the server's tools, indexed by name.
+
+    The list is fetched once and reused until the server sends a
+    tools/list_changed notification or ``ttl`` seconds have passed.
+    Pass ``handle_message`` to the ClientSession as its message_handler.
     """
+
+    def __init__(self, ttl: float = TOOL_CACHE_TTL):
+        self.session: Optional[ClientSession] = None
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._tools: list[types.Tool] = []
+        self._by_name: dict[str, types.Tool] = {}
+        self._fetched_at: Optional[float] = None
+        self._generation = 0  # bumped on every invalidation
+        self._lock = asyncio.Lock()
+
+    async def handle_message(self, message):
+        # mcp 1.x wraps notifications in a ServerNotification root model
+        notification = getattr(message, "root", message)
+        if isinstance(notification, types.ToolListChangedNotification):
+            self.invalidate()
+
+    def invalidate(self):
+        self._generation += 1
+        self._fetched_at = None
+
+    def _fresh(self) -> bool:
+        return self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    async def list(self) -> list[types.Tool]:
+        if self._fresh():
+            self.hits += 1
+            return self._tools
+        async with self._lock:
+            # Another caller may have refreshed while we waited
+            if self._fresh():
+                self.hits += 1
+                return self._tools
+            self.misses += 1
+            generation = self._generation
+            tools: list[types.Tool] = []
+            cursor = None
+            while True:
+                response = await self.session.list_tools(cursor)
+                tools.extend(response.tools)
+                cursor = response.nextCursor
+                if not cursor:
+                    break
+            self._tools = tools
+            self._by_name = {tool.name: tool for tool in tools}
+            # A change notification during the fetch means this list may already be stale
+            self._fetched_at = time.monotonic() if generation == self._generation else None
+            return tools
+
+    async def get(self, name: str) -> Optional[types.Tool]:
+        await self.list()
+        return self._by_name.get(name)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "tools": len(self._tools),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+async def open_session(server_script_path: str, exit_stack: AsyncExitStack, message_handler=None) -> ClientSession:
+    """Start the server script over stdio and return its initialized session."""
     is_python = server_script_path.endswith('.py')
     if not is_python:
         raise ValueError("Server script must be a .py file")
@@ -23,30 +107,199 @@ async def connect_to_server(server_script_path: str, exit_stack: AsyncExitStack)
     # Start the server using stdio transport
     stdio_transport = await exit_stack.enter_async_context(stdio_client(server_params))
     stdio, write = stdio_transport
-    session = await exit_stack.enter_async_context(ClientSession(stdio, write))
+    session = await exit_stack.enter_async_context(ClientSession(stdio, write, message_handler=message_handler))
     await session.initialize()
+    return session
+
+
+async def connect_to_server(server_script_path: str, exit_stack: AsyncExitStack, catalog: Optional[ToolCatalog] = None):
+    """
+    Args:
+        server_script_path, file name of the server script (.py).
+        Enter the full path if file is not in the same directory.
+        catalog, optional ToolCatalog that caches the server's tool list.
+    """
+    message_handler = catalog.handle_message if catalog else None
+    session = await open_session(server_script_path, exit_stack, message_handler)
 
     # List available tools
-    response = await session.list_tools()
-    tools = response.tools
+    if catalog:
+        catalog.session = session
+        tools = await catalog.list()
+    else:
+        response = await session.list_tools()
+        tools = response.tools
     print("\nConnected to server with tools:", [tool.name for tool in tools])
     return session
 
-async def chat_loop(session):
+
+class ServerInstance:
+    """
+    One server subprocess and its session, kept running by its own task.
+
+    The stdio transport has to be entered and exited by the same task, so
+    that task opens the session, waits until a restart (or close) is
+    requested and then tears it down and starts over, backing off if the
+    server keeps failing to start.
+    """
+
+    def __init__(self, index: int, server_script_path: str, message_handler=None):
+        self.index = index
+        self.server_script_path = server_script_path
+        self.message_handler = message_handler
+        self.session: Optional[ClientSession] = None
+        self.ready = asyncio.Event()
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.restarts = 0
+        self._restart = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        delay = 0.5
+        while not self._closing:
+            try:
+                async with AsyncExitStack() as stack:
+                    self.session = await open_session(self.server_script_path, stack, self.message_handler)
+                    self.ready.set()
+                    delay = 0.5
+                    await self._restart.wait()
+            except Exception as e:
+                print(f"Server {self.index} stopped: {e!r}", file=sys.stderr)
+            self.ready.clear()
+            self.session = None
+            self._restart.clear()
+            if self._closing:
+                break
+            self.restarts += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10.0)
+
+    def restart(self):
+        self.ready.clear()
+        self._restart.set()
+
+    async def close(self):
+        self._closing = True
+        self._restart.set()
+        if self._task:
+            await self._task
+
+
+class ServerPool:
+    """
+    N copies of one server script, each with its own initialized session.
+
+    Every ``call_tool`` goes to the ready instance with the fewest calls in
+    flight, so CPU-bound tools spread across processes (and cores) without
+    changing the server. An instance whose connection closes (a crash) or
+    that stops answering pings while idle is restarted; calls that were
+    running on it fail and are not retried. The pool offers ``list_tools``,
+    ``call_tool`` and ``send_ping`` like a ClientSession, so ToolCatalog,
+    chat_loop and run_batch work with either.
+    """
+
+    def __init__(self, server_script_path: str, size: int, message_handler=None):
+        self.servers = [ServerInstance(i, server_script_path, message_handler) for i in range(max(1, size))]
+        self._rotation = 0
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def start(self, timeout: float = 30.0):
+        for server in self.servers:
+            server.start()
+        await asyncio.wait_for(asyncio.gather(*(server.ready.wait() for server in self.servers)), timeout)
+        self._health_task = asyncio.create_task(self._health_check())
+
+    async def _pick(self) -> ServerInstance:
+        ready = [server for server in self.servers if server.ready.is_set()]
+        if not ready:
+            waiters = [asyncio.ensure_future(server.ready.wait()) for server in self.servers]
+            await asyncio.wait(waiters, timeout=HEALTH_CHECK_TIMEOUT, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+            ready = [server for server in self.servers if server.ready.is_set()]
+            if not ready:
+                raise RuntimeError("No MCP server instance is available")
+        # Least loaded first; ties rotate so idle instances share the work
+        self._rotation = (self._rotation + 1) % len(self.servers)
+        return min(ready, key=lambda server: (server.in_flight, (server.index - self._rotation) % len(self.servers)))
+
+    async def _run_on(self, server: ServerInstance, request):
+        server.in_flight += 1
+        try:
+            return await request(server.session)
+        except (McpError, anyio.ClosedResourceError, anyio.BrokenResourceError) as e:
+            if not isinstance(e, McpError) or e.error.code == types.CONNECTION_CLOSED:
+                server.failures += 1
+                server.restart()
+            raise
+        finally:
+            server.in_flight -= 1
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        server = await self._pick()
+        server.calls += 1
+        return await self._run_on(server, lambda session: session.call_tool(name, arguments))
+
+    async def list_tools(self, cursor: Optional[str] = None):
+        return await self._run_on(await self._pick(), lambda session: session.list_tools(cursor))
+
+    async def send_ping(self):
+        return await self._run_on(await self._pick(), lambda session: session.send_ping())
+
+    async def _health_check(self):
+        async def check(server: ServerInstance):
+            # Busy instances prove themselves by completing calls; a blocking tool would delay the ping
+            if not server.ready.is_set() or server.in_flight:
+                return
+            try:
+                await asyncio.wait_for(server.session.send_ping(), HEALTH_CHECK_TIMEOUT)
+            except Exception:
+                server.failures += 1
+                server.restart()
+
+        while True:
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+            await asyncio.gather(*(check(server) for server in self.servers))
+
+    def stats(self) -> list:
+        return [
+            {"server": s.index, "ready": s.ready.is_set(), "in_flight": s.in_flight, "calls": s.calls,
+             "failures": s.failures, "restarts": s.restarts}
+            for s in self.servers
+        ]
+
+    async def aclose(self):
+        if self._health_task:
+            self._health_task.cancel()
+        await asyncio.gather(*(server.close() for server in self.servers), return_exceptions=True)
+
+
+async def chat_loop(session, catalog: Optional[ToolCatalog] = None):
+    if catalog is None:
+        catalog = ToolCatalog()
+        catalog.session = session
     while True:
-        # List tools available on the server
-        response = await session.list_tools()
-        tools = response.tools
+        # List tools available on the server (from the catalog unless it changed)
+        tools = await catalog.list()
         print("\nAvailable tools:")
         for idx, tool in enumerate(tools, 1):
             print(f"{idx}. {tool.name}: {tool.description}")
-        print("Type the tool number to use it, or type 'quit' to exit.")
+        print("Type the tool number to use it, 'stats' for tool cache stats, or 'quit' to exit.")
         
         # Get user input for tool selection
         user_input = input("Select tool or quit: ").strip()
         if user_input.lower() == "quit":
             print("Exiting chat.")
             break
+        if user_input.lower() == "stats":
+            print(f"Tool catalog: {catalog.stats()}")
+            continue
         try:
             tool_idx = int(user_input) - 1
             tool = tools[tool_idx]
@@ -68,16 +321,136 @@ async def chat_loop(session):
         text = result.content[0].text if result.content else "No content returned."
         print(f"\n{text}\n")
 
+def _batch_record(call_id, line_number: int, name) -> dict:
+    """A batch result line; every line has all of these keys, unused ones null."""
+    return {"id": call_id, "line": line_number, "tool": name, "ok": False, "result": None, "error": None, "latency_ms": None}
+
+
+async def _call_one(session, catalog: ToolCatalog, call_id, line_number: int, name, arguments) -> dict:
+    """Run one batch call and describe its outcome as a JSON-ready dict."""
+    record = _batch_record(call_id, line_number, name)
+    started = time.perf_counter()
+    try:
+        if await catalog.get(name) is None:
+            raise ValueError(f"Unknown tool: {name}")
+        result = await session.call_tool(name, arguments)
+        record["ok"] = not result.isError
+        record["result"] = [item.text if item.type == "text" else item.model_dump(mode="json") for item in result.content]
+    except Exception as e:
+        record["error"] = str(e)
+    record["latency_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+    return record
+
+
+async def run_batch(session, catalog: ToolCatalog, source, window: int = 8, out=sys.stdout) -> dict:
+    """
+    Issue the tool calls in ``source`` concurrently over one session.
+
+    ``source`` is a text stream of JSON lines such as
+    ``{"id": 1, "tool": "add", "arguments": {"a": 1, "b": 2}}``; ``id`` defaults
+    to the line number. At most ``window`` calls are in flight; reading stops
+    while the window is full. One JSON result line per call is written to
+    ``out`` as calls complete, and a summary is returned.
+
+    Every result line has the keys id, line, tool, ok, result, error and
+    latency_ms. A line that is not a valid call gets ``"id": null`` and an
+    error, with its line number in ``line``.
+    """
+    window_slots = asyncio.Semaphore(max(1, window))
+    pending = set()
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+
+    def finished(task):
+        nonlocal errors
+        window_slots.release()
+        record = task.result()
+        latencies.append(record["latency_ms"])
+        errors += not record["ok"]
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    line_number = 0
+    while True:
+        # Read in a thread so a slow producer on stdin doesn't stall completions
+        line = await asyncio.to_thread(source.readline)
+        if not line:
+            break
+        line_number += 1
+        if not line.strip():
+            continue
+        await window_slots.acquire()
+        try:
+            call = json.loads(line)
+            call_id = call.get("id", line_number)
+            name = call["tool"]
+            arguments = call.get("arguments") or {}
+        except (ValueError, KeyError, AttributeError) as e:
+            window_slots.release()
+            errors += 1
+            record = _batch_record(None, line_number, None)
+            record["error"] = f"Bad call line: {e}"
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            continue
+        task = asyncio.ensure_future(_call_one(session, catalog, call_id, line_number, name, arguments))
+        task.add_done_callback(finished)
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.wait(pending)
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] if latencies else None
+
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {"p50": pct(50), "p95": pct(95), "max": latencies[-1] if latencies else None},
+        "window": window,
+    }
+
+
 async def main():
-    import sys
-    if len(sys.argv) < 2:
-        print("Usage: python client.py <path_to_server_script>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Interactive or batch client for an MCP server over stdio.")
+    parser.add_argument("server_script", help="Path to the server script (.py)")
+    parser.add_argument("--batch", metavar="FILE", help="Run the JSONL tool calls in FILE ('-' for stdin) instead of chatting")
+    parser.add_argument("--window", type=int, default=8, help="Maximum batch calls in flight (default 8)")
+    parser.add_argument("--servers", type=int, default=1,
+                        help="Run this many copies of the server and send each call to the least busy one (default 1)")
+    args = parser.parse_args()
+
     exit_stack = AsyncExitStack()
+    catalog = ToolCatalog()
+    pool = None
     try:
-        session = await connect_to_server(sys.argv[1], exit_stack)
-        await chat_loop(session)
+        # In batch mode stdout carries only result lines
+        with redirect_stdout(sys.stderr if args.batch else sys.stdout):
+            if args.servers > 1:
+                pool = ServerPool(args.server_script, args.servers, catalog.handle_message)
+                exit_stack.push_async_callback(pool.aclose)
+                await pool.start()
+                session = catalog.session = pool
+                tools = await catalog.list()
+                print(f"\nConnected to {args.servers} servers with tools:", [tool.name for tool in tools])
+            else:
+                session = await connect_to_server(args.server_script, exit_stack, catalog)
+        if args.batch:
+            source = sys.stdin if args.batch == "-" else exit_stack.enter_context(open(args.batch, encoding="utf-8"))
+            summary = await run_batch(session, catalog, source, args.window)
+            print(json.dumps(summary), file=sys.stderr)
+        else:
+            await chat_loop(session, catalog)
     finally:
+        print(f"Tool catalog: {catalog.stats()}", file=sys.stderr if args.batch else sys.stdout)
+        if pool:
+            print(f"Server pool: {pool.stats()}", file=sys.stderr if args.batch else sys.stdout)
         await exit_stack.aclose()
 
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+# offload.py
+"""
+Run slow FastMCP tools off the server's event loop.
+
+FastMCP calls a synchronous tool inline, so while it runs the server cannot
+read the next request from stdio: ``list_tools`` and quick tools wait behind
+it. Decorate the tool (under ``@mcp.tool()``) to run it in a shared thread or
+process pool instead::
+
+    @mcp.tool()
+    @offload("process", max_concurrency=2, timeout=30)
+    def count_primes(limit: int) -> int:
+        ...
+
+Use "thread" for work that blocks without holding the GIL (I/O, sleeps,
+native code that releases it) and "process" for pure Python number
+crunching. Process-pool tools must be module-level functions whose arguments
+and result can be pickled, and the server script must only call
+``mcp.run()`` under ``if __name__ == "__main__":`` so worker processes can
+import it. Call ``install()`` there too, before ``mcp.run()``::
+
+    if __name__ == "__main__":
+        install()
+        mcp.run()
+
+``max_concurrency`` caps how many calls of that tool run at once; extra calls
+queue. ``timeout`` (seconds, covering the queue wait) makes the call fail
+with TimeoutError. A pool cannot stop a call that is already running, so a
+timed-out call keeps its slot until it really finishes. That way runaway
+calls cannot pile up past the limit.
+
+All offloaded tools share one pool of each kind, MCP_TOOL_THREADS (default
+4) and MCP_TOOL_PROCESSES (default 2) workers, started on first use.
+``install()`` shuts them down when the server exits, including on SIGTERM;
+importing this module registers no exit or signal handlers.
+"""
+import asyncio
+import atexit
+import functools
+import importlib.util
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+# Pool sizes. Kept small: a client may run several copies of the server (the
+# client's --servers pool), and every copy gets its own pools.
+THREAD_WORKERS = int(os.environ.get("MCP_TOOL_THREADS", "4"))
+PROCESS_WORKERS = int(os.environ.get("MCP_TOOL_PROCESSES", "2"))
+
+# Undecorated process-pool tools by "defining file:qualname". Workers find
+# them here after loading that file, because the module attribute itself is
+# the async wrapper, which cannot be pickled. The file, unlike the module
+# name, is the same in the server and its workers whether the server runs as
+# a script (__main__, re-run as __mp_main__) or is loaded by `mcp dev`.
+_PROCESS_TOOLS: dict[str, Callable] = {}
+
+_executors: dict[str, Executor] = {}
+
+
+def _executor(kind: str) -> Executor:
+    if kind not in _executors:
+        if kind == "process":
+            # Not fork: the stdio transport reads stdin on a thread, and a forked
+            # worker would deadlock closing the stdin it inherited mid-read
+            context = multiprocessing.get_context("spawn")
+            _executors[kind] = ProcessPoolExecutor(
+                max_workers=PROCESS_WORKERS, mp_context=context, initializer=_init_process_worker
+            )
+        else:
+            _executors[kind] = ThreadPoolExecutor(max_workers=THREAD_WORKERS, thread_name_prefix="mcp-tool")
+    return _executors[kind]
+
+
+def shutdown():
+    """Stop the pools, waiting for calls already running; pending ones are cancelled."""
+    while _executors:
+        _, executor = _executors.popitem()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+_installed = False
+
+
+def install():
+    """Shut the pools down at exit and turn SIGTERM into a normal exit. Call from ``__main__``."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    atexit.register(shutdown)
+    _exit_on_sigterm()
+
+
+def _exit_on_sigterm():
+    # Some clients stop the server with SIGTERM rather than closing stdin. The
+    # default action skips atexit, leaving the workers' queues and semaphores
+    # behind, so turn it into a normal exit. A handler set by the app is kept.
+    if threading.current_thread() is threading.main_thread() and signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+
+def _init_process_worker():
+    # Workers inherit the server's stdin/stdout, which carry the protocol. Move
+    # them off those pipes so a stray print cannot corrupt a message and the
+    # client sees EOF as soon as the server itself exits
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+    # The client stops the server with SIGTERM, which skips the pool shutdown;
+    # don't outlive it
+    parent = os.getppid()
+
+    def watch_parent():
+        while os.getppid() == parent:
+            time.sleep(1)
+        os._exit(0)
+
+    threading.Thread(target=watch_parent, daemon=True).start()
+
+
+def _tool_key(fn: Callable) -> str:
+    return f"{os.path.realpath(fn.__code__.co_filename)}:{fn.__qualname__}"
+
+
+def _run_process_tool(key: str, args: tuple, kwargs: dict):
+    if key not in _PROCESS_TOOLS:
+        # Not the worker's __main__: load the defining file, which registers its tools
+        # (the file's own __main__ guard keeps the server from starting here)
+        path = key.rsplit(":", 1)[0]
+        name = "_offload_" + os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return _PROCESS_TOOLS[key](*args, **kwargs)
+
+
+def offload(kind: str = "thread", max_concurrency: Optional[int] = None, timeout: Optional[float] = None):
+    """
+    Args:
+        kind, "thread" or "process".
+        max_concurrency, most calls of this tool running at once (None for no limit beyond the pool).
+        timeout, seconds before the caller gets a TimeoutError (None to wait forever).
+    """
+    if kind not in ("thread", "process"):
+        raise ValueError(f"kind must be 'thread' or 'process', not {kind!r}")
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    def decorate(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            raise TypeError(f"{fn.__name__} is already async; offload is for blocking functions")
+        key = _tool_key(fn)
+        if kind == "process":
+            _PROCESS_TOOLS[key] = fn
+        # Created on first call so it belongs to the server's running loop
+        slots: Optional[asyncio.Semaphore] = None
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            nonlocal slots
+            if slots is None and max_concurrency is not None:
+                slots = asyncio.Semaphore(max_concurrency)
+            loop = asyncio.get_running_loop()
+
+            async def run():
+                if slots is not None:
+                    await slots.acquire()
+                try:
+                    if kind == "process":
+                        future = loop.run_in_executor(_executor(kind), _run_process_tool, key, args, kwargs)
+                    else:
+                        future = loop.run_in_executor(_executor(kind), functools.partial(fn, *args, **kwargs))
+                except BaseException:
+                    if slots is not None:
+                        slots.release()
+                    raise
+                if slots is not None:
+                    # Free the slot when the work ends, not when the caller gives up
+                    future.add_done_callback(lambda _: slots.release())
+                # Shield so a timeout does not cancel the bookkeeping above
+                return await asyncio.shield(future)
+
+            try:
+                return await asyncio.wait_for(run(), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"{fn.__name__} did not finish within {timeout}s") from None
+
+        return wrapper
+
+    return decorate
@@ -1,5 +1,9 @@
 # server.py
+import hashlib
+import json
 from mcp.server.fastmcp import FastMCP
+from offload import install as install_offload, offload
+from tool_cache import cache_stats, cached
 
 # Create an MCP server
 mcp = FastMCP("Demo")
@@ -7,6 +11,7 @@ mcp = FastMCP("Demo")
 
 # Add an addition tool
 @mcp.tool()
+@cached(maxsize=1024)
 def add(a: int, b: int) -> int:
     """Add two numbers (a, b) and return the result"""
     total = a + b
@@ -15,8 +20,43 @@ def add(a: int, b: int) -> int:
 
 # Add a greeting tool
 @mcp.tool()
+@cached(maxsize=1024)
 def get_greeting(name: str) -> str:
     """Enter your name and get a personalized greeting"""
     return f"Hello, {name}, you look amazing today!"
 
-mcp.run()
+
+# Add a CPU-bound tool; it runs in a worker process so the server keeps answering meanwhile
+@mcp.tool()
+@offload("process", max_concurrency=2, timeout=30)
+def count_primes(limit: int) -> int:
+    """Count the prime numbers below limit (at most 10,000,000)"""
+    if not 0 <= limit <= 10_000_000:
+        raise ValueError("limit must be between 0 and 10,000,000")
+    sieve = bytearray([1]) * max(limit, 2)
+    sieve[0] = sieve[1] = 0
+    for n in range(2, int(limit ** 0.5) + 1):
+        if sieve[n]:
+            sieve[n * n::n] = bytes(len(range(n * n, limit, n)))
+    return sum(sieve[:limit])
+
+
+# Add a key derivation tool; hashlib releases the GIL, so a worker thread is enough
+@mcp.tool()
+@offload("thread", max_concurrency=4, timeout=30)
+def derive_key(password: str, salt: str, iterations: int = 200_000) -> str:
+    """Derive a hex PBKDF2-HMAC-SHA256 key from a password and salt"""
+    if not 1 <= iterations <= 2_000_000:
+        raise ValueError("iterations must be between 1 and 2,000,000")
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations).hex()
+
+
+# Add a diagnostic tool reporting how often the cached tools were answered from memory
+@mcp.tool()
+def get_cache_stats() -> str:
+    """Report hit rates and sizes of the tool result caches"""
+    return json.dumps(cache_stats())
+
+if __name__ == "__main__":
+    install_offload()
+    mcp.run()
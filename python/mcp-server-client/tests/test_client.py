@@ -0,0 +1,144 @@
+import asyncio
+import io
+import json
+from types import SimpleNamespace
+
+import anyio
+from mcp import types
+
+from client import ServerPool, ToolCatalog, run_batch
+
+
+class FakeSession:
+    """Serves a fixed tool list (in pages of ``page`` tools); ``add`` sums its arguments."""
+
+    def __init__(self, names=("add",), page=10):
+        self.tools = [types.Tool(name=name, inputSchema={"type": "object"}) for name in names]
+        self.page = page
+        self.list_calls = 0
+
+    async def list_tools(self, cursor=None):
+        self.list_calls += 1
+        start = int(cursor or 0)
+        end = start + self.page
+        return SimpleNamespace(tools=self.tools[start:end], nextCursor=str(end) if end < len(self.tools) else None)
+
+    async def call_tool(self, name, arguments):
+        return types.CallToolResult(content=[types.TextContent(type="text", text=str(sum(arguments.values())))])
+
+
+def catalog_for(session, ttl=60.0):
+    catalog = ToolCatalog(ttl=ttl)
+    catalog.session = session
+    return catalog
+
+
+async def test_catalog_fetches_every_page_once():
+    session = FakeSession(names=["a", "b", "c", "d", "e"], page=2)
+    catalog = catalog_for(session)
+    a, e, missing = [await catalog.get(name) for name in ("a", "e", "zzz")]
+    assert (a.name, e.name, missing) == ("a", "e", None)
+    assert session.list_calls == 3  # one fetch, three pages
+    assert catalog.stats() == {"tools": 5, "hits": 2, "misses": 1, "hit_rate": 0.667}
+
+
+async def test_catalog_refetches_after_list_changed():
+    session = FakeSession()
+    catalog = catalog_for(session)
+    await catalog.list()
+    session.tools.append(types.Tool(name="multiply", inputSchema={"type": "object"}))
+    assert await catalog.get("multiply") is None
+
+    notification = types.ServerNotification(types.ToolListChangedNotification(method="notifications/tools/list_changed"))
+    await catalog.handle_message(notification)
+    assert (await catalog.get("multiply")).name == "multiply"
+    assert catalog.misses == 2
+
+
+async def test_catalog_expires_after_ttl():
+    session = FakeSession()
+    catalog = catalog_for(session, ttl=0.0)
+    await catalog.list()
+    await catalog.list()
+    assert session.list_calls == 2 and catalog.hits == 0
+
+
+async def test_concurrent_lookups_share_one_fetch():
+    session = FakeSession()
+    catalog = catalog_for(session)
+    await asyncio.gather(*(catalog.get("add") for _ in range(5)))
+    assert session.list_calls == 1
+
+
+class SlowSession(FakeSession):
+    """Holds every call until ``release`` is set; ``broken`` sessions fail like a crashed server."""
+
+    def __init__(self, release, broken=False):
+        super().__init__()
+        self.release = release
+        self.broken = broken
+        self.calls = 0
+
+    async def call_tool(self, name, arguments):
+        self.calls += 1
+        if self.broken:
+            raise anyio.ClosedResourceError()
+        await self.release.wait()
+        return await super().call_tool(name, arguments)
+
+
+def ready_pool(size, broken=()):
+    """A pool whose instances are marked ready with in-process sessions instead of subprocesses."""
+    pool = ServerPool("server.py", size)
+    release = asyncio.Event()
+    for server in pool.servers:
+        server.session = SlowSession(release, broken=server.index in broken)
+        server.ready.set()
+    return pool, release
+
+
+async def test_pool_sends_each_call_to_the_least_loaded_server():
+    pool, release = ready_pool(3)
+    calls = [asyncio.ensure_future(pool.call_tool("add", {"a": 1})) for _ in range(6)]
+    await asyncio.sleep(0)
+    assert [server.in_flight for server in pool.servers] == [2, 2, 2]
+    release.set()
+    await asyncio.gather(*calls)
+    assert [server.calls for server in pool.servers] == [2, 2, 2]
+    assert all(server.in_flight == 0 for server in pool.servers)
+
+
+async def test_pool_restarts_a_server_whose_connection_closed():
+    pool, release = ready_pool(2, broken={0})
+    release.set()
+    results = await asyncio.gather(*(pool.call_tool("add", {"a": 1}) for _ in range(2)), return_exceptions=True)
+    assert sum(isinstance(result, anyio.ClosedResourceError) for result in results) == 1
+    crashed, healthy = pool.servers
+    assert crashed.failures == 1 and not crashed.ready.is_set()
+    assert healthy.failures == 0 and healthy.ready.is_set()
+
+
+async def batch(lines):
+    session = FakeSession()
+    catalog = catalog_for(session)
+    out = io.StringIO()
+    summary = await run_batch(session, catalog, io.StringIO("".join(line + "\n" for line in lines)), out=out)
+    return summary, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+async def test_batch_records_share_one_shape():
+    summary, records = await batch([
+        '{"id": "a", "tool": "add", "arguments": {"a": 1, "b": 2}}',
+        "not json",
+        '{"tool": "missing"}',
+        '{"arguments": {}}',
+    ])
+    assert {tuple(record) for record in records} == {("id", "line", "tool", "ok", "result", "error", "latency_ms")}
+
+    by_line = {record["line"]: record for record in records}
+    assert by_line[1]["id"] == "a" and by_line[1]["ok"] and by_line[1]["result"] == ["3"]
+    assert by_line[1]["error"] is None
+    assert by_line[2]["id"] is None and by_line[2]["tool"] is None and by_line[2]["error"].startswith("Bad call line")
+    assert by_line[3]["id"] == 3 and by_line[3]["tool"] == "missing" and by_line[3]["error"] == "Unknown tool: missing"
+    assert by_line[4]["id"] is None and not by_line[4]["ok"]
+    assert (summary["calls"], summary["errors"]) == (2, 3)
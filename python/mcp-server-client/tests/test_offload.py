@@ -0,0 +1,130 @@
+import asyncio
+import importlib.util
+import os
+import textwrap
+import threading
+import time
+
+import pytest
+
+import offload
+from offload import offload as offload_tool
+
+
+@offload_tool("process", timeout=60)
+def process_square(n: int) -> tuple:
+    return os.getpid(), n * n
+
+
+async def test_thread_tool_leaves_the_event_loop_free():
+    @offload_tool("thread")
+    def blocking(seconds: float) -> str:
+        time.sleep(seconds)
+        return "done"
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.ensure_future(ticker())
+    assert await blocking(0.2) == "done"
+    task.cancel()
+    assert ticks >= 10
+
+
+async def test_max_concurrency_caps_running_calls():
+    running = peak = 0
+    lock = threading.Lock()
+
+    @offload_tool("thread", max_concurrency=2)
+    def tracked() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    await asyncio.gather(*(tracked() for _ in range(6)))
+    assert peak == 2
+
+
+async def test_timeout_fails_the_call_but_keeps_the_slot_until_the_work_ends():
+    release = threading.Event()
+
+    @offload_tool("thread", max_concurrency=1, timeout=0.05)
+    def stuck() -> str:
+        release.wait(5)
+        return "late"
+
+    with pytest.raises(TimeoutError):
+        await stuck()
+    # The first call still holds the only slot, so this one times out waiting for it
+    with pytest.raises(TimeoutError):
+        await stuck()
+    release.set()
+    await asyncio.sleep(0.05)
+    assert await stuck() == "late"
+
+
+async def test_process_tool_runs_in_a_worker_process():
+    pid, value = await process_square(7)
+    assert value == 49
+    assert pid != os.getpid()
+
+
+async def test_process_tool_from_a_file_loaded_under_another_name(tmp_path):
+    # `mcp dev` / `mcp run` load the server file as "server_module", which a worker cannot import
+    server = tmp_path / "demo_server.py"
+    server.write_text(textwrap.dedent("""
+        import os
+        from offload import offload
+
+        @offload("process")
+        def cube(n: int) -> tuple:
+            return os.getpid(), n ** 3
+    """))
+    spec = importlib.util.spec_from_file_location("server_module", server)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    pid, value = await module.cube(3)
+    assert value == 27
+    assert pid != os.getpid()
+
+
+async def test_pools_are_small_and_shut_down():
+    assert offload.PROCESS_WORKERS == int(os.environ.get("MCP_TOOL_PROCESSES", "2"))
+    await process_square(2)
+    assert "process" in offload._executors
+    offload.shutdown()
+    assert offload._executors == {}
+
+
+async def test_importing_and_using_the_pools_installs_no_handlers(monkeypatch):
+    installed = []
+    monkeypatch.setattr(offload.atexit, "register", lambda fn: installed.append(fn))
+    monkeypatch.setattr(offload.signal, "signal", lambda signum, handler: installed.append(signum))
+    monkeypatch.setattr(offload, "_installed", False)
+    await process_square(3)
+    offload.shutdown()
+    assert installed == []
+
+    offload.install()
+    offload.install()
+    assert installed == [offload.shutdown, offload.signal.SIGTERM]
+
+
+def test_rejects_async_functions_and_unknown_kinds():
+    with pytest.raises(ValueError):
+        offload_tool("fiber")
+
+    with pytest.raises(TypeError):
+        @offload_tool("thread")
+        async def already_async():
+            pass
@@ -0,0 +1,14 @@
+import hashlib
+
+import server
+
+
+async def test_count_primes_runs_in_the_process_pool():
+    [content] = await server.mcp.call_tool("count_primes", {"limit": 100})
+    assert content.text == "25"
+    assert await server.count_primes(2) == 0
+
+
+async def test_derive_key_runs_in_the_thread_pool():
+    [content] = await server.mcp.call_tool("derive_key", {"password": "pw", "salt": "s", "iterations": 10})
+    assert content.text == hashlib.pbkdf2_hmac("sha256", b"pw", b"s", 10).hex()
@@ -0,0 +1,97 @@
+import pytest
+from mcp.server.fastmcp import Context
+
+import tool_cache
+from tool_cache import ResultCache, cache_stats, cached
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = ResultCache("t", maxsize=2, ttl=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.put("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1) and cache.get("c") == (True, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(tool_cache.time, "monotonic", lambda: now[0])
+    cache = ResultCache("t", maxsize=4, ttl=10)
+    cache.put("a", 1)
+    now[0] += 10
+    assert cache.get("a") == (True, 1)
+    now[0] += 0.1
+    assert cache.get("a") == (False, None)
+    stats = cache.stats()
+    assert (stats["size"], stats["expirations"], stats["hits"], stats["misses"]) == (0, 1, 1, 1)
+
+
+def test_keys_ignore_keyword_order_defaults_and_context():
+    calls = []
+
+    @cached(maxsize=8)
+    def scale(value: int, factor: int = 2, ctx: Context = None) -> int:
+        calls.append((value, factor))
+        return value * factor
+
+    assert scale(3) == 6
+    assert scale(factor=2, value=3, ctx=Context()) == 6
+    assert scale(3, 3) == 9
+    assert calls == [(3, 2), (3, 3)]
+    assert scale.cache.stats()["hits"] == 1
+
+
+async def test_async_functions_are_cached_and_errors_are_not():
+    calls = []
+
+    @cached()
+    async def lookup(key: str) -> str:
+        calls.append(key)
+        if key == "bad":
+            raise ValueError(key)
+        return key.upper()
+
+    assert await lookup("x") == "X"
+    assert await lookup("x") == "X"
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await lookup("bad")
+    assert calls == ["x", "bad", "bad"]
+
+
+def test_cache_stats_reports_each_tool():
+    @cached(maxsize=3, ttl=5)
+    def stats_probe(a: int) -> int:
+        return a
+
+    @cached(maxsize=3)
+    def other_probe(a: int) -> int:
+        return a
+
+    class Other:
+        @staticmethod
+        @cached(maxsize=3)
+        def stats_probe(a: int) -> int:
+            return a
+
+    stats_probe(1)
+    stats_probe(1)
+    other_probe(1)
+    Other.stats_probe(1)
+    stats = cache_stats()
+    prefix = f"{__name__}.test_cache_stats_reports_each_tool.<locals>."
+    assert stats[prefix + "stats_probe"] == {
+        "size": 1, "maxsize": 3, "ttl": 5, "hits": 1, "misses": 1,
+        "hit_rate": 0.5, "evictions": 0, "expirations": 0,
+    }
+    # A tool with the same name elsewhere keeps its own entry
+    assert stats[prefix + "Other.stats_probe"]["misses"] == 1
+    assert stats[prefix + "other_probe"]["misses"] == 1
+
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError):
+        cached(maxsize=0)
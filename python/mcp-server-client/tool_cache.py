@@ -0,0 +1,159 @@
+# tool_cache.py
+"""
+Opt-in result cache for deterministic FastMCP tools.
+
+Agents often repeat the exact same tool call. Decorate a tool whose result
+depends only on its arguments (under ``@mcp.tool()``) and repeats are
+answered from memory instead of re-running the body::
+
+    @mcp.tool()
+    @cached(maxsize=256, ttl=600)
+    def add(a: int, b: int) -> str:
+        ...
+
+Calls are keyed on their normalized arguments: defaults filled in and
+keyword order ignored, so ``add(1, 2)`` and ``add(b=2, a=1)`` share an
+entry. Each tool keeps at most ``maxsize`` results, evicting the least
+recently used. With ``ttl`` (seconds) set, older results are recomputed.
+Exceptions are not cached. Cached results are returned as-is, so tools
+should not hand out objects that callers mutate.
+
+The decorator works on sync and async functions, so it can sit above
+``@offload`` to skip the pool entirely on a hit. ``cache_stats()`` reports
+hits, misses and evictions per tool for a diagnostic tool to return.
+"""
+import asyncio
+import functools
+import inspect
+import json
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from mcp.server.fastmcp import Context
+
+# Every cached tool's cache, by "module.qualname" so tools with the same name don't collide
+_CACHES: dict[str, "ResultCache"] = {}
+
+
+class ResultCache:
+    """Bounded LRU map of argument keys to results, with optional expiry."""
+
+    def __init__(self, name: str, maxsize: int, ttl: Optional[float]):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        """Return (True, result) for a live entry, else (False, None)."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, result
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return False, None
+
+    def put(self, key: str, result):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def _normalize(value):
+    """JSON fallback for argument values: pydantic models by field, sets sorted."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def cached(maxsize: int = 128, ttl: Optional[float] = None):
+    """
+    Args:
+        maxsize, most results kept for this tool.
+        ttl, seconds a result stays valid (None to keep it until evicted).
+    """
+    if maxsize < 1:
+        raise ValueError("maxsize must be at least 1")
+
+    def decorate(fn: Callable) -> Callable:
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        cache = ResultCache(name, maxsize, ttl)
+        _CACHES[name] = cache
+        signature = inspect.signature(fn)
+        # The request context differs on every call and never affects a pure result. Drop the
+        # parameter itself, not just Context values, so calls without one share the entry
+        context_params = {
+            name for name, param in signature.parameters.items()
+            if isinstance(param.annotation, type) and issubclass(param.annotation, Context)
+        }
+
+        def key_for(args, kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {
+                name: value for name, value in bound.arguments.items()
+                if name not in context_params and not isinstance(value, Context)
+            }
+            return json.dumps(arguments, sort_keys=True, default=_normalize)
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                key = key_for(args, kwargs)
+                found, result = cache.get(key)
+                if found:
+                    return result
+                result = await fn(*args, **kwargs)
+                cache.put(key, result)
+                return result
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                key = key_for(args, kwargs)
+                found, result = cache.get(key)
+                if found:
+                    return result
+                result = fn(*args, **kwargs)
+                cache.put(key, result)
+                return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorate
+
+
+def cache_stats() -> dict:
+    """Stats of every cached tool, by ``module.qualname``."""
+    return {name: cache.stats() for name, cache in _CACHES.items()}
@@ -0,0 +1,394 @@
+"""Barge-in (interruption) latency benchmark for the web app and the console app.
+
+Runs the fake VoiceLive server and the app under test in one process and on
+one event loop, so every stage is timestamped with the same clock. Each trial:
+
+1. the fake server commits a user turn and starts streaming a scripted reply;
+2. once the app is playing it, after a random delay, the server injects
+   ``input_audio_buffer.speech_started`` (t0);
+3. the benchmark records, relative to t0:
+
+   * ``cancel``       - ``response.cancel`` received by the fake server
+   * ``stop_playback`` - web: the ``stop_playback`` control frame received by a
+     real ``/ws-audio`` client; console: ``AudioProcessor.pause_playback()`` called
+   * ``last_stale_drop`` - the last audio delta of the interrupted reply that
+     the app dropped instead of playing
+   * ``silence``      - when the client stopped receiving or playing audio of
+     the interrupted reply (the later of ``stop_playback`` and the last
+     leaked frame)
+
+Frames of the interrupted reply that still reached the client after
+``stop_playback`` are counted as leaks. Usage::
+
+    python bench/bargein.py --app both --trials 50
+    python bench/bargein.py --app web --json > bargein-web.json
+
+The console app is imported from ``../rt-voice-console/src``; its
+``AudioProcessor`` is replaced by a probe so no audio device is needed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from common import format_summary, summarize
+from fake_voicelive import FakeConnection, FakeServerConfig, FakeVoiceLiveServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WEB_SRC = os.path.join(HERE, "..", "src")
+CONSOLE_SRC = os.path.join(HERE, "..", "..", "rt-voice-console", "src")
+
+STAGES = ("cancel", "stop_playback", "last_stale_drop", "silence")
+
+
+class Harness:
+    """Common trial bookkeeping; subclasses wire it to one app."""
+
+    name = ""
+
+    def __init__(self):
+        self.playing = asyncio.Event()  # first audio of the current reply reached the client
+        self.t0: Optional[float] = None
+        self.stop_playback_at: Optional[float] = None
+        self.drops: List[float] = []
+        self.leaks: List[float] = []
+
+    def reset(self):
+        self.playing.clear()
+        self.t0 = None
+        self.stop_playback_at = None
+        self.drops = []
+        self.leaks = []
+
+    # -- probes --------------------------------------------------------------
+
+    def on_audio_played(self):
+        now = time.perf_counter()
+        if self.t0 is None:
+            self.playing.set()
+        elif self.stop_playback_at is not None:
+            self.leaks.append(now)
+
+    def on_stop_playback(self):
+        if self.t0 is not None and self.stop_playback_at is None:
+            self.stop_playback_at = time.perf_counter()
+
+    def on_drop(self):
+        if self.t0 is not None:
+            self.drops.append(time.perf_counter())
+
+    # -- lifecycle -------------------------------------------------------------
+
+    async def start(self, endpoint: str):
+        raise NotImplementedError
+
+    async def stop(self):
+        raise NotImplementedError
+
+
+class WebHarness(Harness):
+    """Runs ``flask_app``'s async server and one session's assistant in-process."""
+
+    name = "web"
+
+    def __init__(self, io_port: int):
+        super().__init__()
+        self.io_port = io_port
+        self._runner = None
+        self._task: Optional[asyncio.Task] = None
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._session = None
+
+    async def start(self, endpoint: str):
+        os.environ.update({
+            "AZURE_VOICE_LIVE_ENDPOINT": endpoint,
+            "AZURE_VOICE_LIVE_API_KEY": "fake",
+            "VOICE_LIVE_MODEL": "fake",
+            "VOICE_LIVE_VOICE": "en-US-JennyNeural",
+        })
+        sys.path.insert(0, os.path.abspath(WEB_SRC))
+        import flask_app
+
+        self._runner = await flask_app._start_io_server("127.0.0.1", self.io_port)
+        sess = flask_app._create_session()
+        assert sess is not None
+        self._session = sess
+        self._task = asyncio.ensure_future(flask_app._run_assistant(sess))
+
+        while sess.assistant is None or sess.current_state() != "ready":
+            if self._task.done() or sess.current_state() == "error":
+                raise RuntimeError(f"web session failed to start: {sess.snapshot()}")
+            await asyncio.sleep(0.01)
+
+        # Deltas that arrive while the assistant has flagged the reply as cancelled are dropped
+        assistant = sess.assistant
+        handle_audio_delta = assistant._handle_audio_delta
+
+        async def probed_audio_delta(event):
+            if assistant._response_cancelled:
+                self.on_drop()
+            await handle_audio_delta(event)
+
+        assistant._handle_audio_delta = probed_audio_delta
+
+        self._http = aiohttp.ClientSession()
+        self._ws = await self._http.ws_connect(f"http://127.0.0.1:{self.io_port}/ws-audio?session={sess.id}")
+        self._reader = asyncio.ensure_future(self._read_audio_socket())
+
+    async def _read_audio_socket(self):
+        assert self._ws is not None
+        async for msg in self._ws:
+            if msg.type == aiohttp.WSMsgType.BINARY:
+                self.on_audio_played()
+            elif msg.type == aiohttp.WSMsgType.TEXT:
+                event = json.loads(msg.data)
+                if event.get("action") == "stop_playback":
+                    self.on_stop_playback()
+
+    async def stop(self):
+        if self._reader:
+            self._reader.cancel()
+        if self._ws:
+            await self._ws.close()
+        if self._http:
+            await self._http.close()
+        if self._session and self._session.assistant:
+            self._session.assistant.request_stop()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._runner:
+            await self._runner.cleanup()
+
+
+class ConsoleHarness(Harness):
+    """Runs the console ``BasicVoiceAssistant`` with a probe in place of its AudioProcessor."""
+
+    name = "console"
+
+    def __init__(self):
+        super().__init__()
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+
+    async def start(self, endpoint: str):
+        sys.path.insert(0, os.path.abspath(CONSOLE_SRC))
+        try:
+            from voice_console import voice_console
+        except (ImportError, SystemExit) as e:
+            raise RuntimeError(f"cannot import voice_console ({e!r}); install its dependencies") from e
+        from azure.core.credentials import AzureKeyCredential
+
+        harness = self
+
+        class ProbeAudioProcessor:
+            """Stands in for AudioProcessor: same interface, no audio devices."""
+
+            def __init__(self, connection):
+                self.connection = connection
+                self.backend = None
+                self.is_playing = False
+                self.playback_started_at = None
+
+            async def start_capture(self):
+                harness._ready.set()
+
+            async def stop_capture(self):
+                pass
+
+            async def start_playback(self):
+                self.is_playing = True
+
+            async def pause_playback(self):
+                if self.is_playing:
+                    harness.on_stop_playback()
+                self.is_playing = False
+
+            async def resume_playback(self):
+                self.is_playing = True
+
+            async def stop_playback(self):
+                await self.pause_playback()
+
+            async def queue_audio(self, audio_data: bytes):
+                if self.is_playing:
+                    harness.on_audio_played()
+                else:
+                    harness.on_drop()
+
+            def end_of_audio(self):
+                pass
+
+            async def cleanup(self):
+                await self.stop_playback()
+
+        voice_console.AudioProcessor = ProbeAudioProcessor
+        assistant = voice_console.BasicVoiceAssistant(
+            endpoint=endpoint,
+            credential=AzureKeyCredential("fake"),
+            model="fake",
+            voice="en-US-JennyNeural",
+            instructions="benchmark",
+        )
+        self._task = asyncio.ensure_future(assistant.start())
+        ready = asyncio.ensure_future(self._ready.wait())
+        await asyncio.wait({self._task, ready}, timeout=10, return_when=asyncio.FIRST_COMPLETED)
+        if not self._ready.is_set():
+            ready.cancel()
+            error = self._task.exception() if self._task.done() else "timed out"
+            raise RuntimeError(f"console assistant failed to start: {error}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+async def _run_trial(harness: Harness, conn: FakeConnection, args: argparse.Namespace) -> Optional[Dict[str, Any]]:
+    harness.reset()
+    conn.stats.timeline.clear()
+
+    # Commit a user turn; the fake server answers with a scripted reply
+    await conn.speech_stopped()
+    try:
+        await asyncio.wait_for(harness.playing.wait(), timeout=5)
+    except asyncio.TimeoutError:
+        return None
+    await asyncio.sleep(random.uniform(args.min_delay_ms, args.max_delay_ms) / 1000.0)
+    if not conn.responding:
+        return None  # Reply finished before the barge-in; the delay window is too wide
+
+    harness.t0 = t0 = time.perf_counter()
+    await conn.speech_started()
+
+    # Wait for the reply to end, then give in-flight deltas time to drain
+    deadline = t0 + 5
+    while conn.responding and time.perf_counter() < deadline:
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(args.settle_ms / 1000.0)
+
+    cancel_at = next((m["t"] for m in conn.stats.timeline if m["event"] == "response.cancel" and m["t"] >= t0), None)
+    stop_at = harness.stop_playback_at
+    last_leak = harness.leaks[-1] if harness.leaks else None
+    silence_at = max(t for t in (stop_at, last_leak) if t is not None) if stop_at is not None else None
+
+    def rel(t: Optional[float]) -> Optional[float]:
+        return (t - t0) * 1000.0 if t is not None else None
+
+    return {
+        "cancel": rel(cancel_at),
+        "stop_playback": rel(stop_at),
+        "last_stale_drop": rel(harness.drops[-1] if harness.drops else None),
+        "silence": rel(silence_at),
+        "stale_dropped": len(harness.drops),
+        "leaked": len(harness.leaks),
+    }
+
+
+async def run_app(harness: Harness, server: FakeVoiceLiveServer, endpoint: str, args: argparse.Namespace) -> Dict[str, Any]:
+    await harness.start(endpoint)
+    try:
+        conn = server.connections[-1]
+        trials = []
+        for _ in range(args.trials):
+            trial = await _run_trial(harness, conn, args)
+            if trial:
+                trials.append(trial)
+            await asyncio.sleep(args.gap_ms / 1000.0)
+    finally:
+        await harness.stop()
+
+    report: Dict[str, Any] = {"app": harness.name, "trials": len(trials)}
+    for stage in STAGES:
+        report[stage] = summarize(t[stage] for t in trials if t[stage] is not None)
+    report["missing_cancel"] = sum(1 for t in trials if t["cancel"] is None)
+    report["missing_stop_playback"] = sum(1 for t in trials if t["stop_playback"] is None)
+    report["stale_dropped"] = sum(t["stale_dropped"] for t in trials)
+    report["leaked"] = sum(t["leaked"] for t in trials)
+    return report
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    config = FakeServerConfig(
+        response_ms=args.response_ms,
+        delta_ms=args.delta_ms,
+        pace=args.pace,
+        first_delta_delay_ms=args.first_delta_delay_ms,
+    )
+    server = FakeVoiceLiveServer(config)
+    endpoint = await server.start("127.0.0.1", args.fake_port)
+
+    harnesses: List[Harness] = []
+    if args.app in ("web", "both"):
+        harnesses.append(WebHarness(args.io_port))
+    if args.app in ("console", "both"):
+        harnesses.append(ConsoleHarness())
+
+    reports = []
+    try:
+        for harness in harnesses:
+            try:
+                reports.append(await run_app(harness, server, endpoint, args))
+            except RuntimeError as e:
+                reports.append({"app": harness.name, "skipped": str(e)})
+    finally:
+        await server.stop()
+    return reports
+
+
+def print_report(report: Dict[str, Any]):
+    if "skipped" in report:
+        print(f"[{report['app']}] skipped: {report['skipped']}")
+        return
+    print(f"[{report['app']}] trials={report['trials']} stale deltas dropped={report['stale_dropped']} "
+          f"leaked after stop_playback={report['leaked']}")
+    for stage in STAGES:
+        print(format_summary(f"  -> {stage}", report[stage]))
+    if report["missing_cancel"] or report["missing_stop_playback"]:
+        print(f"  trials without cancel={report['missing_cancel']} "
+              f"without stop_playback={report['missing_stop_playback']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure speech_started -> silence latency in the voice apps.")
+    parser.add_argument("--app", choices=("web", "console", "both"), default="both")
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--min-delay-ms", type=int, default=50, help="Earliest barge-in after the reply starts playing")
+    parser.add_argument("--max-delay-ms", type=int, default=600, help="Latest barge-in after the reply starts playing")
+    parser.add_argument("--settle-ms", type=int, default=300, help="Wait after the reply ends for stray deltas")
+    parser.add_argument("--gap-ms", type=int, default=100, help="Pause between trials")
+    parser.add_argument("--response-ms", type=int, default=4000)
+    parser.add_argument("--delta-ms", type=int, default=FakeServerConfig.delta_ms)
+    parser.add_argument("--pace", type=float, default=FakeServerConfig.pace)
+    parser.add_argument("--first-delta-delay-ms", type=int, default=FakeServerConfig.first_delta_delay_ms)
+    parser.add_argument("--fake-port", type=int, default=9101)
+    parser.add_argument("--io-port", type=int, default=8766, help="Port for the web app's async server")
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    args = parser.parse_args()
+
+    reports = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print_report(report)
+
+
+if __name__ == "__main__":
+    main()
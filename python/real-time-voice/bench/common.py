@@ -0,0 +1,57 @@
+"""Helpers shared by the benchmark scripts in this folder."""
+from __future__ import annotations
+
+import math
+import struct
+from typing import Dict, Iterable, List, Optional, Sequence
+
+SAMPLE_RATE = 24000
+BYTES_PER_SAMPLE = 2
+
+
+def tone_pcm16(duration_ms: int, freq: float = 300.0, amplitude: int = 9000, rate: int = SAMPLE_RATE) -> bytes:
+    """A sine tone loud enough to trip the fake server's energy VAD."""
+    samples = rate * duration_ms // 1000
+    return b"".join(
+        struct.pack("<h", int(amplitude * math.sin(2 * math.pi * freq * n / rate))) for n in range(samples)
+    )
+
+
+def silence_pcm16(duration_ms: int, rate: int = SAMPLE_RATE) -> bytes:
+    return bytes(rate * duration_ms // 1000 * BYTES_PER_SAMPLE)
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for an empty sample."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: Iterable[float], pcts: Sequence[float] = (50, 95, 99)) -> Dict[str, Optional[float]]:
+    data: List[float] = list(values)
+    out: Dict[str, Optional[float]] = {"count": len(data)}
+    for pct in pcts:
+        value = percentile(data, pct)
+        out[f"p{int(pct)}"] = round(value, 2) if value is not None else None
+    out["max"] = round(max(data), 2) if data else None
+    return out
+
+
+def read_rss_kb(pid: int) -> Optional[int]:
+    """Resident set size of a process in KiB (Linux /proc only)."""
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def format_summary(name: str, stats: Dict[str, Optional[float]], unit: str = "ms") -> str:
+    parts = [f"{key}={value}{unit if key != 'count' and value is not None else ''}" for key, value in stats.items()]
+    return f"{name:<28} " + " ".join(parts)
@@ -0,0 +1,308 @@
+"""Local stand-in for the Azure VoiceLive realtime WebSocket API.
+
+Speaks the subset of the protocol the samples use so the web app and the
+console app can be load tested and benchmarked without an Azure endpoint:
+
+* ``session.update`` -> ``session.updated``
+* ``input_audio_buffer.append`` -> simple energy VAD that emits
+  ``input_audio_buffer.speech_started`` / ``speech_stopped`` and then a
+  scripted response (``response.created``, ``response.audio.delta`` * N,
+  ``response.audio.done``, ``response.done``)
+* ``response.cancel`` -> stops the scripted response and reports it cancelled
+
+Run standalone and point the apps at it::
+
+    python bench/fake_voicelive.py --port 9100
+    AZURE_VOICE_LIVE_ENDPOINT=http://127.0.0.1:9100 AZURE_VOICE_LIVE_API_KEY=fake ...
+
+or embed :class:`FakeVoiceLiveServer` in a benchmark to inject events and read
+its timestamps directly.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from aiohttp import web
+
+from common import BYTES_PER_SAMPLE, SAMPLE_RATE, tone_pcm16
+
+
+@dataclass
+class FakeServerConfig:
+    """Knobs controlling the scripted behaviour of the fake service."""
+
+    response_ms: int = 2000  # Length of every scripted assistant reply
+    delta_ms: int = 100  # Audio carried by each response.audio.delta
+    pace: float = 2.0  # Send rate relative to real time (the real service runs ahead of playback)
+    first_delta_delay_ms: int = 250  # Simulated model "think time" before the first delta
+    connect_delay_ms: int = 0  # Simulated TLS/auth handshake time before the socket is accepted
+    vad_threshold: int = 500  # Peak PCM16 amplitude that counts as speech
+    silence_duration_ms: int = 500  # Default; overridden by session.update turn_detection
+
+
+@dataclass
+class ConnectionStats:
+    """Per-connection counters, useful for load-test reports."""
+
+    appends: int = 0
+    audio_bytes_in: int = 0
+    deltas_sent: int = 0
+    audio_bytes_out: int = 0
+    cancels: int = 0
+    responses: int = 0
+    # Wall-clock timestamps (time.perf_counter) of notable protocol events
+    timeline: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class FakeConnection:
+    """State for one client WebSocket connected to the fake service."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, server: "FakeVoiceLiveServer", ws: web.WebSocketResponse):
+        self.server = server
+        self.ws = ws
+        self.id = f"sess_{next(self._ids)}"
+        self.stats = ConnectionStats()
+        self.silence_duration_ms = server.config.silence_duration_ms
+        self._event_ids = itertools.count(1)
+        self._item_ids = itertools.count(1)
+        self._send_lock = asyncio.Lock()
+
+        # Energy VAD state, measured in input audio milliseconds
+        self._audio_ms = 0.0
+        self._in_speech = False
+        self._silence_ms = 0.0
+
+        # Current scripted response
+        self._response_task: Optional[asyncio.Task] = None
+        self._response_id: Optional[str] = None
+
+    # -- sending -----------------------------------------------------------
+
+    async def send(self, event: Dict[str, Any]):
+        event.setdefault("event_id", f"event_{next(self._event_ids)}")
+        if self.ws.closed:
+            return
+        async with self._send_lock:
+            await self.ws.send_str(json.dumps(event))
+
+    def mark(self, name: str, **extra: Any):
+        self.stats.timeline.append({"t": time.perf_counter(), "event": name, **extra})
+        for hook in self.server.hooks:
+            hook(self, name, extra)
+
+    # -- client events -----------------------------------------------------
+
+    async def handle(self, msg: Dict[str, Any]):
+        kind = msg.get("type")
+        if kind == "session.update":
+            session = msg.get("session") or {}
+            turn_detection = session.get("turn_detection") or {}
+            if turn_detection.get("silence_duration_ms"):
+                self.silence_duration_ms = int(turn_detection["silence_duration_ms"])
+            await self.send({"type": "session.updated", "session": {"id": self.id, **session}})
+            self.mark("session.updated")
+        elif kind == "input_audio_buffer.append":
+            pcm = base64.b64decode(msg.get("audio") or "")
+            self.stats.appends += 1
+            self.stats.audio_bytes_in += len(pcm)
+            await self._vad(pcm)
+        elif kind == "response.cancel":
+            self.stats.cancels += 1
+            self.mark("response.cancel")
+            await self.cancel_response()
+        elif kind == "input_audio_buffer.clear":
+            await self.send({"type": "input_audio_buffer.cleared"})
+
+    async def _vad(self, pcm: bytes):
+        usable = len(pcm) - len(pcm) % BYTES_PER_SAMPLE
+        if not usable:
+            return
+        samples = memoryview(pcm)[:usable].cast("h")
+        chunk_ms = 1000.0 * len(samples) / SAMPLE_RATE
+        # Peak of a strided subset is plenty for a synthetic tone vs. silence signal
+        peak = max(abs(s) for s in samples[::8])
+        self._audio_ms += chunk_ms
+        if peak >= self.server.config.vad_threshold:
+            self._silence_ms = 0.0
+            if not self._in_speech:
+                self._in_speech = True
+                await self.speech_started()
+        elif self._in_speech:
+            self._silence_ms += chunk_ms
+            if self._silence_ms >= self.silence_duration_ms:
+                self._in_speech = False
+                await self.speech_stopped()
+
+    # -- scripted server events (also used for injection by benchmarks) ------
+
+    async def speech_started(self):
+        self.mark("speech_started")
+        await self.send({
+            "type": "input_audio_buffer.speech_started",
+            "audio_start_ms": int(self._audio_ms),
+            "item_id": f"item_{next(self._item_ids)}",
+        })
+
+    async def speech_stopped(self):
+        self.mark("speech_stopped")
+        item_id = f"item_{next(self._item_ids)}"
+        await self.send({"type": "input_audio_buffer.speech_stopped", "audio_end_ms": int(self._audio_ms), "item_id": item_id})
+        await self.send({"type": "input_audio_buffer.committed", "item_id": item_id})
+        self.start_response()
+
+    def start_response(self):
+        if self._response_task and not self._response_task.done():
+            return
+        self._response_task = asyncio.ensure_future(self._stream_response())
+
+    async def _stream_response(self):
+        cfg = self.server.config
+        self.stats.responses += 1
+        response_id = f"resp_{self.stats.responses}"
+        self._response_id = response_id
+        item_id = f"item_{next(self._item_ids)}"
+        await self.send({"type": "response.created", "response": {"id": response_id, "object": "realtime.response", "status": "in_progress", "output": []}})
+        self.mark("response.created", response_id=response_id)
+        status = "completed"
+        try:
+            await asyncio.sleep(cfg.first_delta_delay_ms / 1000.0)
+            delta_b64 = self.server.delta_b64
+            delta_len = len(self.server.delta_pcm)
+            interval = cfg.delta_ms / 1000.0 / max(cfg.pace, 0.01)
+            count = max(1, cfg.response_ms // cfg.delta_ms)
+            next_at = time.perf_counter()
+            for index in range(count):
+                await self.send({
+                    "type": "response.audio.delta",
+                    "response_id": response_id,
+                    "item_id": item_id,
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": delta_b64,
+                })
+                self.stats.deltas_sent += 1
+                self.stats.audio_bytes_out += delta_len
+                if index == 0:
+                    self.mark("first_delta", response_id=response_id)
+                next_at += interval
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            await self.send({"type": "response.audio.done", "response_id": response_id, "item_id": item_id, "output_index": 0, "content_index": 0})
+            self.mark("response.audio.done", response_id=response_id)
+        except asyncio.CancelledError:
+            status = "cancelled"
+        finally:
+            self._response_id = None
+            if not self.ws.closed:
+                await self.send({"type": "response.done", "response": {"id": response_id, "object": "realtime.response", "status": status, "output": []}})
+            self.mark("response.done", response_id=response_id, status=status)
+
+    async def cancel_response(self):
+        task = self._response_task
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def responding(self) -> bool:
+        return bool(self._response_task and not self._response_task.done())
+
+
+class FakeVoiceLiveServer:
+    """aiohttp application serving ``/voice-live/realtime`` like the real service.
+
+    ``hooks`` receive ``(connection, event_name, extra)`` for every timeline
+    mark so benchmarks can timestamp protocol stages on the server side.
+    """
+
+    def __init__(self, config: Optional[FakeServerConfig] = None):
+        self.config = config or FakeServerConfig()
+        self.connections: List[FakeConnection] = []
+        self.hooks: List[Callable[[FakeConnection, str, Dict[str, Any]], None]] = []
+        self._runner: Optional[web.AppRunner] = None
+
+        # One pre-rendered delta reused for every message keeps the fake server cheap
+        self.delta_pcm = tone_pcm16(self.config.delta_ms, freq=440.0, amplitude=8000)
+        self.delta_b64 = base64.b64encode(self.delta_pcm).decode("ascii")
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/voice-live/realtime", self._handle)
+        # Older SDK betas (the console app pins 1.0.0b2) connect to this path instead
+        app.router.add_get("/voice-agent/realtime", self._handle)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 9100) -> str:
+        """Start serving; returns the endpoint to hand to the apps."""
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        for conn in list(self.connections):
+            await conn.cancel_response()
+            await conn.ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request):
+        if self.config.connect_delay_ms:
+            await asyncio.sleep(self.config.connect_delay_ms / 1000.0)
+        ws = web.WebSocketResponse(max_msg_size=10 * 1024 * 1024)
+        await ws.prepare(request)
+        conn = FakeConnection(self, ws)
+        self.connections.append(conn)
+        await conn.send({"type": "session.created", "session": {"id": conn.id}})
+        try:
+            async for msg in ws:
+                if msg.type == web.WSMsgType.TEXT:
+                    await conn.handle(json.loads(msg.data))
+                elif msg.type == web.WSMsgType.ERROR:
+                    break
+        finally:
+            await conn.cancel_response()
+            self.connections.remove(conn)
+        return ws
+
+    def totals(self) -> Dict[str, int]:
+        keys = ("appends", "audio_bytes_in", "deltas_sent", "audio_bytes_out", "cancels", "responses")
+        return {k: sum(getattr(c.stats, k) for c in self.connections) for k in keys}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake VoiceLive endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--response-ms", type=int, default=FakeServerConfig.response_ms)
+    parser.add_argument("--delta-ms", type=int, default=FakeServerConfig.delta_ms)
+    parser.add_argument("--pace", type=float, default=FakeServerConfig.pace)
+    parser.add_argument("--first-delta-delay-ms", type=int, default=FakeServerConfig.first_delta_delay_ms)
+    parser.add_argument("--connect-delay-ms", type=int, default=FakeServerConfig.connect_delay_ms)
+    args = parser.parse_args()
+
+    config = FakeServerConfig(
+        response_ms=args.response_ms,
+        delta_ms=args.delta_ms,
+        pace=args.pace,
+        first_delta_delay_ms=args.first_delta_delay_ms,
+        connect_delay_ms=args.connect_delay_ms,
+    )
+    server = FakeVoiceLiveServer(config)
+    web.run_app(server.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
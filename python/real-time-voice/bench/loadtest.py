@@ -0,0 +1,241 @@
+"""Load driver for the real-time voice web app.
+
+Opens N simulated browser clients. Each one starts a session, subscribes to
+``/events``, opens ``/ws-audio`` and then loops: speak (a tone) for
+``--speech-ms``, stay silent for ``--silence-ms`` and wait for the assistant
+audio coming back as binary frames. Run the app against the fake VoiceLive
+server so no Azure endpoint is needed::
+
+    python bench/fake_voicelive.py --port 9100 &
+    AZURE_VOICE_LIVE_ENDPOINT=http://127.0.0.1:9100 AZURE_VOICE_LIVE_API_KEY=fake \\
+        VOICE_LIVE_MODEL=fake VOICE_LIVE_VOICE=en-US-JennyNeural uv run web &
+    python bench/loadtest.py --clients 20 --duration 60 --server-pid <flask pid>
+
+Reported turn latency runs from the last speech frame sent to the first
+assistant audio frame received, so it includes the VAD silence window
+(500 ms in the sample session config) and the fake server's think time.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from common import format_summary, read_rss_kb, silence_pcm16, summarize, tone_pcm16
+
+
+@dataclass
+class ClientResult:
+    start_to_ready_ms: Optional[float] = None
+    turn_latencies_ms: List[float] = field(default_factory=list)
+    turns_sent: int = 0
+    frames_up: int = 0
+    bytes_up: int = 0
+    frames_down: int = 0
+    bytes_down: int = 0
+    sse_events: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+class SimulatedBrowser:
+    """One browser tab: session lifecycle, SSE listener and audio socket."""
+
+    def __init__(self, http: aiohttp.ClientSession, args: argparse.Namespace):
+        self.http = http
+        self.args = args
+        self.result = ClientResult()
+        self.session_id: Optional[str] = None
+        self._ready = asyncio.Event()
+        self._speech_ended_at: Optional[float] = None
+
+    async def run(self, stop_at: float):
+        args = self.args
+        started = time.perf_counter()
+        async with self.http.post(f"{args.app}/start-session", json={}) as resp:
+            body = await resp.json()
+            if resp.status != 200 or not body.get("session_id"):
+                self.result.errors.append(f"start-session {resp.status}: {body}")
+                return
+            self.session_id = body["session_id"]
+
+        sse_task = asyncio.ensure_future(self._listen_events())
+        ws = None
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=args.ready_timeout)
+            self.result.start_to_ready_ms = (time.perf_counter() - started) * 1000.0
+
+            ws = await self.http.ws_connect(f"{args.ws}/ws-audio?session={self.session_id}")
+            reader = asyncio.ensure_future(self._read_audio(ws))
+            try:
+                await self._speak_loop(ws, stop_at)
+            finally:
+                reader.cancel()
+        except asyncio.TimeoutError:
+            self.result.errors.append("session never became ready")
+        except Exception as e:  # keep the other clients going
+            self.result.errors.append(repr(e))
+        finally:
+            if ws is not None:
+                await ws.close()
+            sse_task.cancel()
+            try:
+                await self.http.post(f"{args.app}/stop-session", json={"session_id": self.session_id})
+            except Exception:
+                pass
+
+    async def _speak_loop(self, ws: aiohttp.ClientWebSocketResponse, stop_at: float):
+        args = self.args
+        frame_s = args.frame_ms / 1000.0
+        speech_frame = tone_pcm16(args.frame_ms)
+        silence_frame = silence_pcm16(args.frame_ms)
+        speech_frames = max(1, args.speech_ms // args.frame_ms)
+        silence_frames = max(1, args.silence_ms // args.frame_ms)
+        next_at = time.perf_counter()
+        while time.perf_counter() < stop_at:
+            for index in range(speech_frames + silence_frames):
+                frame = speech_frame if index < speech_frames else silence_frame
+                await ws.send_bytes(frame)
+                self.result.frames_up += 1
+                self.result.bytes_up += len(frame)
+                if index == speech_frames - 1:
+                    self._speech_ended_at = time.perf_counter()
+                    self.result.turns_sent += 1
+                # Pace frames like a real microphone
+                next_at += frame_s
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+    async def _read_audio(self, ws: aiohttp.ClientWebSocketResponse):
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.BINARY:
+                self.result.frames_down += 1
+                self.result.bytes_down += len(msg.data)
+                if self._speech_ended_at is not None:
+                    self.result.turn_latencies_ms.append((time.perf_counter() - self._speech_ended_at) * 1000.0)
+                    self._speech_ended_at = None
+            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                break
+
+    async def _listen_events(self):
+        try:
+            async with self.http.get(f"{self.args.app}/events?session={self.session_id}") as resp:
+                async for raw in resp.content:
+                    line = raw.decode("utf-8", "replace").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    self.result.sse_events += 1
+                    event = json.loads(line[5:])
+                    if event.get("type") == "status" and event.get("state") == "ready":
+                        self._ready.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.result.errors.append(f"events: {e!r}")
+
+
+async def _sample_rss(pid: int, samples: List[int], stop: asyncio.Event):
+    while not stop.is_set():
+        rss = read_rss_kb(pid)
+        if rss is not None:
+            samples.append(rss)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=1.0)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    rss_samples: List[int] = []
+    stop_sampling = asyncio.Event()
+    sampler = asyncio.ensure_future(_sample_rss(args.server_pid, rss_samples, stop_sampling)) if args.server_pid else None
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as http:
+        clients = [SimulatedBrowser(http, args) for _ in range(args.clients)]
+        began = time.perf_counter()
+        stop_at = began + args.ramp + args.duration
+
+        async def launch(index: int, client: SimulatedBrowser):
+            # Spread session starts over the ramp window, with a little jitter
+            delay = args.ramp * index / max(1, args.clients) + random.uniform(0, 0.05)
+            await asyncio.sleep(delay)
+            await client.run(stop_at)
+
+        await asyncio.gather(*(launch(i, c) for i, c in enumerate(clients)))
+        elapsed = time.perf_counter() - began
+
+    stop_sampling.set()
+    if sampler:
+        await sampler
+
+    results = [c.result for c in clients]
+    latencies = [ms for r in results for ms in r.turn_latencies_ms]
+    return {
+        "clients": args.clients,
+        "elapsed_s": round(elapsed, 2),
+        "start_to_ready_ms": summarize([r.start_to_ready_ms for r in results if r.start_to_ready_ms is not None]),
+        "turn_latency_ms": summarize(latencies),
+        "turns_sent": sum(r.turns_sent for r in results),
+        "turns_answered": len(latencies),
+        "uplink_frames_per_s": round(sum(r.frames_up for r in results) / elapsed, 1),
+        "uplink_kib_per_s": round(sum(r.bytes_up for r in results) / 1024 / elapsed, 1),
+        "downlink_frames_per_s": round(sum(r.frames_down for r in results) / elapsed, 1),
+        "downlink_kib_per_s": round(sum(r.bytes_down for r in results) / 1024 / elapsed, 1),
+        "sse_events_per_s": round(sum(r.sse_events for r in results) / elapsed, 1),
+        "server_rss_kib": {
+            "start": rss_samples[0] if rss_samples else None,
+            "peak": max(rss_samples) if rss_samples else None,
+            "end": rss_samples[-1] if rss_samples else None,
+        },
+        "errors": [e for r in results for e in r.errors][:20],
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"clients={report['clients']} elapsed={report['elapsed_s']}s "
+          f"turns sent={report['turns_sent']} answered={report['turns_answered']}")
+    print(format_summary("start -> ready", report["start_to_ready_ms"]))
+    print(format_summary("speech end -> first audio", report["turn_latency_ms"]))
+    print(f"{'uplink':<28} {report['uplink_frames_per_s']} frames/s {report['uplink_kib_per_s']} KiB/s")
+    print(f"{'downlink':<28} {report['downlink_frames_per_s']} frames/s {report['downlink_kib_per_s']} KiB/s")
+    print(f"{'sse':<28} {report['sse_events_per_s']} events/s")
+    rss = report["server_rss_kib"]
+    if rss["peak"] is not None:
+        print(f"{'server rss':<28} start={rss['start']}KiB peak={rss['peak']}KiB end={rss['end']}KiB")
+    if report["errors"]:
+        print(f"errors ({len(report['errors'])} shown):")
+        for err in report["errors"]:
+            print(f"  - {err}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive N simulated browser clients against the web app.")
+    parser.add_argument("--app", default="http://127.0.0.1:5000", help="Web app base URL")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of conversation after ramp-up")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which sessions are started")
+    parser.add_argument("--frame-ms", type=int, default=150, help="Audio per uplink frame (browser sends ~150 ms)")
+    parser.add_argument("--speech-ms", type=int, default=1500)
+    parser.add_argument("--silence-ms", type=int, default=3000)
+    parser.add_argument("--ready-timeout", type=float, default=15.0)
+    parser.add_argument("--server-pid", type=int, default=None, help="Sample this process's RSS (Linux)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    args.app = args.app.rstrip("/")
+    args.ws = args.app.replace("http://", "ws://").replace("https://", "wss://")
+
+    report = asyncio.run(run_load(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
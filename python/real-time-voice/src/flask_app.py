@@ -6,148 +6,1417 @@ import asyncio
 import time
 import logging
 import traceback
-from typing import Optional, Tuple, Union, cast, List, Dict, Any
-import queue
+from typing import Optional, Tuple, Union, cast, List, Dict, Any, Deque, Set, Callable, Awaitable
+from collections import deque
+import bisect
 import json
 import base64
-from aiohttp import web
-
-from flask import Flask, render_template, jsonify, Response, request
-
-app = Flask(__name__, 
+import binascii
+import concurrent.futures
+import io
+import math
+import os
+import random
+import signal
+import sys
+import uuid
+from aiohttp import WSCloseCode, web
+import numpy as np
+
+from flask import Flask, render_template, jsonify, request
+
+app = Flask(__name__,
            template_folder=str(Path(__file__).parent / "templates"),
            static_folder=str(Path(__file__).parent / "static"))
 
 # ==============================================================================
-# GLOBAL STATE & CONFIGURATION 
+# GLOBAL STATE & CONFIGURATION
+# ==============================================================================
+
+# Session registry limits
+MAX_SESSIONS = int(os.environ.get("VOICE_MAX_SESSIONS", "50"))
+SESSION_LINGER_SECONDS = 60.0  # Keep ended sessions so late SSE clients still see the final state
+
+# States in which a session holds a live (or starting) VoiceLive connection
+ACTIVE_STATES = {"starting", "ready", "listening", "processing", "assistant_speaking", "reconnecting"}
+
+# Audio format expected by VoiceLive (PCM16, 24kHz, mono)
+AUDIO_SAMPLE_RATE = 24000
+AUDIO_BYTES_PER_SAMPLE = 2
+
+# Microphone audio is coalesced into appends of an adaptive target size. The target
+# starts at VOICE_UPLINK_BATCH_MS, which is also its floor, and grows towards
+# VOICE_UPLINK_MAX_BATCH_MS when sends are slow or back up; no audio waits longer
+# than the latency budget.
+UPLINK_BATCH_MS = int(os.environ.get("VOICE_UPLINK_BATCH_MS", "100"))
+UPLINK_MAX_BATCH_MS = int(os.environ.get("VOICE_UPLINK_MAX_BATCH_MS", "400"))
+UPLINK_MAX_LATENCY_MS = int(os.environ.get("VOICE_UPLINK_MAX_LATENCY_MS", "200"))
+
+# Per-client SSE queue bound and what to do when a client falls behind:
+#   drop_audio - discard the client's oldest queued audio event
+#   coalesce   - keep only the newest queued status event, then drop audio as above
+#   disconnect - close the lagging client's stream (the browser reconnects and resyncs)
+SSE_QUEUE_SIZE = int(os.environ.get("SSE_QUEUE_SIZE", "256"))
+SSE_OVERFLOW_POLICY = os.environ.get("SSE_OVERFLOW_POLICY", "drop_audio").strip().lower()
+SSE_OVERFLOW_POLICIES = {"drop_audio", "coalesce", "disconnect"}
+if SSE_OVERFLOW_POLICY not in SSE_OVERFLOW_POLICIES:
+    SSE_OVERFLOW_POLICY = "drop_audio"
+
+# Assistant audio frames queued per /ws-audio socket. A tab that stops reading loses
+# its oldest queued audio frames; one whose queue is full of control frames is closed.
+AUDIO_SOCKET_QUEUE_FRAMES = int(os.environ.get("VOICE_AUDIO_SOCKET_QUEUE", "64"))
+
+# Idle SSE streams get a comment line this often so proxies keep them open and
+# dead peers are noticed; browsers wait SSE_RETRY_MS before reconnecting.
+SSE_KEEPALIVE_SECONDS = float(os.environ.get("SSE_KEEPALIVE_SECONDS", "15"))
+SSE_RETRY_MS = 2000
+
+# Warm pool of pre-connected, pre-configured VoiceLive connections handed to new
+# sessions (0 disables it); idle connections are replaced after the TTL.
+VOICE_POOL_SIZE = int(os.environ.get("VOICE_POOL_SIZE", "0"))
+VOICE_POOL_IDLE_TTL_SECONDS = float(os.environ.get("VOICE_POOL_IDLE_TTL_SECONDS", "240"))
+VOICELIVE_CONNECTION_OPTIONS = {"max_msg_size": 10 * 1024 * 1024, "heartbeat": 20, "timeout": 20}
+
+# A dropped VoiceLive connection is re-established up to VOICE_RECONNECT_ATTEMPTS times
+# (0 disables it) with exponential backoff; the attempt count resets once a connection
+# has stayed up for RECONNECT_STABLE_SECONDS. Microphone audio arriving during the gap
+# is held, keeping only the newest VOICE_RECONNECT_BUFFER_MS.
+RECONNECT_ATTEMPTS = int(os.environ.get("VOICE_RECONNECT_ATTEMPTS", "5"))
+RECONNECT_BUFFER_MS = int(os.environ.get("VOICE_RECONNECT_BUFFER_MS", "5000"))
+RECONNECT_BASE_DELAY_SECONDS = 0.5
+RECONNECT_MAX_DELAY_SECONDS = 8.0
+RECONNECT_STABLE_SECONDS = 30.0
+
+# Shared I/O event loop: hosts the audio WebSocket server and every VoiceLive connection
+io_loop: Optional[asyncio.AbstractEventLoop] = None
+io_thread: Optional[threading.Thread] = None
+_io_loop_lock = threading.Lock()
+
+
+# ==============================================================================
+# METRICS
+# ==============================================================================
+
+def _format_metric_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic Prometheus counter, optionally split by one label. Thread-safe."""
+
+    def __init__(self, name: str, help_text: str, label: Optional[str] = None):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self._values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, label_value: str = ""):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        if not self.label:
+            lines.append(f"{self.name} {_format_metric_value(items[0][1] if items else 0)}")
+        for label_value, value in items if self.label else []:
+            lines.append(f'{self.name}{{{self.label}="{label_value}"}} {_format_metric_value(value)}')
+        return lines
+
+
+class Gauge:
+    """Prometheus gauge whose value is computed when the metrics are scraped."""
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help_text
+        self.read = read
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge",
+                f"{self.name} {_format_metric_value(self.read())}"]
+
+
+class Histogram:
+    """Prometheus histogram with fixed upper bounds (seconds). Thread-safe."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format_metric_value(total)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text exposition format."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, help_text: str, label: Optional[str] = None) -> Counter:
+        metric = Counter(name, help_text, label)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> Gauge:
+        metric = Gauge(name, help_text, read)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...]) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Bucket upper bounds in seconds
+_FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+_TURN_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+METRICS = MetricsRegistry()
+SESSIONS_STARTED = METRICS.counter("voice_sessions_started_total", "Voice sessions started")
+SESSIONS_REJECTED = METRICS.counter("voice_sessions_rejected_total", "Session starts refused because the process was at capacity")
+AUDIO_IN_BYTES = METRICS.counter("voice_audio_in_bytes_total", "Microphone PCM16 bytes received from browsers")
+AUDIO_OUT_BYTES = METRICS.counter("voice_audio_out_bytes_total", "Assistant PCM16 bytes forwarded to browsers")
+APPENDS = METRICS.counter("voice_appends_total", "input_audio_buffer.append calls sent to VoiceLive")
+APPEND_SECONDS = METRICS.histogram("voice_append_seconds", "Time to send one input_audio_buffer.append", _LATENCY_BUCKETS)
+DELTAS_DROPPED = METRICS.counter("voice_audio_deltas_dropped_total", "Assistant audio deltas not forwarded to browsers", label="reason")
+RESPONSES_CANCELLED = METRICS.counter("voice_responses_cancelled_total", "Assistant responses cancelled", label="trigger")
+SSE_EVENTS_DROPPED = METRICS.counter("voice_sse_events_dropped_total", "SSE events discarded by the overflow policy")
+BROADCAST_SECONDS = METRICS.histogram("voice_broadcast_seconds", "Time to encode and queue one SSE broadcast", _FAST_BUCKETS)
+CONNECT_SECONDS = METRICS.histogram("voice_connect_seconds", "Time to open the VoiceLive WebSocket connection", _TURN_BUCKETS)
+FIRST_AUDIO_SECONDS = METRICS.histogram("voice_first_audio_seconds", "User speech stopped to first assistant audio delta", _TURN_BUCKETS)
+INTERRUPT_SECONDS = METRICS.histogram("voice_interrupt_to_silence_seconds",
+                                      "Barge-in or interrupt request to stop_playback written to a browser audio socket", _LATENCY_BUCKETS)
+# Gauges read the session registry at scrape time (see _session_gauge below)
+RECONNECTS = METRICS.counter("voice_reconnects_total", "VoiceLive reconnect attempts after a dropped connection", label="result")
+POOL_ACQUIRES = METRICS.counter("voice_pool_acquires_total", "Sessions started from the warm VoiceLive pool", label="result")
+METRICS.gauge("voice_pool_idle_connections", "Warm VoiceLive connections waiting for a session", lambda: VOICE_POOL.idle)
+METRICS.gauge("voice_sessions_active", "Sessions holding a live or starting VoiceLive connection", lambda: _session_gauge("active"))
+METRICS.gauge("voice_audio_sockets", "Open /ws-audio sockets", lambda: _session_gauge("audio_sockets"))
+METRICS.gauge("voice_sse_clients", "Connected /events clients", lambda: _session_gauge("sse_clients"))
+METRICS.gauge("voice_sse_queued_events", "Events waiting in all SSE client queues", lambda: _session_gauge("sse_queued"))
+METRICS.gauge("voice_sse_queue_depth_max", "Deepest SSE client queue", lambda: _session_gauge("sse_queue_max"))
+
+
+# ==============================================================================
+# TURN TRACING
 # ==============================================================================
 
-# WebSocket server configuration
-WS_SERVER_HOST = '0.0.0.0'
-WS_SERVER_PORT = 8765
+# Per-turn latency records: VOICE_TRACE_FILE receives one line per completed turn,
+# either a flat JSON record ("jsonl") or an OTLP/JSON ExportTraceServiceRequest
+# ("otlp"). Rolling percentiles over the last VOICE_TRACE_WINDOW turns are kept
+# in-process either way.
+TRACE_FILE = os.environ.get("VOICE_TRACE_FILE")
+TRACE_FORMAT = os.environ.get("VOICE_TRACE_FORMAT", "jsonl").strip().lower()
+TRACE_WINDOW = int(os.environ.get("VOICE_TRACE_WINDOW", "200"))
+
+
+class TurnTrace:
+    """Timestamps (``time.perf_counter``) of one user turn, from end of speech to response done."""
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id
+        self.marks: Dict[str, float] = {}
+        self.interrupted = False
+
+    def mark(self, name: str, at: Optional[float] = None):
+        """Record ``name`` once; later marks of the same name are ignored."""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() if at is None else at
+
+
+class TurnTracer:
+    """Turns completed :class:`TurnTrace` objects into span records and rolling percentiles.
+
+    Each turn becomes a ``voice.turn`` span (speech stopped to response done)
+    with child spans for waiting on the response, time to first audio, the
+    audio stream and the response itself. ``summary()`` reports p50/p90/p99
+    of those durations over the last ``window`` turns.
+    """
+
+    # Child span name -> (start mark, end mark)
+    SPANS = {
+        "voice.response_wait": ("speech_stopped", "response_created"),
+        "voice.first_audio": ("speech_stopped", "first_audio"),
+        "voice.audio_stream": ("first_audio", "audio_done"),
+        "voice.response": ("response_created", "response_done"),
+    }
+
+    def __init__(self, path: Optional[str] = None, fmt: str = "jsonl", window: int = 200, service: str = "real-time-voice"):
+        self.path = path
+        self.format = fmt if fmt in {"jsonl", "otlp"} else "jsonl"
+        self.service = service
+        self.turns = 0
+        self._windows: Dict[str, Deque[float]] = {}
+        self._window = max(1, window)
+        self._lock = threading.Lock()
+        # perf_counter -> Unix epoch nanoseconds, for exported timestamps
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+        # record() runs on the I/O loop, so file appends go to one writer thread (keeping line order)
+        self._writer: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def _unix_ns(self, t: float) -> int:
+        return int(t * 1e9) + self._epoch_offset_ns
+
+    def record(self, trace: TurnTrace, status: Optional[str] = None):
+        marks = trace.marks
+        start = marks.get("speech_stopped", marks.get("response_created"))
+        end = marks.get("response_done")
+        if start is None or end is None:
+            return
+
+        durations = {"voice.turn": (end - start) * 1000.0}
+        for name, (begin_mark, end_mark) in self.SPANS.items():
+            if begin_mark in marks and end_mark in marks:
+                durations[name] = (marks[end_mark] - marks[begin_mark]) * 1000.0
+
+        with self._lock:
+            self.turns += 1
+            turn = self.turns
+            for name, value in durations.items():
+                window = self._windows.get(name)
+                if window is None:
+                    window = self._windows[name] = deque(maxlen=self._window)
+                window.append(value)
+
+        if not self.path:
+            return
+        if self.format == "otlp":
+            line = json.dumps(self._otlp(trace, status, start, end))
+        else:
+            line = json.dumps({
+                "turn": turn,
+                "session_id": trace.session_id,
+                "status": status,
+                "interrupted": trace.interrupted,
+                "start_unix_ms": self._unix_ns(start) // 1_000_000,
+                "durations_ms": {name: round(value, 1) for name, value in durations.items()},
+                "marks_ms": {name: round((t - start) * 1000.0, 1) for name, t in marks.items()},
+            })
+        with self._lock:
+            if self._writer is None:
+                self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="turn-trace")
+            writer = self._writer
+        writer.submit(self._append, line)
+
+    def _append(self, line: str):
+        try:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+        except OSError as e:
+            logger.warning("Could not write turn trace: %s", e)
+
+    def close(self):
+        """Wait for queued trace lines to reach the file."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+
+    def _otlp(self, trace: TurnTrace, status: Optional[str], start: float, end: float) -> Dict[str, Any]:
+        trace_id = uuid.uuid4().hex
+        root_id = uuid.uuid4().hex[:16]
+
+        def attr(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        def span(name: str, begin: float, finish: float, span_id: str, parent: str = "", attributes=()) -> Dict[str, Any]:
+            return {
+                "traceId": trace_id,
+                "spanId": span_id,
+                "parentSpanId": parent,
+                "name": name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(self._unix_ns(begin)),
+                "endTimeUnixNano": str(self._unix_ns(finish)),
+                "attributes": list(attributes),
+            }
+
+        root_attrs = [attr("voice.interrupted", trace.interrupted)]
+        if trace.session_id:
+            root_attrs.append(attr("voice.session_id", trace.session_id))
+        if status:
+            root_attrs.append(attr("voice.response_status", status))
+        spans = [span("voice.turn", start, end, root_id, attributes=root_attrs)]
+        for name, (begin_mark, end_mark) in self.SPANS.items():
+            if begin_mark in trace.marks and end_mark in trace.marks:
+                spans.append(span(name, trace.marks[begin_mark], trace.marks[end_mark], uuid.uuid4().hex[:16], root_id))
+        return {"resourceSpans": [{
+            "resource": {"attributes": [attr("service.name", self.service)]},
+            "scopeSpans": [{"scope": {"name": "voice.turns"}, "spans": spans}],
+        }]}
+
+    def summary(self) -> Dict[str, Any]:
+        """Rolling p50/p90/p99 (ms) per span over the last ``window`` turns."""
+        with self._lock:
+            windows = {name: sorted(values) for name, values in self._windows.items()}
+            turns = self.turns
+
+        def pct(values: List[float], p: float) -> float:
+            return round(values[max(0, -(-len(values) * p // 100) - 1)], 1)
+
+        return {
+            "turns": turns,
+            "spans": {
+                name: {"count": len(values), "p50_ms": pct(values, 50), "p90_ms": pct(values, 90), "p99_ms": pct(values, 99)}
+                for name, values in windows.items() if values
+            },
+        }
+
+
+TURN_TRACER = TurnTracer(TRACE_FILE, TRACE_FORMAT, TRACE_WINDOW)
+
+
+# ==============================================================================
+# AUDIO INPUT FORMAT
+# ==============================================================================
+
+# Sample formats a client may declare on /ws-audio (little-endian, interleaved channels)
+INPUT_SAMPLE_FORMATS = {"int16": np.dtype("<i2"), "float32": np.dtype("<f4")}
+# Rates a client may declare. The resampler's filter grows with the reduced
+# up/down ratio, so arbitrary rates (e.g. 191999 -> 24000) are refused rather
+# than building a filter with millions of taps.
+INPUT_SAMPLE_RATES = (8000, 16000, 22050, 24000, 32000, 44100, 48000, 96000)
+INPUT_MAX_CHANNELS = 8
+
 
-# Assistant state tracking
-state_lock = threading.Lock()
-assistant_state = {
-    "state": "idle",
-    "message": "Select 'Start Session' to begin a voice session.",
-    "last_error": None,
-    "connected": False,
-}
+class PolyphaseResampler:
+    """Streaming rational resampler (``out_rate / in_rate = up / down``) for mono float audio.
 
-# Threading components
-assistant_thread: Optional[threading.Thread] = None
-assistant_instance = None
-assistant_loop: Optional[asyncio.AbstractEventLoop] = None
-ws_server_thread: Optional[threading.Thread] = None
+    A Kaiser-windowed sinc low-pass is split into ``up`` phases; each output
+    sample is one dot product of a phase with the most recent input samples,
+    computed for a whole block at once with NumPy. The tail of each block is
+    carried over, so consecutive blocks resample as one continuous signal.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, taps_per_side: int = 10, beta: float = 5.0):
+        g = math.gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+        half = taps_per_side * max(self.up, self.down)
+        n = np.arange(-half, half + 1, dtype=np.float64)
+        cutoff = 1.0 / max(self.up, self.down)  # of the upsampled Nyquist
+        h = np.sinc(cutoff * n) * np.kaiser(n.size, beta)
+        h *= self.up / h.sum()
+        # Pad to a whole number of taps per phase; phases[p, j] = h[p + j * up]
+        self.taps = -(-h.size // self.up)
+        h = np.concatenate([h, np.zeros(self.taps * self.up - h.size)])
+        self._phases = h.reshape(self.taps, self.up).T.astype(np.float32)
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        # Next output position in upsampled samples, relative to the start of the history
+        self._next = (self.taps - 1) * self.up
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        x = np.concatenate([self._history, samples.astype(np.float32, copy=False)])
+        positions = np.arange(self._next, x.size * self.up, self.down)
+        if positions.size:
+            index = positions // self.up
+            # window[k, j] = x[index[k] - j]
+            window = x[index[:, None] - np.arange(self.taps)[None, :]]
+            out = np.einsum("kj,kj->k", window, self._phases[positions % self.up])
+            self._next = int(positions[-1]) + self.down
+        else:
+            out = np.zeros(0, dtype=np.float32)
+        keep = self.taps - 1
+        self._next -= (x.size - keep) * self.up
+        self._history = x[x.size - keep:] if keep else x[:0]
+        return out
+
+
+class InputAudioConverter:
+    """Converts a client's declared input format to the PCM16 / 24 kHz / mono VoiceLive expects.
+
+    Channels are averaged to mono, float32 and int16 are both handled as
+    floats and the result is resampled with :class:`PolyphaseResampler`.
+    Input already in the target format passes through untouched. Frames
+    may split samples arbitrarily; partial samples wait for the next frame.
+    """
 
-# Server-Sent Events client management
-_sse_clients: List["queue.Queue[str]"] = []
-_sse_clients_lock = threading.Lock()
+    def __init__(self, rate: int = AUDIO_SAMPLE_RATE, sample_format: str = "int16", channels: int = 1):
+        self.rate = rate
+        self.sample_format = sample_format
+        self.channels = channels
+        self.dtype = INPUT_SAMPLE_FORMATS[sample_format]
+        self.frame_bytes = self.dtype.itemsize * channels
+        self.passthrough = rate == AUDIO_SAMPLE_RATE and sample_format == "int16" and channels == 1
+        self._resampler = PolyphaseResampler(rate, AUDIO_SAMPLE_RATE) if rate != AUDIO_SAMPLE_RATE else None
+        self._remainder = b""
+
+    @classmethod
+    def from_query(cls, query) -> "InputAudioConverter":
+        """Build from ``rate``, ``format`` and ``channels`` query parameters; raises ValueError."""
+        rate = int(query.get("rate", AUDIO_SAMPLE_RATE))
+        sample_format = query.get("format", "int16").lower()
+        channels = int(query.get("channels", 1))
+        if rate not in INPUT_SAMPLE_RATES:
+            raise ValueError(f"rate must be one of {', '.join(map(str, INPUT_SAMPLE_RATES))}")
+        if sample_format not in INPUT_SAMPLE_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(INPUT_SAMPLE_FORMATS)}")
+        if not 1 <= channels <= INPUT_MAX_CHANNELS:
+            raise ValueError(f"channels must be between 1 and {INPUT_MAX_CHANNELS}")
+        return cls(rate, sample_format, channels)
+
+    def convert(self, data: Union[bytes, bytearray, memoryview]) -> bytes:
+        if self.passthrough:
+            return bytes(data)
+        if self._remainder:
+            data = self._remainder + bytes(data)
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = bytes(data[usable:])
+        if not usable:
+            return b""
+
+        samples = np.frombuffer(data, dtype=self.dtype, count=usable // self.dtype.itemsize).astype(np.float32)
+        if self.sample_format == "int16":
+            samples *= 1.0 / 32768.0
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        if self._resampler is not None:
+            samples = self._resampler.process(samples)
+        np.clip(samples * 32768.0, -32768.0, 32767.0, out=samples)
+        return samples.astype("<i2").tobytes()
 
 
 # ==============================================================================
-# UTILITY FUNCTIONS
+# AUDIO UPLINK
 # ==============================================================================
 
-def _broadcast(event: Dict[str, Any]):
-    """Broadcast SSE event to all connected clients."""
-    data = f"data: {json.dumps(event)}\n\n"
-    with _sse_clients_lock:
-        # Remove dead clients while broadcasting
-        dead_clients = []
-        for client_queue in _sse_clients:
+class PCMBatcher:
+    """Coalesces small PCM16 frames into fewer, larger ``input_audio_buffer.append`` calls.
+
+    Frames are copied once into a reusable ``bytearray`` and stay binary until a
+    batch is taken; the base64 text the SDK needs is then encoded straight from
+    a ``memoryview`` of that buffer, so no intermediate ``bytes`` are created.
+    """
+
+    def __init__(self, batch_ms: int = UPLINK_BATCH_MS, sample_rate: int = AUDIO_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.batch_bytes = 0
+        self.set_batch_ms(batch_ms)
+        self._buf = bytearray(self.batch_bytes * 2)
+        self._len = 0
+
+        # Counters
+        self.frames_in = 0
+        self.batches_out = 0
+        self.bytes_out = 0
+
+    def set_batch_ms(self, batch_ms: float):
+        frame = AUDIO_BYTES_PER_SAMPLE
+        self.batch_bytes = max(frame, int(self.sample_rate * batch_ms / 1000) * frame)
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._len
+
+    def push(self, data: Union[bytes, bytearray, memoryview]) -> bool:
+        """Buffer one frame; returns True once a full batch is ready to take."""
+        n = len(data)
+        end = self._len + n
+        if end > len(self._buf):
+            self._buf.extend(bytes(end - len(self._buf)))
+        self._buf[self._len:end] = data
+        self._len = end
+        self.frames_in += 1
+        return self._len >= self.batch_bytes
+
+    def take_base64(self) -> Optional[str]:
+        """Encode and clear everything buffered; None when empty."""
+        if not self._len:
+            return None
+        with memoryview(self._buf) as view:
+            audio_b64 = binascii.b2a_base64(view[:self._len], newline=False).decode("ascii")
+        self.batches_out += 1
+        self.bytes_out += self._len
+        self._len = 0
+        return audio_b64
+
+
+class AdaptiveUplink:
+    """Batching stage in front of ``input_audio_buffer.append`` with a latency budget.
+
+    Incoming PCM16 accumulates in a :class:`PCMBatcher` until the current
+    target duration is reached or the oldest buffered audio has waited
+    ``max_latency_ms``, whichever comes first. Batches are sent in order by a
+    single sender task so the socket reader never waits on VoiceLive.
+
+    After every send the target adapts: when appends are slow or batches
+    back up it grows (fewer, larger appends under load); when the link is
+    idle it shrinks back, but never below ``min_ms`` (the base coalescing
+    size) or the largest frame seen, since a smaller target would just send
+    every frame on its own. Must be used from the shared I/O loop.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        *,
+        min_ms: int = UPLINK_BATCH_MS,
+        max_ms: int = UPLINK_MAX_BATCH_MS,
+        max_latency_ms: int = UPLINK_MAX_LATENCY_MS,
+    ):
+        self._send = send
+        self.min_ms = min_ms
+        self.max_ms = max(min_ms, max_ms)
+        self.max_latency_ms = max_latency_ms
+        self.target_ms = float(self.min_ms)
+        self._batcher = PCMBatcher(min_ms)
+        self._largest_frame_ms = 0.0
+        self._pending: Deque[str] = deque()
+        self._wakeup = asyncio.Event()
+        self._sender: Optional[asyncio.Task] = None
+        self._deadline: Optional[asyncio.TimerHandle] = None
+        self._closed = False
+        # While held (no connection), batches queue up to _hold_limit base64 characters
+        self._held = False
+        self._hold_limit = 0
+        self._pending_chars = 0
+
+        # Observed behaviour
+        self.send_latency_ms = 0.0  # exponentially weighted moving average
+        self.batches = 0
+        self.deadline_flushes = 0
+        self.max_backlog = 0
+        self.held_dropped_bytes = 0
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]):
+        """Buffer raw PCM16; flushes when the target size is reached."""
+        if self._closed:
+            return
+        frame_ms = len(data) * 1000.0 / (AUDIO_SAMPLE_RATE * AUDIO_BYTES_PER_SAMPLE)
+        if frame_ms > self._largest_frame_ms:
+            self._largest_frame_ms = frame_ms
+        was_empty = not self._batcher.pending_bytes
+        if self._batcher.push(data):
+            self.flush()
+        elif was_empty:
+            # Start the latency budget clock at the first buffered byte
+            self._deadline = asyncio.get_running_loop().call_later(self.max_latency_ms / 1000.0, self._on_deadline)
+
+    def feed_encoded(self, audio_b64: str):
+        """Send an already base64-encoded chunk after anything still buffered."""
+        if self._closed:
+            return
+        self.flush()
+        self._enqueue(audio_b64)
+
+    def flush(self):
+        if self._deadline:
+            self._deadline.cancel()
+            self._deadline = None
+        audio_b64 = self._batcher.take_base64()
+        if audio_b64:
+            self._enqueue(audio_b64)
+
+    def _on_deadline(self):
+        self._deadline = None
+        self.deadline_flushes += 1
+        self.flush()
+
+    def hold(self, max_bytes: int):
+        """Queue batches instead of sending them (e.g. while reconnecting).
+
+        Only the newest ``max_bytes`` of audio are kept; older batches are dropped.
+        """
+        self._held = True
+        self._hold_limit = max_bytes * 4 // 3  # compared against base64 length
+        self._trim_held()
+
+    def release(self):
+        """Resume sending, starting with the audio queued while held."""
+        self._held = False
+        if self._pending:
+            self._wakeup.set()
+            if self._sender is None or self._sender.done():
+                self._sender = asyncio.ensure_future(self._run_sender())
+
+    def _trim_held(self):
+        while self._held and len(self._pending) > 1 and self._pending_chars > self._hold_limit:
+            dropped = self._pending.popleft()
+            self._pending_chars -= len(dropped)
+            self.held_dropped_bytes += len(dropped) * 3 // 4
+
+    def _enqueue(self, audio_b64: str):
+        self._pending.append(audio_b64)
+        self._pending_chars += len(audio_b64)
+        if len(self._pending) > self.max_backlog:
+            self.max_backlog = len(self._pending)
+        if self._held:
+            self._trim_held()
+            return
+        self._wakeup.set()
+        if self._sender is None or self._sender.done():
+            self._sender = asyncio.ensure_future(self._run_sender())
+
+    async def _run_sender(self):
+        while not self._closed:
+            while self._pending and not self._held:
+                audio_b64 = self._pending.popleft()
+                self._pending_chars -= len(audio_b64)
+                started = time.perf_counter()
+                await self._send(audio_b64)
+                self.batches += 1
+                self._adapt((time.perf_counter() - started) * 1000.0)
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    def _adapt(self, latency_ms: float):
+        """Move the batch target based on send latency and the remaining backlog."""
+        self.send_latency_ms = latency_ms if self.batches == 1 else 0.8 * self.send_latency_ms + 0.2 * latency_ms
+        backlog = len(self._pending)
+        if backlog > 0 or self.send_latency_ms > 0.5 * self.target_ms:
+            self.target_ms = min(self.max_ms, self.target_ms * 1.25)
+        elif self.send_latency_ms < 0.25 * self.target_ms:
+            floor_ms = min(self.max_ms, max(self.min_ms, self._largest_frame_ms))
+            self.target_ms = max(floor_ms, self.target_ms * 0.9)
+        self._batcher.set_batch_ms(self.target_ms)
+
+    async def aclose(self):
+        """Stop sending; buffered audio is discarded with the connection."""
+        self._closed = True
+        if self._deadline:
+            self._deadline.cancel()
+            self._deadline = None
+        self._pending.clear()
+        self._pending_chars = 0
+        if self._sender and not self._sender.done():
+            self._sender.cancel()
             try:
-                client_queue.put_nowait(data)
-            except Exception:
-                dead_clients.append(client_queue)
-        
-        # Clean up disconnected clients
-        for dead_client in dead_clients:
-            _sse_clients.remove(dead_client)
+                await self._sender
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "target_ms": round(self.target_ms, 1),
+            "send_latency_ms": round(self.send_latency_ms, 2),
+            "backlog": len(self._pending),
+            "max_backlog": self.max_backlog,
+            "batches": self.batches,
+            "deadline_flushes": self.deadline_flushes,
+            "held": self._held,
+            "held_dropped_bytes": self.held_dropped_bytes,
+            "frames_in": self._batcher.frames_in,
+            "bytes_out": self._batcher.bytes_out,
+        }
 
 
 # ==============================================================================
-# WEBSOCKET AUDIO SERVER
+# SERVER-SENT EVENTS SUBSCRIBERS
 # ==============================================================================
 
-def _start_ws_server(host: str = WS_SERVER_HOST, port: int = WS_SERVER_PORT):
-    """Start WebSocket server for low-latency binary audio streaming."""
-    
-    async def handle_audio_websocket(request):
-        """Handle incoming WebSocket connections for binary audio data."""
-        ws = web.WebSocketResponse(max_msg_size=10 * 1024 * 1024)
-        await ws.prepare(request)
-        
+class SSESubscriber:
+    """Bounded outgoing queue for one ``/events`` client.
+
+    ``offer`` never blocks and may be called from any thread: when the queue
+    is full the configured overflow policy makes room (or disconnects the
+    client), so a stalled browser tab costs at most ``maxsize`` encoded
+    events. The consumer awaits ``get`` on the shared I/O loop, so an idle
+    listener holds no thread.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = SSE_QUEUE_SIZE, policy: str = SSE_OVERFLOW_POLICY):
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._items: Deque[Tuple[str, str]] = deque()  # (event type, encoded SSE frame)
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._ready = asyncio.Event()
+        self.closed = False
+
+        # Per-client counters
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+
+    def offer(self, kind: str, data: str) -> bool:
+        """Queue an encoded event; returns False once the client has been disconnected."""
+        with self._lock:
+            if self.closed:
+                return False
+            if len(self._items) >= self.maxsize and not self._make_room(kind):
+                self.closed = True
+                self._items.clear()
+                accepted = False
+            else:
+                self._items.append((kind, data))
+                if len(self._items) > self.high_water:
+                    self.high_water = len(self._items)
+                accepted = True
+        self._wake()
+        return accepted
+
+    def _wake(self):
+        """Wake the consumer; cheap when already on the I/O loop, thread-safe otherwise."""
         try:
-            async for msg in ws:
-                if msg.type == web.WSMsgType.BINARY and assistant_instance and assistant_loop:
-                    # Convert binary PCM16 to base64 and send to assistant
-                    audio_b64 = base64.b64encode(msg.data).decode('utf-8')
-                    asyncio.run_coroutine_threadsafe(
-                        assistant_instance.append_audio(audio_b64), 
-                        assistant_loop
-                    )
-                elif msg.type == web.WSMsgType.ERROR:
-                    break
-        except Exception:
-            pass  # Handle connection errors gracefully
-        finally:
-            await ws.close()
-        
-        return ws
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._ready.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._ready.set)
+
+    def _make_room(self, kind: str) -> bool:
+        """Apply the overflow policy; called with the condition held and the queue full."""
+        if self.policy == "disconnect":
+            self.dropped += len(self._items) + 1
+            SSE_EVENTS_DROPPED.inc(len(self._items) + 1)
+            return False
 
-    def run_websocket_server():
-        """Run WebSocket server in dedicated thread."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        async def start_server():
-            app = web.Application()
-            app.router.add_get('/ws-audio', handle_audio_websocket)
-            runner = web.AppRunner(app)
-            await runner.setup()
-            site = web.TCPSite(runner, host, port)
-            await site.start()
-            
-            # Keep server running
+        if self.policy == "coalesce":
+            # Only the newest status matters to the UI; drop every queued status
+            # if a newer one is arriving, otherwise all but the last queued one.
+            status_idx = [i for i, (k, _) in enumerate(self._items) if k == "status"]
+            stale = status_idx if kind == "status" else status_idx[:-1]
+            for i in reversed(stale):
+                del self._items[i]
+            self.coalesced += len(stale)
+            if len(self._items) < self.maxsize:
+                return True
+
+        # Drop the oldest queued audio event, falling back to the oldest event of any kind
+        for i, (k, _) in enumerate(self._items):
+            if k == "audio":
+                del self._items[i]
+                break
+        else:
+            self._items.popleft()
+        self.dropped += 1
+        SSE_EVENTS_DROPPED.inc()
+        return True
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Wait until an event is available.
+
+        Returns None once the client is closed, or an empty string if
+        ``timeout`` seconds pass with nothing queued. The timeout is a plain
+        loop timer rather than ``wait_for``, so an idle wait allocates no task.
+        """
+        deadline = None if timeout is None else self._loop.time() + timeout
+        timer = self._loop.call_later(timeout, self._ready.set) if timeout is not None else None
+        try:
             while True:
-                await asyncio.sleep(3600)
-        
+                with self._lock:
+                    if self.closed:
+                        return None
+                    if self._items:
+                        _, data = self._items.popleft()
+                        self.delivered += 1
+                        return data
+                    # Cleared under the lock so an offer racing with us is never missed
+                    self._ready.clear()
+                if deadline is not None and self._loop.time() >= deadline:
+                    return ""
+                await self._ready.wait()
+        finally:
+            if timer:
+                timer.cancel()
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            self._items.clear()
+        self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": len(self._items),
+                "high_water": self.high_water,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "closed": self.closed,
+            }
+
+
+# ==============================================================================
+# AUDIO SOCKET WRITERS
+# ==============================================================================
+
+class AudioSocketWriter:
+    """Bounded outgoing queue and writer task for one ``/ws-audio`` socket.
+
+    ``offer`` never awaits the peer: frames are queued and this socket's own
+    task sends them, so a stalled tab cannot hold up the VoiceLive event
+    handler (and with it barge-in handling) for the whole session. When the
+    queue is full the oldest audio frame is dropped; control frames are never
+    dropped, and a socket whose queue is full of them is closed. Used only on
+    the shared I/O loop.
+
+    Control frames are queued as ``(text, interrupt_started)``; when
+    ``interrupt_started`` is set, the time from then until the frame has been
+    written to the socket is recorded in ``INTERRUPT_SECONDS``.
+    """
+
+    def __init__(self, ws: web.WebSocketResponse, maxsize: int = AUDIO_SOCKET_QUEUE_FRAMES):
+        self.ws = ws
+        self.maxsize = max(1, maxsize)
+        self._items: Deque[Union[bytes, Tuple[str, Optional[float]]]] = deque()  # bytes: audio, tuple: control
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.high_water = 0
+        self._task = asyncio.ensure_future(self._drain())
+
+    def offer(self, frame: Union[bytes, str], *, flush_audio: bool = False,
+              interrupt_started: Optional[float] = None) -> bool:
+        """Queue a binary audio or text control frame; returns False once the socket is closed.
+
+        ``flush_audio`` first discards queued audio the client would only stop again.
+        ``interrupt_started`` is the ``perf_counter`` time of the barge-in or
+        interrupt a text frame answers.
+        """
+        if self.closed:
+            return False
+        if flush_audio:
+            stale = sum(1 for item in self._items if isinstance(item, bytes))
+            if stale:
+                self._items = deque(item for item in self._items if not isinstance(item, bytes))
+                self.dropped += stale
+                DELTAS_DROPPED.inc(stale, label_value="flushed")
+        if len(self._items) >= self.maxsize:
+            for i, item in enumerate(self._items):
+                if isinstance(item, bytes):
+                    del self._items[i]
+                    self.dropped += 1
+                    DELTAS_DROPPED.inc(label_value="socket_overflow")
+                    break
+            else:
+                self.close()
+                asyncio.ensure_future(self.ws.close())
+                return False
+        self._items.append(frame if isinstance(frame, bytes) else (frame, interrupt_started))
+        self.high_water = max(self.high_water, len(self._items))
+        self._ready.set()
+        return True
+
+    async def _drain(self):
         try:
-            loop.run_until_complete(start_server())
+            while not self.closed:
+                if not self._items:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                frame = self._items.popleft()
+                if isinstance(frame, bytes):
+                    await self.ws.send_bytes(frame)
+                else:
+                    text, interrupt_started = frame
+                    await self.ws.send_str(text)
+                    if interrupt_started is not None:
+                        INTERRUPT_SECONDS.observe(time.perf_counter() - interrupt_started)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
         except Exception:
-            pass
-
-    # Start server in daemon thread
-    thread = threading.Thread(target=run_websocket_server, daemon=True)
-    thread.start()
-    return thread
-
-
-def set_state(state: str, message: str, *, error: str | None = None):
-    """Update assistant state and broadcast to clients."""
-    with state_lock:
-        assistant_state["state"] = state
-        assistant_state["message"] = message
-        
-        if error:
-            assistant_state["last_error"] = error
-            
-        # Update connection status based on state
-        if state in {"ready", "listening", "processing", "assistant_speaking"}:
-            assistant_state["connected"] = True
-        elif state in {"stopped", "idle"}:
-            assistant_state["connected"] = False
-    
-    # Broadcast state change to all clients
-    _broadcast({
-        "type": "status",
-        "state": state,
-        "message": message,
-        "last_error": assistant_state.get("last_error"),
-        "connected": assistant_state.get("connected"),
+            self.closed = True  # peer gone; the session drops this writer on its next offer
+
+    def close(self):
+        self.closed = True
+        self._items.clear()
+        self._task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": len(self._items), "high_water": self.high_water, "sent": self.sent, "dropped": self.dropped}
+
+
+# ==============================================================================
+# SESSION REGISTRY
+# ==============================================================================
+
+class VoiceSession:
+    """State for a single voice conversation.
+
+    Each session owns its own assistant instance, state machine and set of
+    Server-Sent Events subscribers, so one process can serve several callers
+    without their status or audio streams crossing.
+    """
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.ended_at: Optional[float] = None
+
+        # Assistant state tracking
+        self.state_lock = threading.Lock()
+        self.state: Dict[str, Any] = {
+            "state": "idle",
+            "message": "Select 'Start Session' to begin a voice session.",
+            "last_error": None,
+            "connected": False,
+        }
+
+        # Assistant running as a task on the shared I/O loop
+        self.assistant: Optional["BasicVoiceAssistant"] = None
+        self.task: Optional["concurrent.futures.Future[None]"] = None
+
+        # Server-Sent Events client management (status, log and control events)
+        self.sse_clients: List[SSESubscriber] = []
+        self.sse_clients_lock = threading.Lock()
+
+        # Writers for the browser /ws-audio sockets receiving assistant audio as
+        # binary frames. Only touched from the shared I/O loop, so no lock is needed.
+        self.audio_sockets: Set[AudioSocketWriter] = set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the session state suitable for JSON responses."""
+        with self.state_lock:
+            snap = {"session_id": self.id, **self.state}
+        with self.sse_clients_lock:
+            clients = list(self.sse_clients)
+        snap["sse_clients"] = [client.stats() for client in clients]
+        if self.assistant:
+            snap["uplink"] = self.assistant.uplink_stats()
+            snap["events"] = self.assistant.event_stats()
+        return snap
+
+    def current_state(self) -> str:
+        with self.state_lock:
+            return self.state["state"]
+
+    def is_active(self) -> bool:
+        return self.current_state() in ACTIVE_STATES
+
+    def _status_event(self) -> Dict[str, Any]:
+        return {
+            "type": "status",
+            "state": self.state["state"],
+            "message": self.state["message"],
+            "last_error": self.state.get("last_error"),
+            "connected": self.state.get("connected"),
+        }
+
+    def broadcast(self, event: Dict[str, Any]):
+        """Broadcast SSE event to all clients subscribed to this session.
+
+        The event is encoded once and offered to every subscriber without
+        holding the client list lock, so a slow client never stalls the caller.
+        """
+        if not self.sse_clients:
+            return
+        started = time.perf_counter()
+        data = f"data: {json.dumps(event)}\n\n"
+        kind = event.get("type", "")
+        with self.sse_clients_lock:
+            clients = list(self.sse_clients)
+
+        # Offer to each client; ones disconnected by the overflow policy are removed
+        dead_clients = [client for client in clients if not client.offer(kind, data)]
+        if dead_clients:
+            with self.sse_clients_lock:
+                for dead_client in dead_clients:
+                    if dead_client in self.sse_clients:
+                        self.sse_clients.remove(dead_client)
+        BROADCAST_SECONDS.observe(time.perf_counter() - started)
+
+    def set_state(self, state: str, message: str, *, error: str | None = None):
+        """Update session state and broadcast to its clients."""
+        with self.state_lock:
+            self.state["state"] = state
+            self.state["message"] = message
+
+            if error:
+                self.state["last_error"] = error
+
+            # Update connection status based on state
+            if state in {"ready", "listening", "processing", "assistant_speaking"}:
+                self.state["connected"] = True
+            elif state in {"stopped", "idle", "reconnecting"}:
+                self.state["connected"] = False
+
+            # Track when the session finished so the reaper can drop it later
+            if state in ACTIVE_STATES:
+                self.ended_at = None
+            elif self.ended_at is None:
+                self.ended_at = time.time()
+
+            event = self._status_event()
+
+        # Broadcast state change to all clients
+        self.broadcast(event)
+
+    def send_audio(self, audio: bytes) -> bool:
+        """Queue raw PCM16 for the session's audio sockets; False if none is attached.
+
+        Never waits on a peer: each socket's writer task does the sending.
+        """
+        for writer in list(self.audio_sockets):
+            if not writer.offer(audio):
+                self.audio_sockets.discard(writer)
+        return bool(self.audio_sockets)
+
+    def send_control(self, event: Dict[str, Any], *, interrupt_started: Optional[float] = None):
+        """Queue a control event on the audio sockets so it stays ordered with the audio frames.
+
+        ``stop_playback`` also discards audio still queued for the socket. Pass
+        ``interrupt_started`` to time the event until each socket has written it.
+        """
+        data = json.dumps(event)
+        flush_audio = event.get("action") == "stop_playback"
+        for writer in list(self.audio_sockets):
+            if not writer.offer(data, flush_audio=flush_audio, interrupt_started=interrupt_started):
+                self.audio_sockets.discard(writer)
+
+    def subscribe(self, loop: asyncio.AbstractEventLoop) -> SSESubscriber:
+        """Register a new SSE client, consumed on ``loop``, primed with the current state."""
+        client = SSESubscriber(loop)
+        with self.state_lock:
+            client.offer("status", f"data: {json.dumps(self._status_event())}\n\n")
+        with self.sse_clients_lock:
+            self.sse_clients.append(client)
+        return client
+
+    def unsubscribe(self, client: SSESubscriber):
+        client.close()
+        with self.sse_clients_lock:
+            if client in self.sse_clients:
+                self.sse_clients.remove(client)
+
+
+_sessions: Dict[str, VoiceSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def _reap_sessions():
+    """Forget sessions that ended more than SESSION_LINGER_SECONDS ago."""
+    now = time.time()
+    with _sessions_lock:
+        for sid, sess in list(_sessions.items()):
+            ended_at = sess.ended_at
+            if ended_at is not None and now - ended_at > SESSION_LINGER_SECONDS:
+                del _sessions[sid]
+
+
+def _create_session() -> Optional[VoiceSession]:
+    """Register a new session, or return None when the process is at capacity."""
+    _reap_sessions()
+    with _sessions_lock:
+        active = sum(1 for sess in _sessions.values() if sess.is_active())
+        if active >= MAX_SESSIONS:
+            return None
+        sess = VoiceSession(uuid.uuid4().hex)
+        _sessions[sess.id] = sess
+        return sess
+
+
+def _get_session(session_id: Optional[str]) -> Optional[VoiceSession]:
+    if not session_id:
+        return None
+    with _sessions_lock:
+        return _sessions.get(session_id)
+
+
+def _session_id_from_request() -> Optional[str]:
+    """Read the session id from the query string, JSON body or X-Session-Id header."""
+    sid = request.args.get("session")
+    if not sid:
+        payload = request.get_json(silent=True) or {}
+        sid = payload.get("session_id")
+    if not sid:
+        sid = request.headers.get("X-Session-Id")
+    return sid
+
+
+def _session_gauge(name: str) -> float:
+    """Aggregate one gauge value across the session registry (read at scrape time)."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+    if name == "active":
+        return sum(1 for sess in sessions if sess.is_active())
+    if name == "audio_sockets":
+        return sum(len(sess.audio_sockets) for sess in sessions)
+    clients: List[SSESubscriber] = []
+    for sess in sessions:
+        with sess.sse_clients_lock:
+            clients.extend(sess.sse_clients)
+    if name == "sse_clients":
+        return len(clients)
+    depths = [client.stats()["queued"] for client in clients]
+    if name == "sse_queued":
+        return sum(depths)
+    return max(depths, default=0)
+
+
+# ==============================================================================
+# SHARED I/O LOOP & HTTP SERVER
+# ==============================================================================
+
+async def _handle_audio_websocket(request):
+    """Bidirectional binary audio socket for one session.
+
+    Microphone PCM16 arrives as binary frames and is appended to VoiceLive;
+    assistant PCM16 goes back as binary frames, with ``stop_playback``
+    control events sent as text frames on the same socket. The browser
+    identifies its session with the ``session`` query parameter. The handler
+    runs on the same loop as the VoiceLive connection, so each frame is
+    appended directly without a cross-thread hop.
+
+    Clients may declare a different input format with the ``rate``,
+    ``format`` (``int16`` or ``float32``) and ``channels`` query parameters;
+    the audio is then converted to PCM16 24 kHz mono here.
+    """
+    sess = _get_session(request.query.get("session"))
+    if not sess:
+        raise web.HTTPNotFound(text="Unknown session")
+    try:
+        converter = InputAudioConverter.from_query(request.query)
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=f"Unsupported audio format: {e}")
+
+    ws = web.WebSocketResponse(max_msg_size=10 * 1024 * 1024)
+    await ws.prepare(request)
+    writer = AudioSocketWriter(ws)
+    sess.audio_sockets.add(writer)
+
+    try:
+        async for msg in ws:
+            if msg.type == web.WSMsgType.BINARY and sess.assistant:
+                # Binary PCM16 stays binary; the assistant batches and encodes it
+                audio = msg.data if converter.passthrough else converter.convert(msg.data)
+                if audio:
+                    await sess.assistant.append_audio(audio)
+            elif msg.type == web.WSMsgType.ERROR:
+                break
+    except Exception:
+        pass  # Handle connection errors gracefully
+    finally:
+        sess.audio_sockets.discard(writer)
+        writer.close()
+        await ws.close()
+
+    return ws
+
+
+async def _handle_events(request):
+    """Server-Sent Events stream for one session's status, log and control events.
+
+    Assistant audio is only sent here for clients without an audio socket.
+    Each listener is a coroutine waiting on its subscriber queue, so idle
+    listeners cost only memory. A disconnect is detected when the server
+    cancels the handler (``handler_cancellation``), when the transport is
+    found closing, or at the latest when the next keepalive write fails.
+    """
+    sess = _get_session(request.query.get("session"))
+    if not sess:
+        raise web.HTTPNotFound(text="Unknown session")
+
+    resp = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # disable proxy buffering of the stream
     })
+    await resp.prepare(request)
+    await resp.write(f"retry: {SSE_RETRY_MS}\n\n".encode("utf-8"))
+
+    # The queue is primed with the current state so the client renders immediately
+    client = sess.subscribe(asyncio.get_running_loop())
+    try:
+        while True:
+            msg = await client.get(timeout=SSE_KEEPALIVE_SECONDS)
+            if msg is None:  # disconnected by the overflow policy
+                break
+            transport = request.transport
+            if transport is None or transport.is_closing():
+                break
+            await resp.write((msg or ": keepalive\n\n").encode("utf-8"))
+    except ConnectionResetError:
+        pass  # client went away mid-write
+    finally:
+        sess.unsubscribe(client)
+    return resp
+
+
+async def _handle_audio_chunk(request):
+    """Receive base64 PCM16 (24kHz mono) audio from browser (fallback when the audio socket is down)."""
+    try:
+        payload = await request.json()
+    except Exception:
+        payload = {}
+    sess = _get_session(payload.get("session_id") or request.query.get("session"))
+    if not sess or not sess.assistant:
+        return web.json_response({"accepted": False, "reason": "No active session"}, status=400)
+    audio_b64 = payload.get("audio")
+    if not audio_b64:
+        return web.json_response({"accepted": False, "reason": "Missing audio field"}, status=400)
+    # Already on the assistant loop: hand the chunk straight to the uplink
+    await sess.assistant.append_audio(audio_b64)
+    return web.json_response({"accepted": True})
+
+
+async def _handle_status(request):
+    payload, code = _status_payload(request.query.get("session"))
+    return web.json_response(payload, status=code)
+
+
+async def _handle_health(request):
+    return web.json_response(_health_payload())
+
+
+async def _handle_metrics(request):
+    return web.Response(body=METRICS.render().encode("utf-8"), headers={"Content-Type": MetricsRegistry.CONTENT_TYPE})
+
+
+# Request headers that WSGI passes as CONTENT_TYPE / CONTENT_LENGTH rather than HTTP_*
+_WSGI_BODY_HEADERS = {"CONTENT_TYPE", "CONTENT_LENGTH"}
+
+
+def _wsgi_environ(request, body: bytes) -> Dict[str, Any]:
+    """Build the WSGI environ for an aiohttp request whose body has been read."""
+    host, _, port = (request.host or "localhost").partition(":")
+    environ: Dict[str, Any] = {
+        "REQUEST_METHOD": request.method,
+        "SCRIPT_NAME": "",
+        "PATH_INFO": request.path,
+        "QUERY_STRING": request.query_string,
+        "SERVER_NAME": host,
+        "SERVER_PORT": port or ("443" if request.secure else "80"),
+        "SERVER_PROTOCOL": f"HTTP/{request.version.major}.{request.version.minor}",
+        "REMOTE_ADDR": request.remote or "",
+        "CONTENT_TYPE": request.headers.get("Content-Type", ""),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": request.scheme,
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in request.headers.items():
+        key = name.upper().replace("-", "_")
+        if key not in _WSGI_BODY_HEADERS:
+            key = "HTTP_" + key
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _handle_flask(request):
+    """Serve the page and the short Flask routes through Flask's WSGI app.
+
+    Flask views block (start-session waits for the assistant task to start),
+    so each request runs on a worker thread and the loop only copies bytes.
+    None of these routes stream, so the whole response body is collected.
+    """
+    body = await request.read()
+    environ = _wsgi_environ(request, body)
+    started: Dict[str, Any] = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"], started["headers"] = status, headers
+
+    def call_flask() -> bytes:
+        result = app.wsgi_app(environ, start_response)
+        try:
+            return b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+
+    payload = await asyncio.get_running_loop().run_in_executor(None, call_flask)
+    resp = web.Response(body=payload, status=int(started["status"].split(" ", 1)[0]))
+    for name, value in started["headers"]:
+        if name.lower() != "content-length":  # aiohttp sets it from the body
+            resp.headers.add(name, value)
+    return resp
+
+
+def _build_io_app() -> web.Application:
+    """The public application: async streaming routes first, then everything Flask serves."""
+    io_app = web.Application()
+    io_app.router.add_get('/ws-audio', _handle_audio_websocket)
+    io_app.router.add_get('/events', _handle_events)
+    io_app.router.add_post('/audio-chunk', _handle_audio_chunk)
+    io_app.router.add_get('/status', _handle_status)
+    io_app.router.add_get('/health', _handle_health)
+    io_app.router.add_get('/metrics', _handle_metrics)
+    io_app.router.add_route('*', '/{path:.*}', _handle_flask)
+    return io_app
+
+
+async def _start_io_server(host: str, port: int):
+    """Serve the whole app from the shared loop on one port.
+
+    ``/ws-audio``, ``/events`` and ``/audio-chunk`` are handled on the loop,
+    so open streams and audio uploads cost memory instead of threads; the
+    page and the start/stop/interrupt routes go to Flask on worker threads.
+    """
+    # Cancel handlers when their client disconnects so idle SSE streams are released promptly
+    runner = web.AppRunner(_build_io_app(), handler_cancellation=True)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner
+
+
+def _ensure_io_loop() -> asyncio.AbstractEventLoop:
+    """Start the shared I/O loop on first use.
+
+    All sessions run their assistants as tasks on this one long-lived loop
+    instead of each getting a dedicated thread and event loop; ``main`` also
+    runs the HTTP server on it.
+    """
+    global io_loop, io_thread
+    with _io_loop_lock:
+        if io_loop is not None:
+            return io_loop
+
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run_io_loop():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        io_thread = threading.Thread(target=run_io_loop, name="voice-io-loop", daemon=True)
+        io_thread.start()
+        ready.wait()
+
+        if VOICE_POOL_SIZE > 0:
+            asyncio.run_coroutine_threadsafe(_prefill_voice_pool(), loop)
+
+        io_loop = loop
+        return loop
 
 
 # Basic logging (can be overridden by parent app)
@@ -156,8 +1425,8 @@ if not logger.handlers:
     logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s in %(name)s: %(message)s")
 
 # ---------------------------------------------------------------------------
-# Suppress noisy 200 OK HTTP access logs (Werkzeug dev server) while keeping
-# non-200 responses and internal status/log broadcasts. 
+# Suppress noisy 200 OK HTTP access logs (aiohttp, or Werkzeug when Flask is run
+# directly) while keeping non-200 responses and internal status/log broadcasts.
 # ---------------------------------------------------------------------------
 class _SuppressHTTP200(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:  # noqa: D401 - simple filter
@@ -168,34 +1437,153 @@ class _SuppressHTTP200(logging.Filter):
             return False
         return True
 
-werkzeug_logger = logging.getLogger("werkzeug")
-# Avoid stacking multiple identical filters if code reloaded (Flask debug reload)
-already = any(isinstance(f, _SuppressHTTP200) for f in getattr(werkzeug_logger, 'filters', []))
-if not already:
-    werkzeug_logger.addFilter(_SuppressHTTP200())
+for access_logger in (logging.getLogger("aiohttp.access"), logging.getLogger("werkzeug")):
+    # Avoid stacking multiple identical filters if code reloaded (Flask debug reload)
+    already = any(isinstance(f, _SuppressHTTP200) for f in getattr(access_logger, 'filters', []))
+    if not already:
+        access_logger.addFilter(_SuppressHTTP200())
 
 
 def _validate_env() -> Tuple[bool, str]:
     """Validate required environment variables."""
-    import os
-    
     required_vars = [
         "VOICE_LIVE_MODEL",
-        "VOICE_LIVE_VOICE", 
+        "VOICE_LIVE_VOICE",
         "AZURE_VOICE_LIVE_API_KEY",
         "AZURE_VOICE_LIVE_ENDPOINT"
     ]
-    
+
     missing = [var for var in required_vars if not os.environ.get(var)]
-    
+
     if missing:
         return False, f"Missing required environment variables: {', '.join(missing)}"
-    
+
     return True, "Configuration valid"
 
+# ==============================================================================
+# VOICELIVE EVENT DISPATCH
+# ==============================================================================
+
+EventHandler = Callable[[Any], Awaitable[None]]
+
+
+class EventDispatcher:
+    """Routes VoiceLive server events to handlers registered per event type.
+
+    Replaces an ``if/elif`` chain with one dictionary lookup per event and
+    times every handler call, so the event types that dominate the event loop
+    (typically ``response.audio.delta`` during long replies) are visible via
+    :meth:`stats`. Events without a handler go to ``default`` (if set) and are
+    still counted.
+    """
+
+    def __init__(self, default: Optional[EventHandler] = None):
+        self._handlers: Dict[Any, EventHandler] = {}
+        self.default = default
+        # Per event type: [count, total seconds, max seconds]
+        self._timings: Dict[str, List[float]] = {}
+
+    def register(self, event_type: Any, handler: EventHandler):
+        """Route ``event_type`` (a ``ServerEventType`` member or its string value) to ``handler``."""
+        self._handlers[event_type] = handler
+
+    def unregister(self, event_type: Any):
+        self._handlers.pop(event_type, None)
+
+    async def dispatch(self, event: Any) -> bool:
+        """Run the handler for ``event``; returns False if it had no registered handler."""
+        event_type = event.type
+        handler = self._handlers.get(event_type)
+        started = time.perf_counter()
+        if handler is not None:
+            await handler(event)
+        elif self.default is not None:
+            await self.default(event)
+        elapsed = time.perf_counter() - started
+
+        timing = self._timings.get(event_type)
+        if timing is None:
+            timing = self._timings[event_type] = [0, 0.0, 0.0]
+        timing[0] += 1
+        timing[1] += elapsed
+        if elapsed > timing[2]:
+            timing[2] = elapsed
+        return handler is not None
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Count, total, mean and max handler time (ms) per event type, busiest first."""
+        ordered = sorted(self._timings.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            str(getattr(event_type, "value", event_type)): {
+                "count": int(count),
+                "total_ms": round(total * 1000.0, 3),
+                "avg_ms": round(total * 1000.0 / count, 3) if count else 0.0,
+                "max_ms": round(longest * 1000.0, 3),
+            }
+            for event_type, (count, total, longest) in ordered
+        }
+
+    def reset_stats(self):
+        self._timings.clear()
+
+
+# ==============================================================================
+# VOICELIVE SESSION CONFIGURATION
+# ==============================================================================
+
+def build_session_config(voice: str, instructions: str):
+    """The session configuration (voice, modalities, turn detection) sent on every new connection."""
+    from azure.ai.voicelive.models import (
+        RequestSession,
+        ServerVad,
+        AzureStandardVoice,
+        Modality,
+        InputAudioFormat,
+        OutputAudioFormat,
+    )  # type: ignore
+
+    # Configure voice: use AzureStandardVoice for locale-specific voices, plain string for others
+    if voice.startswith("en-") or "-" in voice:
+        voice_cfg: Union[str, AzureStandardVoice] = AzureStandardVoice(name=voice)
+    else:
+        voice_cfg = voice
+
+    # BEGIN CONFIGURE VOICELIVE SESSION
+
+    # Configure VoiceLive session with audio/text modalities and voice activity detection
+    session_config = RequestSession(
+        modalities=[Modality.TEXT, Modality.AUDIO],
+        instructions=instructions,
+        voice=voice_cfg,
+        input_audio_format=InputAudioFormat.PCM16,
+        output_audio_format=OutputAudioFormat.PCM16,
+        turn_detection=ServerVad(threshold=0.5, prefix_padding_ms=300, silence_duration_ms=500),
+    )
+
+    # END CONFIGURE VOICELIVE SESSION
+    return session_config
+
+
+async def configure_session(conn, voice: str, instructions: str):
+    """Send the session configuration on ``conn``: used by sessions and by the connection pool."""
+    await conn.session.update(session=build_session_config(voice, instructions))
+
+
+def _closed_normally(conn) -> bool:
+    """True if the service ended ``conn`` with a normal (1000) close frame.
+
+    The SDK ends its event stream quietly however the socket closed, so this
+    reads the underlying aiohttp socket. A close frame sets it closing with
+    the peer's code; a dropped connection leaves 1006, and an EOF without a
+    close frame (which aiohttp also reports as 1000) never sets closing.
+    """
+    ws = getattr(conn, "_connection", None)
+    return bool(getattr(ws, "_closing", False)) and getattr(ws, "close_code", None) == WSCloseCode.OK
+
+
 class BasicVoiceAssistant:
     """Minimal assistant implementation for VoiceLive API.
-    
+
     Handles real-time voice conversation using Azure's VoiceLive service.
     Manages connection, session configuration, and event processing.
     """
@@ -210,6 +1598,7 @@ class BasicVoiceAssistant:
         voice: str,
         instructions: str,
         state_callback=None,
+        session: Optional[VoiceSession] = None,
     ):
         # Store Azure VoiceLive connection and configuration parameters
         self.endpoint = endpoint
@@ -217,112 +1606,197 @@ class BasicVoiceAssistant:
         self.model = model
         self.voice = voice
         self.instructions = instructions
-        
+
         # Initialize runtime state - connection established in start()
         self.connection = None
         self._response_cancelled = False  # Used to handle user interruptions
         self._stopping = False  # Signals graceful shutdown
         self.state_callback = state_callback or (lambda *_: None)
-
-    async def start(self):
-        # Import VoiceLive SDK components needed for establishing connection and configuring session
+        # The session this assistant belongs to; events are broadcast only to its clients
+        self.session = session
+        # Batches microphone frames into fewer input_audio_buffer.append calls (created in start())
+        self._uplink: Optional[AdaptiveUplink] = None
+        # The user turn waiting for its response (speech stopped, no response yet), and
+        # turns with a response in flight by response id, each kept until its response.done
+        self._turn: Optional[TurnTrace] = None
+        self._turns: Dict[str, TurnTrace] = {}
+        # Server event type -> handler, with per-type timing
+        self.dispatcher = EventDispatcher()
+        self._register_event_handlers()
+
+    async def start(self, warm: Optional[WarmConnection] = None):
+        """Run the session until it is stopped, reconnecting if the VoiceLive connection drops.
+
+        A connection that fails or closes abnormally is re-established; one the
+        service closes normally ends the session.
+
+        ``warm`` is an already connected and configured connection from the pool.
+        """
+        # Import VoiceLive SDK components needed for establishing connection
         from azure.ai.voicelive.aio import connect  # type: ignore
-        from azure.ai.voicelive.models import (
-            RequestSession,
-            ServerVad,
-            AzureStandardVoice,
-            Modality,
-            InputAudioFormat,
-            OutputAudioFormat,
-        )  # type: ignore
-    
-    # END VOICELIVE ASSISTANT IMPLEMENTATION
 
-        verbose_val = __import__('os').environ.get('VOICE_LIVE_VERBOSE', '0').strip()
+        verbose_val = os.environ.get('VOICE_LIVE_VERBOSE', '0').strip()
         verbose = bool(int(verbose_val)) if verbose_val.isdigit() else False
+        # One uplink for the whole session; it holds microphone audio while (re)connecting
+        self._uplink = AdaptiveUplink(self._send_append)
+        self._uplink.hold(RECONNECT_BUFFER_MS * AUDIO_SAMPLE_RATE * AUDIO_BYTES_PER_SAMPLE // 1000)
+        connected_once = False
+        failures = 0
         try:
-            _broadcast({"type": "log", "level": "info", "msg": f"Connecting to VoiceLive endpoint={self.endpoint} model={self.model} voice={self.voice}"})
-            # Establish async connection to Azure VoiceLive service with optimized settings
-            async with connect(
-                endpoint=self.endpoint,
-                credential=self.credential,
-                model=self.model,
-                connection_options={"max_msg_size": 10 * 1024 * 1024, "heartbeat": 20, "timeout": 20},
-            ) as conn:
-                self.connection = conn
-                # Reset cancellation flag at the start of a new connection/session
-                self._response_cancelled = False
-
-                # Configure voice: use AzureStandardVoice for locale-specific voices, plain string for others
-                if self.voice.startswith("en-") or "-" in self.voice:
-                    voice_cfg: Union[str, AzureStandardVoice] = AzureStandardVoice(name=self.voice)
-                else:
-                    voice_cfg = self.voice
-
-                # BEGIN CONFIGURE VOICELIVE SESSION
-
-                # Configure VoiceLive session with audio/text modalities and voice activity detection
-                session_config = RequestSession(
-                    modalities=[Modality.TEXT, Modality.AUDIO],
-                    instructions=self.instructions,
-                    voice=voice_cfg,
-                    input_audio_format=InputAudioFormat.PCM16,
-                    output_audio_format=OutputAudioFormat.PCM16,
-                    turn_detection=ServerVad(threshold=0.5, prefix_padding_ms=300, silence_duration_ms=500),
-                )
-                await conn.session.update(session=session_config)
-
-                # END CONFIGURE VOICELIVE SESSION
-
-                # Main event processing loop - handle all VoiceLive server events
-                async for event in conn:
-                    if self._stopping:
-                        break
-                    
-                    await self._handle_event(event, conn, verbose)
-        except Exception as e:
-            tb = traceback.format_exc(limit=6)
-            _broadcast({"type": "log", "level": "error", "msg": f"Connection failed: {e}", "trace": tb})
-            self.state_callback("error", f"Connection failed: {e}")
-            return
+            while not self._stopping:
+                connected_at: Optional[float] = None
+                error: Optional[Exception] = None
+                closed_normally = False
+                try:
+                    self._broadcast({"type": "log", "level": "info", "msg": f"Connecting to VoiceLive endpoint={self.endpoint} model={self.model} voice={self.voice}"})
+                    # Establish async connection to Azure VoiceLive service with optimized settings,
+                    # unless the pool already did (and configured the session)
+                    connect_started = time.perf_counter()
+                    connection = warm if warm is not None else connect(
+                        endpoint=self.endpoint,
+                        credential=self.credential,
+                        model=self.model,
+                        connection_options=dict(VOICELIVE_CONNECTION_OPTIONS),
+                    )
+                    async with connection as conn:
+                        if warm is None:
+                            CONNECT_SECONDS.observe(time.perf_counter() - connect_started)
+                        if failures:
+                            RECONNECTS.inc(label_value="succeeded")
+                        connected_once = True
+                        connected_at = time.monotonic()
+                        self.connection = conn
+                        # Reset cancellation flag at the start of a new connection/session
+                        self._response_cancelled = False
+
+                        # A reconnect replays the same session configuration
+                        if warm is None:
+                            await configure_session(conn, self.voice, self.instructions)
+                        self._uplink.release()
+
+                        # Main event processing loop - handle all VoiceLive server events
+                        # (a pooled connection first replays what it received while idle)
+                        async for event in (warm.events() if warm is not None else conn):
+                            if self._stopping:
+                                break
+
+                            await self._handle_event(event, conn, verbose)
+                        closed_normally = _closed_normally(conn)
+                except Exception as e:
+                    if not connected_once:
+                        tb = traceback.format_exc(limit=6)
+                        self._broadcast({"type": "log", "level": "error", "msg": f"Connection failed: {e}", "trace": tb})
+                        self.state_callback("error", f"Connection failed: {e}")
+                        return
+                    if connected_at is None:
+                        RECONNECTS.inc(label_value="failed")
+                    error = e
+                finally:
+                    self.connection = None
+                    warm = None
+                    self._uplink.hold(RECONNECT_BUFFER_MS * AUDIO_SAMPLE_RATE * AUDIO_BYTES_PER_SAMPLE // 1000)
+
+                if self._stopping:
+                    break
+                if closed_normally:
+                    self._broadcast({"type": "log", "level": "info", "msg": "VoiceLive closed the session"})
+                    break
+                # The event stream failed, or ended because the socket dropped
+                if connected_at is not None and time.monotonic() - connected_at >= RECONNECT_STABLE_SECONDS:
+                    failures = 0
+                failures += 1
+                reason = f"{error}" if error is not None else "connection dropped"
+                if failures > RECONNECT_ATTEMPTS:
+                    self.state_callback("error", f"Connection lost: {reason}")
+                    return
+                delay = min(RECONNECT_MAX_DELAY_SECONDS, RECONNECT_BASE_DELAY_SECONDS * 2 ** (failures - 1))
+                delay *= random.uniform(0.8, 1.2)
+                self._turn = None
+                self._turns.clear()
+                self._broadcast({"type": "log", "level": "warning",
+                                 "msg": f"VoiceLive connection lost ({reason}); retrying in {delay:.1f}s"})
+                self.state_callback("reconnecting", f"Connection lost, reconnecting (attempt {failures}/{RECONNECT_ATTEMPTS})…")
+                await asyncio.sleep(delay)
+                if VOICE_POOL.size:
+                    warm = await VOICE_POOL.acquire()
+        finally:
+            await self._uplink.aclose()
 
         # Cleanup (no local audio resources now)
         self.connection = None
 
-    async def append_audio(self, audio_b64: str):
+    # END VOICELIVE ASSISTANT IMPLEMENTATION
+
+    def _broadcast(self, event: Dict[str, Any]):
+        """Send an SSE event to the clients of this assistant's session."""
+        if self.session:
+            self.session.broadcast(event)
+
+    async def _send_control(self, event: Dict[str, Any], *, interrupt_started: Optional[float] = None):
+        """Send a control event over SSE and, ordered with the audio, over the audio socket."""
+        self._broadcast(event)
+        if self.session:
+            self.session.send_control(event, interrupt_started=interrupt_started)
+
+    def _current_state(self) -> Optional[str]:
+        return self.session.current_state() if self.session else None
+
+    async def append_audio(self, audio: Union[bytes, bytearray, memoryview, str]):
+        """Queue microphone audio for the VoiceLive input buffer.
+
+        Raw PCM16 goes through the adaptive uplink batcher. Already
+        base64-encoded chunks (the HTTP fallback) are sent as-is after anything
+        still buffered, so ordering is preserved.
+        """
+        uplink = self._uplink
+        if not uplink:
+            return
+        if isinstance(audio, str):
+            AUDIO_IN_BYTES.inc(len(audio) * 3 // 4)
+            uplink.feed_encoded(audio)
+        else:
+            AUDIO_IN_BYTES.inc(len(audio))
+            uplink.feed(audio)
+
+    def uplink_stats(self) -> Optional[Dict[str, Any]]:
+        return self._uplink.stats() if self._uplink else None
+
+    async def _send_append(self, audio_b64: str):
         """Send base64-encoded audio data to VoiceLive input buffer."""
         if not self.connection:
             return
+        started = time.perf_counter()
         try:
             await self.connection.input_audio_buffer.append(audio=audio_b64)
         except Exception as e:  # pragma: no cover
             logger.error("Failed to append audio: %s", e)
+            return
+        APPENDS.inc()
+        APPEND_SECONDS.observe(time.perf_counter() - started)
+
+    def _register_event_handlers(self):
+        """Route VoiceLive server events to their handlers (imported once, not per event)."""
+        from azure.ai.voicelive.models import ServerEventType  # type: ignore
+
+        # Handlers are looked up on self at call time so instances can override them
+        register = self.dispatcher.register
+        register(ServerEventType.SESSION_UPDATED, lambda event: self._handle_session_updated())
+        register(ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STARTED, lambda event: self._handle_speech_started(self.connection))
+        register(ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STOPPED, lambda event: self._handle_speech_stopped())
+        register(ServerEventType.RESPONSE_CREATED, lambda event: self._handle_response_created(event))
+        register(ServerEventType.RESPONSE_AUDIO_DELTA, lambda event: self._handle_audio_delta(event))
+        register(ServerEventType.RESPONSE_AUDIO_DONE, lambda event: self._handle_audio_done(event))
+        register(ServerEventType.RESPONSE_DONE, lambda event: self._handle_response_done(event))
+        register(ServerEventType.ERROR, lambda event: self._handle_error(event))
+
+    def event_stats(self) -> Dict[str, Dict[str, float]]:
+        return self.dispatcher.stats()
 
     async def _handle_event(self, event, conn, verbose=False):
-        """Handle VoiceLive events with clear separation by event type."""
-        # Import event types for processing different VoiceLive server events
-        from azure.ai.voicelive.models import ServerEventType
-        
-        event_type = event.type
+        """Handle VoiceLive events through the dispatch table."""
         if verbose:
-            _broadcast({"type": "log", "level": "debug", "event_type": str(event_type)})
-        
-        # Route VoiceLive server events to appropriate handlers
-        if event_type == ServerEventType.SESSION_UPDATED:
-            await self._handle_session_updated()
-        elif event_type == ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STARTED:
-            await self._handle_speech_started(conn)
-        elif event_type == ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STOPPED:
-            await self._handle_speech_stopped()
-        elif event_type == ServerEventType.RESPONSE_AUDIO_DELTA:
-            await self._handle_audio_delta(event)
-        elif event_type == ServerEventType.RESPONSE_AUDIO_DONE:
-            await self._handle_audio_done()
-        elif event_type == ServerEventType.RESPONSE_DONE:
-            # Reset cancellation flag but don't change state - _handle_audio_done already did
-            self._response_cancelled = False
-        elif event_type == ServerEventType.ERROR:
-            await self._handle_error(event)
+            self._broadcast({"type": "log", "level": "debug", "event_type": str(event.type)})
+        await self.dispatcher.dispatch(event)
 
     # BEGIN HANDLE SESSION EVENTS
 
@@ -332,67 +1806,346 @@ class BasicVoiceAssistant:
 
     async def _handle_speech_started(self, conn):
         """User started speaking - handle interruption if needed."""
+        started = time.perf_counter()
+        # Read the state before switching to listening so we know what was interrupted
+        current_state = self._current_state()
+        # Barge-in: flag the turns being answered; each is still closed by its own response.done
+        interrupted_at = time.perf_counter()
+        for turn in self._turns.values():
+            turn.interrupted = True
+            turn.mark("interrupted", interrupted_at)
+        if self._turn is not None:
+            self._turn.interrupted = True
         self.state_callback("listening", "Listening… speak now")
-        
+
         try:
-            # Stop any ongoing audio playback on the client side
-            _broadcast({"type": "control", "action": "stop_playback"})
-            
             # If assistant is currently speaking or processing, cancel the response to allow interruption
-            current_state = assistant_state.get("state")
-            if current_state in {"assistant_speaking", "processing"}:
+            interrupting = current_state in {"assistant_speaking", "processing"}
+
+            # Stop any ongoing audio playback on the client side; a barge-in is timed until
+            # the audio socket has written the stop
+            await self._send_control({"type": "control", "action": "stop_playback"},
+                                     interrupt_started=started if interrupting else None)
+
+            if interrupting:
                 self._response_cancelled = True
+                RESPONSES_CANCELLED.inc(label_value="barge_in")
                 await conn.response.cancel()
-                _broadcast({"type": "log", "level": "debug", 
+                self._broadcast({"type": "log", "level": "debug",
                           "msg": f"Interrupted assistant during {current_state}"})
             else:
-                _broadcast({"type": "log", "level": "debug", 
+                self._broadcast({"type": "log", "level": "debug",
                           "msg": f"User speaking during {current_state} - no cancellation needed"})
         except Exception as e:
-            _broadcast({"type": "log", "level": "debug", 
+            self._broadcast({"type": "log", "level": "debug",
                       "msg": f"Exception in speech handler: {e}"})
 
     async def _handle_speech_stopped(self):
         """User stopped speaking - processing input."""
+        self._turn = TurnTrace(self.session.id if self.session else None)
+        self._turn.mark("speech_stopped")
         self.state_callback("processing", "Processing your input…")
 
     # END HANDLE SESSION EVENTS
 
+    async def _handle_response_created(self, event):
+        """Response started; it takes over the waiting turn, or gets one of its own if not triggered by speech."""
+        turn, self._turn = self._turn, None
+        if turn is None:
+            turn = TurnTrace(self.session.id if self.session else None)
+        turn.mark("response_created")
+        response_id = getattr(getattr(event, "response", None), "id", None)
+        if response_id:
+            self._turns[response_id] = turn
+
+    def _turn_for(self, response_id: Optional[str]) -> Optional[TurnTrace]:
+        return self._turns.get(response_id) if response_id else None
+
     async def _handle_audio_delta(self, event):
         """Stream assistant audio to clients."""
         if self._response_cancelled:
+            DELTAS_DROPPED.inc(label_value="cancelled")
             return  # Skip cancelled responses
-            
+
+        turn = self._turn_for(getattr(event, "response_id", None))
+        if turn is not None and "first_audio" not in turn.marks:
+            turn.mark("first_audio")
+            if "speech_stopped" in turn.marks:
+                FIRST_AUDIO_SECONDS.observe(turn.marks["first_audio"] - turn.marks["speech_stopped"])
+
         # Update state when assistant starts speaking
-        if assistant_state.get("state") != "assistant_speaking":
+        if self._current_state() != "assistant_speaking":
             self.state_callback("assistant_speaking", "Assistant speaking…")
-        
-        # Extract and broadcast VoiceLive audio delta as base64 to WebSocket clients
+
+        # Send the VoiceLive audio delta as a raw binary frame to the session's audio sockets;
+        # fall back to base64 over SSE only for clients without an audio socket
         audio_data = getattr(event, "delta", None)
         if audio_data:
+            AUDIO_OUT_BYTES.inc(len(audio_data))
+            if self.session and self.session.send_audio(audio_data):
+                return
             audio_b64 = base64.b64encode(audio_data).decode("utf-8")
-            _broadcast({"type": "audio", "audio": audio_b64})
+            self._broadcast({"type": "audio", "audio": audio_b64})
 
-    async def _handle_audio_done(self):
+    async def _handle_audio_done(self, event):
         """Assistant finished speaking."""
         self._response_cancelled = False
+        turn = self._turn_for(getattr(event, "response_id", None))
+        if turn is not None:
+            turn.mark("audio_done")
         self.state_callback("ready", "Assistant finished. You can speak again.")
 
+    async def _handle_response_done(self, event):
+        """Response finished (or was cancelled)."""
+        # Reset cancellation flag but don't change state - _handle_audio_done already did
+        self._response_cancelled = False
+        response = getattr(event, "response", None)
+        turn = self._turns.pop(getattr(response, "id", None) or "", None)
+        if turn is not None:
+            turn.mark("response_done")
+            status = getattr(response, "status", None)
+            TURN_TRACER.record(turn, getattr(status, "value", status))
+
     async def _handle_error(self, event):
         """Handle VoiceLive errors."""
         error = getattr(event, "error", None)
         message = getattr(error, "message", "Unknown error") if error else "Unknown error"
         self.state_callback("error", f"Error: {message}")
 
+    def interrupt(self, requested: float):
+        """Stop client playback and cancel the current response (POST /interrupt).
+
+        Runs on the I/O loop; ``requested`` is the ``perf_counter`` time of the request.
+        """
+        self._response_cancelled = True  # suppress deltas still arriving for the response
+        stop = {"type": "control", "action": "stop_playback"}
+        self._broadcast(stop)
+        if self.session:
+            self.session.send_control(stop, interrupt_started=requested)
+        conn = self.connection
+        if conn is None:
+            self._broadcast({"type": "log", "level": "warn", "msg": "Interrupt requested with no VoiceLive connection"})
+            return
+        RESPONSES_CANCELLED.inc(label_value="interrupt")
+        asyncio.ensure_future(self._cancel_response(conn))
+
+    async def _cancel_response(self, conn):
+        try:
+            await conn.response.cancel()
+            self._broadcast({"type": "log", "level": "info", "msg": "Interrupt: response cancelled"})
+        except Exception as e:
+            self._broadcast({"type": "log", "level": "error", "msg": f"Failed to cancel the response: {e}"})
+
     def request_stop(self):
         self._stopping = True
 
 
-def _run_assistant_bg():
-    """Background thread target to run the async assistant until completion."""
-    global assistant_instance, shutdown_requested, assistant_loop
+# ==============================================================================
+# VOICELIVE CONNECTION POOL
+# ==============================================================================
+
+class WarmConnection:
+    """A connected, configured VoiceLive connection waiting to be handed to a session.
+
+    While idle a reader task keeps receiving so heartbeat pongs are processed
+    and the socket stays alive; the events it receives (``session.created``,
+    ``session.updated``) are kept and replayed to the session that takes the
+    connection. Used as an async context manager it yields the connection and
+    closes it on exit, like ``connect()``.
+    """
+
+    def __init__(self, manager, connection, on_closed: Callable[["WarmConnection"], None]):
+        self._manager = manager  # the connect() context manager, exited to close
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.pending: Deque[Any] = deque(maxlen=64)
+        self.closed = False
+        self._on_closed = on_closed
+        self._reader: Optional[asyncio.Task] = asyncio.ensure_future(self._read())
+
+    @classmethod
+    async def open(cls, endpoint: str, credential, model: str, voice: str, instructions: str,
+                   on_closed: Callable[["WarmConnection"], None]) -> "WarmConnection":
+        from azure.ai.voicelive.aio import connect  # type: ignore
+
+        manager = connect(endpoint=endpoint, credential=credential, model=model,
+                          connection_options=dict(VOICELIVE_CONNECTION_OPTIONS))
+        started = time.perf_counter()
+        connection = await manager.__aenter__()
+        CONNECT_SECONDS.observe(time.perf_counter() - started)
+        try:
+            await configure_session(connection, voice, instructions)
+        except BaseException:
+            await manager.__aexit__(None, None, None)
+            raise
+        return cls(manager, connection, on_closed)
+
+    async def _read(self):
+        try:
+            async for event in self.connection:
+                self.pending.append(event)
+        except Exception as e:
+            logger.debug("Pooled VoiceLive connection failed: %s", e)
+        self.closed = True
+        self._on_closed(self)
+
+    def expired(self, idle_ttl: float) -> bool:
+        return self.closed or time.monotonic() - self.created_at > idle_ttl
+
+    async def detach(self) -> bool:
+        """Stop the idle reader; False if the connection closed while idle."""
+        reader, self._reader = self._reader, None
+        if reader is not None:
+            reader.cancel()
+            try:
+                await reader
+            except asyncio.CancelledError:
+                pass
+        return not self.closed
+
+    async def events(self):
+        """Events received while idle, then the live connection's events."""
+        while self.pending:
+            yield self.pending.popleft()
+        async for event in self.connection:
+            yield event
+
+    async def aclose(self):
+        await self.detach()
+        self.closed = True
+        await self._manager.__aexit__(None, None, None)
+
+    async def __aenter__(self):
+        return self.connection
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+class VoiceLivePool:
+    """Keeps up to ``size`` warm VoiceLive connections for new sessions.
+
+    Runs on the shared I/O loop. ``acquire()`` returns an idle connection
+    (or None when the pool is empty, and the caller connects itself) and
+    schedules a background refill. Idle connections older than ``idle_ttl``
+    or closed by the service are discarded and replaced; failed refills back
+    off exponentially up to 30 seconds.
+    """
+
+    def __init__(self, size: int, idle_ttl: float):
+        self.size = max(0, size)
+        self.idle_ttl = idle_ttl
+        self.hits = 0
+        self.misses = 0
+        self._idle: Deque[WarmConnection] = deque()
+        self._filling = 0
+        self._failures = 0
+        self._settings: Optional[Tuple[str, Any, str, str, str]] = None
+        self._key: Optional[Tuple[str, ...]] = None
+        self._reaper: Optional[asyncio.Task] = None
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def configure(self, endpoint: str, credential, model: str, voice: str, instructions: str):
+        """Set what the pool connects with; idle connections made with other settings are dropped."""
+        key = (endpoint, getattr(credential, "key", ""), model, voice, instructions)
+        if key == self._key:
+            return
+        self._key = key
+        self._settings = (endpoint, credential, model, voice, instructions)
+        while self._idle:
+            asyncio.ensure_future(self._idle.popleft().aclose())
+        if self._reaper is None:
+            self._reaper = asyncio.ensure_future(self._reap())
+        self._refill()
+
+    async def acquire(self) -> Optional[WarmConnection]:
+        warm = None
+        while self._idle and warm is None:
+            candidate = self._idle.popleft()
+            if not candidate.expired(self.idle_ttl) and await candidate.detach():
+                warm = candidate
+            else:
+                asyncio.ensure_future(candidate.aclose())
+        if warm is not None:
+            self.hits += 1
+            POOL_ACQUIRES.inc(label_value="hit")
+        else:
+            self.misses += 1
+            POOL_ACQUIRES.inc(label_value="miss")
+        self._refill()
+        return warm
+
+    def _refill(self):
+        if self._settings is None:
+            return
+        for _ in range(self.size - len(self._idle) - self._filling):
+            self._filling += 1
+            asyncio.ensure_future(self._fill_one(self._key))
+
+    async def _fill_one(self, key):
+        try:
+            settings = cast(Tuple[str, Any, str, str, str], self._settings)
+            warm = await WarmConnection.open(*settings, on_closed=self._discard)
+        except Exception as e:
+            self._failures += 1
+            logger.warning("Could not pre-connect a VoiceLive session (attempt %d): %s", self._failures, e)
+            await asyncio.sleep(min(30.0, 0.5 * 2 ** self._failures))
+            self._filling -= 1
+            self._refill()
+            return
+        self._failures = 0
+        self._filling -= 1
+        if key != self._key or len(self._idle) >= self.size:
+            await warm.aclose()
+            return
+        self._idle.append(warm)
+
+    def _discard(self, warm: WarmConnection):
+        # Called from an idle connection's reader when the service closes it
+        if warm in self._idle:
+            self._idle.remove(warm)
+            asyncio.ensure_future(warm.aclose())
+            self._refill()
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(max(1.0, min(30.0, self.idle_ttl / 4)))
+            for warm in [w for w in self._idle if w.expired(self.idle_ttl)]:
+                self._idle.remove(warm)
+                await warm.aclose()
+            self._refill()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": self.size, "idle": len(self._idle), "filling": self._filling,
+                "hits": self.hits, "misses": self.misses}
+
+
+VOICE_POOL = VoiceLivePool(VOICE_POOL_SIZE, VOICE_POOL_IDLE_TTL_SECONDS)
+
+
+async def _prefill_voice_pool():
+    """Fill the pool at startup so the first sessions already find warm connections."""
+    ok, msg = _validate_env()
+    if not ok:
+        logger.warning("VoiceLive pool not started: %s", msg)
+        return
+    from azure.core.credentials import AzureKeyCredential
+
+    VOICE_POOL.configure(
+        cast(str, os.environ.get("AZURE_VOICE_LIVE_ENDPOINT")),
+        AzureKeyCredential(cast(str, os.environ.get("AZURE_VOICE_LIVE_API_KEY"))),
+        cast(str, os.environ.get("VOICE_LIVE_MODEL")),
+        cast(str, os.environ.get("VOICE_LIVE_VOICE")),
+        os.environ.get("VOICE_LIVE_INSTRUCTIONS") or "You are a helpful voice assistant.",
+    )
+
+
+async def _run_assistant(sess: VoiceSession):
+    """Run one session's assistant on the shared I/O loop until completion."""
     try:
-        import os
         from azure.core.credentials import AzureKeyCredential, TokenCredential
 
         endpoint = os.environ.get("AZURE_VOICE_LIVE_ENDPOINT")
@@ -403,7 +2156,7 @@ def _run_assistant_bg():
         # Validate required environment variables using helper
         ok, msg = _validate_env()
         if not ok:
-            set_state("error", msg)
+            sess.set_state("error", msg)
             return
 
         # At this point _validate_env() ensured these are present; cast for type-checkers
@@ -414,77 +2167,82 @@ def _run_assistant_bg():
         # Use API key authentication for the web app (AZURE_VOICE_LIVE_API_KEY)
         api_key = os.environ.get("AZURE_VOICE_LIVE_API_KEY")
         if not api_key:
-            set_state("error", "Missing AZURE_VOICE_LIVE_API_KEY environment variable")
+            sess.set_state("error", "Missing AZURE_VOICE_LIVE_API_KEY environment variable")
             return
         credential = AzureKeyCredential(api_key)
-        logger.info("Using API key authentication for VoiceLive (AZURE_VOICE_LIVE_API_KEY)")
+        logger.info("Using API key authentication for VoiceLive (AZURE_VOICE_LIVE_API_KEY) session=%s", sess.id)
 
         def cb(state, message):
-            set_state(state, message)
+            sess.set_state(state, message)
 
-        assistant_instance = BasicVoiceAssistant(
+        sess.assistant = BasicVoiceAssistant(
             endpoint=endpoint,
             credential=credential,
             model=model,
             voice=voice,
             instructions=instructions,
             state_callback=cb,
+            session=sess,
         )
-        assistant_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(assistant_loop)
-        assistant_loop.run_until_complete(assistant_instance.start())
-        set_state("stopped", "Session ended.")
+        warm = None
+        if VOICE_POOL.size:
+            VOICE_POOL.configure(endpoint, credential, model, voice, instructions)
+            warm = await VOICE_POOL.acquire()
+        await sess.assistant.start(warm)
+        if sess.current_state() != "error":
+            sess.set_state("stopped", "Session ended.")
+    except asyncio.CancelledError:
+        # /stop-session cancels the task; leaving the connect() context closes the socket
+        sess.set_state("stopped", "Session ended.")
+        raise
     except Exception as e:  # pragma: no cover - runtime safety
         tb = traceback.format_exc(limit=6)
-        logger.error("Assistant crashed: %s\n%s", e, tb)
-        set_state("error", f"Assistant crashed: {e}", error=tb)
-    finally:
-        try:
-            if assistant_loop and assistant_loop.is_running():
-                assistant_loop.stop()
-        except Exception:
-            pass
+        logger.error("Assistant crashed (session=%s): %s\n%s", sess.id, e, tb)
+        sess.set_state("error", f"Assistant crashed: {e}", error=tb)
 
 
 @app.post("/start-session")
 def start_session():
-    global assistant_thread
-    with state_lock:
-        if assistant_state["state"] in {"starting", "ready", "listening", "processing", "assistant_speaking"}:
-            return jsonify({"started": False, "status": assistant_state})
+    # A client may resume an existing conversation rather than opening a new one
+    existing = _get_session(_session_id_from_request())
+    if existing and existing.is_active():
+        return jsonify({"started": False, "session_id": existing.id, "status": existing.snapshot()})
 
     ok, msg = _validate_env()
     if not ok:
-        set_state("error", msg, error=msg)
-        return jsonify({"started": False, "status": assistant_state}), 400
-
-    with state_lock:
-        assistant_state["state"] = "starting"
-        assistant_state["message"] = "Starting voice session…"
-        assistant_state["last_error"] = None
-        assistant_state["connected"] = False
-
-    assistant_thread = threading.Thread(target=_run_assistant_bg, daemon=True)
-    assistant_thread.start()
-    # Ensure websocket server for low-latency audio streaming is running
-    global ws_server_thread
-    if not ws_server_thread:
-        try:
-            ws_server_thread = _start_ws_server()
-        except Exception:
-            pass
-    # Give the thread a brief moment to progress
+        return jsonify({"started": False, "status": {"state": "error", "message": msg, "last_error": msg, "connected": False}}), 400
+
+    sess = _create_session()
+    if not sess:
+        SESSIONS_REJECTED.inc()
+        msg = f"Server is at capacity ({MAX_SESSIONS} active sessions). Try again shortly."
+        return jsonify({"started": False, "status": {"state": "error", "message": msg, "last_error": msg, "connected": False}}), 503
+
+    with sess.state_lock:
+        sess.state["state"] = "starting"
+        sess.state["message"] = "Starting voice session…"
+        sess.state["last_error"] = None
+        sess.state["connected"] = False
+
+    SESSIONS_STARTED.inc()
+    # Run the assistant on the shared loop (started, with the audio websocket server, on first use)
+    loop = _ensure_io_loop()
+    sess.task = asyncio.run_coroutine_threadsafe(_run_assistant(sess), loop)
+    # Give the task a brief moment to progress
     time.sleep(0.1)
-    return jsonify({"started": True, "status": assistant_state})
+    return jsonify({"started": True, "session_id": sess.id, "status": sess.snapshot()})
 
 
 @app.post("/stop-session")
 def stop_session():
-    global assistant_instance
-    if not assistant_instance:
+    sess = _get_session(_session_id_from_request())
+    if not sess or not sess.assistant:
         return jsonify({"stopped": False, "reason": "No active session"}), 400
-    assistant_instance.request_stop()
-    set_state("stopped", "Stopping session…")
+    sess.assistant.request_stop()
+    sess.set_state("stopped", "Stopping session…")
+    # Cancel the task so the VoiceLive socket closes now rather than on the next server event
+    if sess.task:
+        sess.task.cancel()
     return jsonify({"stopped": True})
 
 
@@ -492,135 +2250,48 @@ def stop_session():
 def interrupt():
     """Request an interruption of the current assistant response.
 
-    Attempt to cancel the active response on the assistant connection. If the
-    SDK doesn't expose a cancel method, fall back to requesting a stop on the
-    assistant instance.
+    The assistant's state belongs to the shared I/O loop, so the work is
+    handed to it with ``call_soon_threadsafe`` rather than done from this
+    request thread.
     """
-    global assistant_instance, assistant_loop
-    if not assistant_instance or not assistant_loop:
+    sess = _get_session(_session_id_from_request())
+    if not sess or not sess.assistant or not io_loop:
         return jsonify({"interrupted": False, "reason": "No active session"}), 400
     try:
-        # Mark response cancelled on the assistant instance immediately so the
-        # event loop will suppress broadcasting further RESPONSE_AUDIO_DELTA events
-        try:
-            if assistant_instance:
-                assistant_instance._response_cancelled = True
-        except Exception:
-            pass
-
-        # Immediately instruct connected clients to stop any pending playback
-        _broadcast({"type": "log", "level": "debug", "msg": f"Interrupt requested: broadcasting stop_playback at {time.time()}"})
-        _broadcast({"type": "control", "action": "stop_playback"})
-
-        # Also, stop assistant playback on the server-side audio processor (if present)
-        try:
-            ap = getattr(assistant_instance, 'connection', None)
-            # The assistant_instance in this design doesn't own the audio processor when
-            # running in the flask app variant; instead we attempt to stop playback via
-            # any audio processor attached to assistant_instance (if available).
-            ap_obj = getattr(assistant_instance, 'audio_processor', None)
-            if ap_obj and hasattr(ap_obj, 'stop_playback') and assistant_loop:
-                try:
-                    # Schedule stop_playback to run promptly on the assistant loop
-                    asyncio.run_coroutine_threadsafe(ap_obj.stop_playback(), assistant_loop)
-                except Exception:
-                    pass
-        except Exception:
-            pass
-
-        # Schedule the SDK-level cancel immediately on the assistant loop for low latency
-        try:
-            conn = getattr(assistant_instance, "connection", None)
-            resp = getattr(conn, "response", None) if conn else None
-            if resp and hasattr(resp, "cancel") and assistant_loop:
-                try:
-                    asyncio.run_coroutine_threadsafe(resp.cancel(), assistant_loop)
-                    _broadcast({"type": "log", "level": "info", "msg": "Interrupt scheduled (cancel)"})
-                except Exception as e:
-                    _broadcast({"type": "log", "level": "error", "msg": f"Failed to schedule cancel(): {e}"})
-            else:
-                _broadcast({"type": "log", "level": "warn", "msg": "No response.cancel() available; cannot perform graceful interrupt via SDK."})
-        except Exception as e:
-            _broadcast({"type": "log", "level": "error", "msg": f"Interrupt handler exception: {e}"})
-
-        return jsonify({"interrupted": True})
-    except Exception as e:
+        io_loop.call_soon_threadsafe(sess.assistant.interrupt, time.perf_counter())
+    except RuntimeError as e:  # the loop has shut down
         return jsonify({"interrupted": False, "reason": str(e)}), 500
-
-
-@app.post("/audio-chunk")
-def audio_chunk():
-    """Receive base64 PCM16 (24kHz mono) audio from browser."""
-    global assistant_instance, assistant_loop
-    if not assistant_instance or not assistant_loop:
-        return jsonify({"accepted": False, "reason": "No active session"}), 400
-    try:
-        payload = request.get_json(silent=True) or {}
-        audio_b64 = payload.get("audio")
-        if not audio_b64:
-            return jsonify({"accepted": False, "reason": "Missing audio field"}), 400
-        # Schedule append inside assistant loop
-        inst = assistant_instance
-        if not inst:
-            return jsonify({"accepted": False, "reason": "Assistant not ready"}), 503
-        def _task():
-            return asyncio.create_task(inst.append_audio(audio_b64))
-        assistant_loop.call_soon_threadsafe(_task)
-        return jsonify({"accepted": True})
-    except Exception as e:  # pragma: no cover
-        return jsonify({"accepted": False, "reason": str(e)}), 500
-
-
-@app.get("/events")
-def sse_events():
-    """Server-Sent Events stream for status + audio."""
-    q: "queue.Queue[str]" = queue.Queue()
-    with _sse_clients_lock:
-        _sse_clients.append(q)
-
-    # Send current state immediately
-    q.put_nowait(
-        "data: "
-        + json.dumps(
-            {
-                "type": "status",
-                "state": assistant_state["state"],
-                "message": assistant_state["message"],
-                "last_error": assistant_state.get("last_error"),
-                "connected": assistant_state.get("connected"),
-            }
-        )
-        + "\n\n"
-    )
-
-    def gen():
-        try:
-            while True:
-                msg = q.get()
-                yield msg
-        except GeneratorExit:  # client disconnected
-            with _sse_clients_lock:
-                if q in _sse_clients:
-                    _sse_clients.remove(q)
-
-    return Response(gen(), mimetype="text/event-stream")
-
-
-@app.get("/status")
-def status():
-    with state_lock:
-        return jsonify(assistant_state)
-
-
-@app.get("/health")
-def health():
-    with state_lock:
-        return jsonify({
-            "ok": assistant_state.get("state") not in {"error"},
-            "state": assistant_state.get("state"),
-            "connected": assistant_state.get("connected"),
-            "has_connection_obj": bool(assistant_instance and getattr(assistant_instance, 'connection', None)),
-        }), 200
+    return jsonify({"interrupted": True})
+
+
+def _status_payload(session_id: Optional[str]) -> Tuple[Dict[str, Any], int]:
+    """One session's state, or a summary of all sessions when no id is given."""
+    if session_id:
+        sess = _get_session(session_id)
+        if not sess:
+            return {"reason": "Unknown session"}, 404
+        return sess.snapshot(), 200
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+    return {
+        "sessions": len(sessions),
+        "active_sessions": sum(1 for sess in sessions if sess.is_active()),
+        "max_sessions": MAX_SESSIONS,
+        "turn_latency": TURN_TRACER.summary(),
+        "pool": VOICE_POOL.stats(),
+    }, 200
+
+
+def _health_payload() -> Dict[str, Any]:
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+    return {
+        "ok": True,
+        "sessions": len(sessions),
+        "active_sessions": sum(1 for sess in sessions if sess.is_active()),
+        "errored_sessions": sum(1 for sess in sessions if sess.current_state() == "error"),
+        "connected_sessions": sum(1 for sess in sessions if sess.assistant and getattr(sess.assistant, 'connection', None)),
+    }
 
 
 @app.get("/")
@@ -631,8 +2302,6 @@ def index():
     so the developer or tester can confirm configuration in the browser.
     Values are displayed as the variable value or "(not set)" when missing.
     """
-    import os
-
     env = {
         "VOICE_LIVE_MODEL": os.environ.get("VOICE_LIVE_MODEL") or "(not set)",
         "VOICE_LIVE_VOICE": os.environ.get("VOICE_LIVE_VOICE") or "(not set)",
@@ -646,13 +2315,26 @@ def index():
 
 
 def main() -> None:
-    # Basic dev server; in production consider a WSGI/ASGI server like gunicorn or uvicorn.
-    import os
+    """Serve the page, the Flask routes and the streaming routes on one port.
+
+    The server runs on the shared I/O loop, so ``/events`` and ``/ws-audio``
+    are same-origin with the page and each listener is a coroutine rather than
+    a server thread.
+    """
     host = os.environ.get("HOST", "0.0.0.0")
     port = int(os.environ.get("PORT", os.environ.get("FLASK_RUN_PORT", "5000")))
-    debug_env = os.environ.get("FLASK_DEBUG", os.environ.get("DEBUG", "0"))
-    debug = bool(int(debug_env)) if str(debug_env).isdigit() else debug_env.lower() in ("1", "true", "yes")
-    app.run(host=host, port=port, debug=debug)
+    # `docker stop` sends SIGTERM; exit through the finally below instead of being killed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    loop = _ensure_io_loop()
+    asyncio.run_coroutine_threadsafe(_start_io_server(host, port), loop).result(timeout=10)
+    logger.info("Serving on http://%s:%d", host, port)
+    try:
+        cast(threading.Thread, io_thread).join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Wait for turn traces still queued for VOICE_TRACE_FILE
+        TURN_TRACER.close()
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -14,10 +14,14 @@ const logEl = document.getElementById('log');
 
 // Audio configuration
 const TARGET_RATE = 24000;
+// Add ?serverResample to the page URL to send native-rate float32 over the audio websocket
+// and let the server convert it, instead of resampling here
+const SERVER_RESAMPLE = new URLSearchParams(location.search).has('serverResample');
 const CHUNK_DURATION_MS = 150;
 const MAX_LOG_LINES = 250;
 
 // Connection state
+let sessionId = sessionStorage.getItem('voiceSessionId');
 let eventSource = null;
 let wsAudio = null;
 let stopped = false;
@@ -57,7 +61,7 @@ function updateStatusUI(data){
   statusMsg.textContent = data.message || '';
   const s = data.state;
   let colorVar = 'var(--c-status-idle)';
-  if(['starting','processing'].includes(s)) colorVar = 'var(--c-status-processing)';
+  if(['starting','processing','reconnecting'].includes(s)) colorVar = 'var(--c-status-processing)';
   else if(s === 'assistant_speaking') colorVar = 'var(--c-status-speaking)';
   else if(s === 'listening') colorVar = 'var(--c-status-listening)';
   else if(s === 'error') colorVar = 'var(--c-status-error)';
@@ -93,9 +97,13 @@ setInterval(()=>{
 // =============================
 function openEventSource(){
   if(eventSource){ eventSource.close(); }
-  eventSource = new EventSource('/events');
-  eventSource.onmessage = handleSSEMessage;
-  eventSource.onerror = () => log('SSE connection error (will retry if closed).','warn');
+  if(!sessionId) return;
+  const es = new EventSource('/events?session=' + encodeURIComponent(sessionId));
+  es.onmessage = handleSSEMessage;
+  es.onerror = () => {
+    log('SSE connection error (will retry if closed).','warn');
+  };
+  eventSource = es;
   log('SSE connection opened');
 }
 
@@ -136,6 +144,7 @@ function handleStatusUpdate(data) {
   }
 }
 
+// Base64 audio over SSE is only used when the audio websocket is unavailable
 function handleAudioData(data) {
   if(suspendPlayback) {
     return; // Drop audio while playback suspended
@@ -144,6 +153,7 @@ function handleAudioData(data) {
 }
 
 function handleControlEvent(data) {
+  // stop_playback may arrive on both SSE and the audio websocket; stopping twice is harmless
   if(data.action === 'stop_playback'){
     try { stopAllAssistantPlayback(); } catch(_){ }
     suspendPlayback = true;
@@ -157,14 +167,30 @@ function handleControlEvent(data) {
 
 function openAudioWebSocket(){
   try{
-    const wsUrl = (location.protocol === 'https:' ? 'wss://' : 'ws://') + location.hostname + ':8765/ws-audio';
+    let wsUrl = (location.protocol === 'https:' ? 'wss://' : 'ws://') + location.host + '/ws-audio?session=' + encodeURIComponent(sessionId);
+    if(SERVER_RESAMPLE){
+      ensureAudioContext();
+      wsUrl += '&format=float32&channels=1&rate=' + inputSampleRate;
+    }
     wsAudio = new WebSocket(wsUrl);
     wsAudio.binaryType = 'arraybuffer';
     wsAudio.onopen = () => log('Audio websocket opened','debug');
+    wsAudio.onmessage = handleAudioSocketMessage;
     wsAudio.onerror = (e) => { log('Audio websocket error','warn'); wsAudio = null; };
     wsAudio.onclose = () => { log('Audio websocket closed','debug'); wsAudio = null; };
   }catch(e){ wsAudio = null; }
 }
+// Assistant audio arrives as raw PCM16 binary frames; control events as JSON text frames
+function handleAudioSocketMessage(ev){
+  if(typeof ev.data === 'string'){
+    try { handleControlEvent(JSON.parse(ev.data)); }
+    catch(e){ log('Bad audio socket message: '+ e,'error'); }
+    return;
+  }
+  if(suspendPlayback) return; // Drop audio while playback suspended
+  playPcm16Buffer(ev.data);
+}
+
 function ensureAudioContext(){
   if(!audioContext){
     audioContext = new (window.AudioContext || window.webkitAudioContext)({sampleRate: 48000});
@@ -260,6 +286,11 @@ function int16ToBase64(int16){
 function flushPendingAudio(){
   const merged = mergePendingFloat();
   if(!merged || !merged.length) return;
+  if(SERVER_RESAMPLE && wsAudio && wsAudio.readyState === WebSocket.OPEN){
+    // Float32Array is little-endian on every browser platform
+    try { wsAudio.send(merged.buffer); return; }
+    catch(e){ /* fall through to the converted paths */ }
+  }
   const int16 = downsampleToInt16(merged, inputSampleRate, TARGET_RATE);
   if(!int16) return;
   // Prefer binary websocket if available
@@ -277,7 +308,7 @@ function flushPendingAudio(){
 
 async function sendAudioChunk(b64){
   try {
-    const r = await fetch('/audio-chunk', { method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({audio: b64}) });
+    const r = await fetch('/audio-chunk', { method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({session_id: sessionId, audio: b64}) });
     if(!r.ok){
       if(r.status === 400) {
         log('Audio chunk rejected: '+ r.status,'warn');
@@ -297,12 +328,16 @@ setInterval(()=>{ if(capturing) flushPendingAudio(); }, 500);
 // ASSISTANT AUDIO PLAYBACK
 // =============================
 function playAssistantPcm16(b64){
+  const binary = atob(b64);
+  const bytes = new Uint8Array(binary.length);
+  for(let i=0;i<binary.length;i++) bytes[i] = binary.charCodeAt(i);
+  playPcm16Buffer(bytes.buffer);
+}
+
+function playPcm16Buffer(buffer){
   try {
     ensureAudioContext();
-    const binary = atob(b64);
-    const bytes = new Uint8Array(binary.length);
-    for(let i=0;i<binary.length;i++) bytes[i] = binary.charCodeAt(i);
-    const view = new DataView(bytes.buffer);
+    const view = new DataView(buffer);
     const samples = view.byteLength / 2;
     const floatBuf = new Float32Array(samples);
     for(let i=0;i<samples;i++){
@@ -351,7 +386,7 @@ async function startSession(){
   setSessionButtonState('starting');
   
   try {
-    const response = await fetch('/start-session', {method:'POST'});
+    const response = await fetch('/start-session', {method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({session_id: sessionId})});
     const result = await response.json();
     
     if(!response.ok){
@@ -359,7 +394,8 @@ async function startSession(){
       return;
     }
     
-    // Session started successfully
+    // Session started successfully (or an existing one for this tab was resumed)
+    setSessionId(result.session_id);
     updateStatusUI(result.status || result);
     openEventSource();
     openAudioWebSocket();
@@ -375,14 +411,23 @@ async function stopSession(){
   log('Stopping session…');
   
   // Stop server session
-  try { await fetch('/stop-session', {method:'POST'}); } catch(_){ }
+  try {
+    await fetch('/stop-session', {method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({session_id: sessionId})});
+  } catch(_){ }
   
   // Clean up connections
   closeConnections();
+  setSessionId(null);
   stopMicCapture();
   updateStatusUI({state:'stopped', message:'Session stopped.'});
 }
 
+function setSessionId(id) {
+  sessionId = id || null;
+  if(sessionId) sessionStorage.setItem('voiceSessionId', sessionId);
+  else sessionStorage.removeItem('voiceSessionId');
+}
+
 function setSessionButtonState(state) {
   if(state === 'starting') {
     startBtn.disabled = true;
@@ -414,5 +459,8 @@ startBtn.addEventListener('click', startSession);
 stopBtn.addEventListener('click', stopSession);
 window.addEventListener('beforeunload', closeConnections);
 
-// Passive init (establish SSE early for existing session)
-openEventSource();
\ No newline at end of file
+// Passive init (re-attach to this tab's session after a page reload)
+if(sessionId){
+  openEventSource();
+  openAudioWebSocket();
+}
\ No newline at end of file
@@ -0,0 +1,23 @@
+import asyncio
+import inspect
+
+import pytest
+
+import flask_app
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """Run ``async def`` tests to completion on a fresh event loop."""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """An empty session registry for the duration of one test."""
+    monkeypatch.setattr(flask_app, "_sessions", {})
+    return flask_app._sessions
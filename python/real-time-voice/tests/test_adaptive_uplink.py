@@ -0,0 +1,79 @@
+import asyncio
+import base64
+
+from flask_app import AUDIO_BYTES_PER_SAMPLE, AUDIO_SAMPLE_RATE, UPLINK_BATCH_MS, AdaptiveUplink
+
+
+def pcm(ms: float, value: int = 0) -> bytes:
+    return bytes([value]) * (int(AUDIO_SAMPLE_RATE * ms / 1000) * AUDIO_BYTES_PER_SAMPLE)
+
+
+class Recorder:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def __call__(self, audio_b64: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(base64.b64decode(audio_b64))
+
+
+async def test_fast_link_keeps_coalescing_frames():
+    link = Recorder()
+    uplink = AdaptiveUplink(link)  # defaults: VOICE_UPLINK_BATCH_MS is the floor
+    for _ in range(60):  # ~43 ms frames, like the console's 1024-sample reads
+        uplink.feed(pcm(42.7))
+        await asyncio.sleep(0)
+    await uplink.aclose()
+
+    assert uplink.target_ms >= UPLINK_BATCH_MS
+    stats = uplink.stats()
+    # Every append carries several frames; none goes out on its own
+    assert stats["frames_in"] >= 2.5 * stats["batches"]
+    assert all(len(batch) >= len(pcm(UPLINK_BATCH_MS)) for batch in link.sent[:-1])
+
+
+async def test_slow_sends_grow_the_target_up_to_max():
+    uplink = AdaptiveUplink(Recorder(delay=0.02), min_ms=20, max_ms=80, max_latency_ms=1000)
+    for _ in range(30):
+        uplink.feed(pcm(20))
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(0.1)
+    await uplink.aclose()
+    assert uplink.target_ms == 80
+
+
+async def test_target_never_shrinks_below_the_largest_frame():
+    uplink = AdaptiveUplink(Recorder(), min_ms=20, max_ms=400, max_latency_ms=1000)
+    uplink.target_ms = 300.0
+    for _ in range(40):
+        uplink.feed(pcm(150))
+        await asyncio.sleep(0)
+    await uplink.aclose()
+    assert 150 <= uplink.target_ms < 300
+
+
+async def test_partial_batch_is_sent_when_the_latency_budget_expires():
+    link = Recorder()
+    uplink = AdaptiveUplink(link, min_ms=400, max_ms=400, max_latency_ms=20)
+    uplink.feed(pcm(10, value=1))
+    await asyncio.sleep(0.05)
+    await uplink.aclose()
+    assert link.sent == [pcm(10, value=1)]
+    assert uplink.deadline_flushes == 1
+
+
+async def test_hold_keeps_only_the_newest_audio_until_release():
+    link = Recorder()
+    uplink = AdaptiveUplink(link, min_ms=100, max_ms=100, max_latency_ms=1000)
+    uplink.hold(max_bytes=len(pcm(200)))
+    for value in range(1, 5):
+        uplink.feed(pcm(100, value=value))
+    await asyncio.sleep(0.01)
+    assert link.sent == []
+    uplink.release()
+    await asyncio.sleep(0.01)
+    await uplink.aclose()
+    assert link.sent == [pcm(100, value=3), pcm(100, value=4)]
+    assert uplink.held_dropped_bytes == len(pcm(200))
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import flask_app
+from flask_app import AudioSocketWriter
+
+
+class FakeSocket:
+    """Records frames; ``stalled`` makes every send wait forever like an unread tab."""
+
+    def __init__(self, stalled: bool = False):
+        self.stalled = stalled
+        self.frames = []
+        self.closed = False
+
+    async def send_bytes(self, data):
+        await self._send(data)
+
+    async def send_str(self, data):
+        await self._send(data)
+
+    async def _send(self, data):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.frames.append(data)
+
+    async def close(self):
+        self.closed = True
+
+
+async def test_frames_are_sent_in_order():
+    ws = FakeSocket()
+    writer = AudioSocketWriter(ws, maxsize=8)
+    assert writer.offer(b"a")
+    assert writer.offer('{"type": "control"}')
+    assert writer.offer(b"b")
+    await asyncio.sleep(0.01)
+    writer.close()
+    assert ws.frames == [b"a", '{"type": "control"}', b"b"]
+    assert writer.stats()["sent"] == 3 and writer.stats()["dropped"] == 0
+
+
+async def test_overflow_drops_oldest_audio_and_keeps_control():
+    writer = AudioSocketWriter(FakeSocket(stalled=True), maxsize=3)
+    await asyncio.sleep(0)  # writer takes nothing: its first send never completes
+    writer.offer(b"1")
+    await asyncio.sleep(0)  # b"1" is now stuck in the stalled send
+    for frame in (b"2", "ctl", b"3", b"4"):
+        assert writer.offer(frame)
+    assert list(writer._items) == [("ctl", None), b"3", b"4"]
+    assert writer.dropped == 1
+    writer.close()
+
+
+async def test_queue_full_of_control_frames_closes_the_socket():
+    ws = FakeSocket(stalled=True)
+    writer = AudioSocketWriter(ws, maxsize=2)
+    assert [writer.offer(frame) for frame in ("c1", "c2", "c3")] == [True, True, False]
+    await asyncio.sleep(0)
+    assert writer.closed and ws.closed
+    assert writer.offer(b"late") is False
+
+
+async def test_flush_audio_discards_queued_audio_only():
+    writer = AudioSocketWriter(FakeSocket(stalled=True), maxsize=8)
+    for frame in (b"1", "ctl", b"2"):
+        writer.offer(frame)
+    writer.offer("stop", flush_audio=True)
+    assert list(writer._items) == [("ctl", None), ("stop", None)]
+    writer.close()
+
+
+async def test_interrupt_is_timed_until_the_stop_frame_is_written(monkeypatch):
+    histogram = flask_app.Histogram("test_interrupt_seconds", "test", (1.0,))
+    monkeypatch.setattr(flask_app, "INTERRUPT_SECONDS", histogram)
+    stalled, healthy = FakeSocket(stalled=True), FakeSocket()
+    writers = [AudioSocketWriter(stalled, maxsize=4), AudioSocketWriter(healthy, maxsize=4)]
+    for writer in writers:
+        writer.offer("stop", flush_audio=True, interrupt_started=time.perf_counter())
+    await asyncio.sleep(0.01)
+    for writer in writers:
+        writer.close()
+
+    # Only the socket that actually wrote the stop frame is counted
+    assert healthy.frames == ["stop"] and stalled.frames == []
+    assert sum(histogram._counts) == 1
+
+
+async def test_session_send_never_waits_on_a_stalled_socket():
+    sess = flask_app.VoiceSession("test")
+    stalled, healthy = FakeSocket(stalled=True), FakeSocket()
+    sess.audio_sockets = {AudioSocketWriter(stalled, maxsize=4), AudioSocketWriter(healthy, maxsize=4)}
+    for i in range(20):
+        assert sess.send_audio(bytes([i]))
+        await asyncio.sleep(0)
+    sess.send_control({"type": "control", "action": "stop_playback"})
+    await asyncio.sleep(0.01)
+    for writer in sess.audio_sockets:
+        writer.close()
+
+    assert healthy.frames[:20] == [bytes([i]) for i in range(20)]
+    assert healthy.frames[-1] == '{"type": "control", "action": "stop_playback"}'
@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+from azure.ai.voicelive.models import ServerEventType
+
+from flask_app import EventDispatcher
+
+
+def event(kind):
+    return SimpleNamespace(type=kind)
+
+
+async def test_events_go_to_their_handler_or_the_default():
+    seen = []
+
+    async def on_delta(e):
+        seen.append(("delta", e.type))
+
+    async def fallback(e):
+        seen.append(("default", e.type))
+
+    dispatcher = EventDispatcher(default=fallback)
+    dispatcher.register(ServerEventType.RESPONSE_AUDIO_DELTA, on_delta)
+
+    # The SDK's enum members compare equal to their string values
+    assert await dispatcher.dispatch(event(ServerEventType.RESPONSE_AUDIO_DELTA))
+    assert await dispatcher.dispatch(event("response.audio.delta"))
+    assert not await dispatcher.dispatch(event(ServerEventType.SESSION_CREATED))
+    assert seen == [("delta", ServerEventType.RESPONSE_AUDIO_DELTA), ("delta", "response.audio.delta"),
+                    ("default", ServerEventType.SESSION_CREATED)]
+
+
+async def test_stats_time_every_event_type_busiest_first():
+    async def slow(e):
+        await asyncio.sleep(0.02)
+
+    async def fast(e):
+        pass
+
+    dispatcher = EventDispatcher()
+    dispatcher.register(ServerEventType.RESPONSE_AUDIO_DELTA, fast)
+    dispatcher.register(ServerEventType.RESPONSE_DONE, slow)
+
+    for _ in range(3):
+        await dispatcher.dispatch(event(ServerEventType.RESPONSE_AUDIO_DELTA))
+    await dispatcher.dispatch(event(ServerEventType.RESPONSE_DONE))
+    await dispatcher.dispatch(event(ServerEventType.ERROR))  # unhandled, still counted
+
+    stats = dispatcher.stats()
+    assert list(stats)[0] == "response.done"
+    assert stats["response.done"]["max_ms"] >= 15
+    assert stats["response.audio.delta"]["count"] == 3 and stats["error"]["count"] == 1
+
+    dispatcher.unregister(ServerEventType.RESPONSE_DONE)
+    dispatcher.reset_stats()
+    assert dispatcher.stats() == {}
+    assert not await dispatcher.dispatch(event(ServerEventType.RESPONSE_DONE))
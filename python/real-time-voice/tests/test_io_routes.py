@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+import flask_app
+
+
+class FakeAssistant:
+    """Records appended audio and the loop each one ran on."""
+
+    def __init__(self):
+        self.appended = []
+        self.loops = set()
+
+    async def append_audio(self, audio):
+        self.loops.add(asyncio.get_running_loop())
+        self.appended.append(bytes(audio))
+
+
+def audio_server():
+    app = web.Application()
+    app.router.add_get("/ws-audio", flask_app._handle_audio_websocket)
+    return TestServer(app)
+
+
+def events_server():
+    app = web.Application()
+    app.router.add_get("/events", flask_app._handle_events)
+    return TestServer(app)
+
+
+async def next_event(response):
+    """Read SSE frames until one carries data, skipping keepalive comments."""
+    while True:
+        frame = await asyncio.wait_for(response.content.readuntil(b"\n\n"), 5)
+        if frame.startswith(b"data: "):
+            return json.loads(frame[len(b"data: "):])
+
+
+async def test_binary_frames_are_appended_to_their_own_session(registry):
+    sess, other = flask_app._create_session(), flask_app._create_session()
+    sess.assistant, other.assistant = FakeAssistant(), FakeAssistant()
+    frames = [bytes([i, 0]) * 240 for i in range(5)]
+
+    async with TestClient(audio_server()) as client:
+        ws = await client.ws_connect(f"/ws-audio?session={sess.id}")
+        for frame in frames:
+            await ws.send_bytes(frame)
+        await ws.close()
+
+    assert b"".join(sess.assistant.appended) == b"".join(frames)
+    # Appends run on the loop serving the socket, with no hop to another thread
+    assert sess.assistant.loops == {asyncio.get_running_loop()}
+    assert other.assistant.appended == []
+
+
+async def test_unknown_session_is_not_upgraded(registry):
+    async with TestClient(audio_server()) as client:
+        response = await client.get("/ws-audio?session=unknown")
+        assert response.status == 404
+
+
+async def test_an_unsupported_rate_is_refused_before_the_upgrade(registry, monkeypatch):
+    built = []
+    monkeypatch.setattr(flask_app, "PolyphaseResampler", lambda *args: built.append(args))
+    sess = flask_app._create_session()
+    async with TestClient(audio_server()) as client:
+        response = await client.get(f"/ws-audio?session={sess.id}&rate=191999")
+        assert response.status == 400
+    assert built == []
+
+
+async def test_events_stream_status_keepalives_and_broadcasts(registry, monkeypatch):
+    monkeypatch.setattr(flask_app, "SSE_KEEPALIVE_SECONDS", 0.05)
+    sess = flask_app._create_session()
+
+    async with TestClient(events_server()) as client:
+        response = await client.get(f"/events?session={sess.id}")
+        assert response.status == 200 and response.headers["Content-Type"] == "text/event-stream"
+        assert await response.content.readuntil(b"\n\n") == f"retry: {flask_app.SSE_RETRY_MS}\n\n".encode()
+        assert (await next_event(response))["state"] == "idle"
+        # Nothing to send: the stream stays alive with comment lines
+        assert await asyncio.wait_for(response.content.readuntil(b"\n\n"), 5) == b": keepalive\n\n"
+
+        sess.broadcast({"type": "log", "msg": "hello"})
+        assert (await next_event(response))["msg"] == "hello"
+        assert len(sess.sse_clients) == 1
+
+        # A listener that goes away is unsubscribed by the next keepalive at the latest
+        response.close()
+        for _ in range(100):
+            if not sess.sse_clients:
+                break
+            await asyncio.sleep(0.01)
+        assert sess.sse_clients == []
+
+
+async def test_events_for_an_unknown_session_are_not_found(registry):
+    async with TestClient(events_server()) as client:
+        response = await client.get("/events?session=unknown")
+        assert response.status == 404
+
+
+async def test_one_port_serves_async_routes_and_flask_routes(registry):
+    sess = flask_app._create_session()
+    async with TestClient(TestServer(flask_app._build_io_app())) as client:
+        status = await client.get(f"/status?session={sess.id}")
+        assert (await status.json())["session_id"] == sess.id
+        assert (await (await client.get("/status")).json())["sessions"] == 1
+        assert (await client.get("/status?session=unknown")).status == 404
+        assert (await client.get("/events?session=unknown")).status == 404
+
+        # Flask routes run through the WSGI bridge with the body and headers intact
+        page = await client.get("/")
+        assert page.status == 200 and "text/html" in page.headers["Content-Type"]
+        stop = await client.post("/stop-session", json={"session_id": sess.id})
+        assert stop.status == 400 and await stop.json() == {"stopped": False, "reason": "No active session"}
+        by_header = await client.post("/interrupt", headers={"X-Session-Id": "unknown"})
+        assert by_header.status == 400
+        assert (await client.get("/no-such-page")).status == 404
+
+
+async def test_interrupt_runs_on_the_io_loop(registry, monkeypatch):
+    loop_thread = threading.get_ident()
+    cancelled_on = []
+
+    async def cancel():
+        cancelled_on.append(threading.get_ident())
+
+    monkeypatch.setattr(flask_app, "io_loop", asyncio.get_running_loop())
+    sess = flask_app._create_session()
+    sess.assistant = flask_app.BasicVoiceAssistant("wss://example", None, "model", "alloy", "", session=sess)
+    sess.assistant.connection = SimpleNamespace(response=SimpleNamespace(cancel=cancel))
+    client_events = sess.subscribe(asyncio.get_running_loop())
+
+    async with TestClient(TestServer(flask_app._build_io_app())) as client:
+        response = await client.post("/interrupt", json={"session_id": sess.id})
+        assert await response.json() == {"interrupted": True}
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+    # The Flask handler ran on an executor thread; the cancel was handed to the loop
+    assert cancelled_on == [loop_thread] and sess.assistant._response_cancelled
+    assert any('"stop_playback"' in frame for _, frame in client_events._items)
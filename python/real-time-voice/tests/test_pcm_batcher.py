@@ -0,0 +1,30 @@
+import base64
+
+from flask_app import PCMBatcher
+
+
+def test_batch_size_follows_batch_ms():
+    assert PCMBatcher(batch_ms=100, sample_rate=24000).batch_bytes == 4800
+    batcher = PCMBatcher(batch_ms=100, sample_rate=24000)
+    batcher.set_batch_ms(0)
+    assert batcher.batch_bytes == 2  # never below one sample
+
+
+def test_frames_are_coalesced_in_order():
+    batcher = PCMBatcher(batch_ms=1, sample_rate=24000)  # 48 bytes
+    frames = [bytes([i]) * 20 for i in range(3)]
+    assert [batcher.push(frame) for frame in frames] == [False, False, True]
+    assert batcher.pending_bytes == 60
+
+    assert base64.b64decode(batcher.take_base64()) == b"".join(frames)
+    assert batcher.pending_bytes == 0 and batcher.take_base64() is None
+    assert (batcher.frames_in, batcher.batches_out, batcher.bytes_out) == (3, 1, 60)
+
+
+def test_buffer_grows_for_oversized_frames_and_is_reused():
+    batcher = PCMBatcher(batch_ms=1, sample_rate=24000)
+    big = bytes(range(256)) * 2
+    assert batcher.push(memoryview(big))
+    assert base64.b64decode(batcher.take_base64()) == big
+    batcher.push(b"\x01\x02")
+    assert base64.b64decode(batcher.take_base64()) == b"\x01\x02"
@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import azure.ai.voicelive.aio
+
+import flask_app
+from flask_app import BasicVoiceAssistant
+
+
+class FakeConnection:
+    """Ends its event stream the way ``outcome`` says.
+
+    ``"close"`` is a normal close frame from the service, ``"drop"`` a lost
+    socket (which the SDK also ends quietly), and an exception is raised
+    from the stream.
+    """
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.session = SimpleNamespace(update=self._update)
+        closed_normally = outcome == "close"
+        self._connection = SimpleNamespace(_closing=closed_normally, close_code=1000 if closed_normally else 1006)
+
+    async def _update(self, session):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        raise StopAsyncIteration
+
+
+async def run_session(monkeypatch, *outcomes):
+    """Run an assistant whose successive connections end with ``outcomes``; returns states and connects."""
+    remaining = list(outcomes)
+    connects = []
+
+    def connect(**kwargs):
+        connects.append(kwargs)
+        return FakeConnection(remaining.pop(0))
+
+    monkeypatch.setattr(azure.ai.voicelive.aio, "connect", connect)
+    monkeypatch.setattr(flask_app, "RECONNECT_BASE_DELAY_SECONDS", 0)
+    monkeypatch.setattr(flask_app, "RECONNECT_ATTEMPTS", 2)
+    states = []
+    assistant = BasicVoiceAssistant("wss://example", None, "model", "alloy", "Be brief.",
+                                    state_callback=lambda state, message: states.append(state))
+    await assistant.start()
+    return states, len(connects)
+
+
+async def test_a_normal_close_ends_the_session_without_reconnecting(monkeypatch):
+    states, connects = await run_session(monkeypatch, "close")
+    assert connects == 1 and states == []
+
+
+async def test_errors_and_dropped_sockets_reconnect(monkeypatch):
+    states, connects = await run_session(monkeypatch, ConnectionError("reset"), "drop", "close")
+    assert connects == 3
+    assert states == ["reconnecting", "reconnecting"]
+
+
+async def test_reconnecting_gives_up_after_the_attempt_limit(monkeypatch):
+    states, connects = await run_session(monkeypatch, "drop", "drop", ConnectionError("reset"))
+    assert connects == 3
+    assert states == ["reconnecting", "reconnecting", "error"]
+
+
+def test_only_a_normal_close_frame_counts_as_normal():
+    def conn(closing, code):
+        return SimpleNamespace(_connection=SimpleNamespace(_closing=closing, close_code=code))
+
+    assert flask_app._closed_normally(conn(True, 1000))
+    assert not flask_app._closed_normally(conn(True, 1011))
+    # aiohttp reports an EOF without a close frame as 1000 but never marks it closing
+    assert not flask_app._closed_normally(conn(False, 1000))
+    assert not flask_app._closed_normally(SimpleNamespace())
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import flask_app
+from flask_app import INPUT_SAMPLE_RATES, InputAudioConverter, PolyphaseResampler
+
+
+def tone(freq, rate, seconds=0.5, amplitude=0.5):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def rms(x):
+    return float(np.sqrt(np.mean(np.square(x, dtype=np.float64))))
+
+
+@pytest.mark.parametrize("in_rate", [8000, 16000, 44100, 48000])
+def test_output_length_follows_the_ratio(in_rate):
+    out = PolyphaseResampler(in_rate, 24000).process(tone(440, in_rate, seconds=1.0))
+    assert abs(out.size - 24000) <= 1
+
+
+def test_blocks_resample_as_one_continuous_signal():
+    signal = tone(1000, 48000)
+    whole = PolyphaseResampler(48000, 24000).process(signal)
+    chunked_resampler = PolyphaseResampler(48000, 24000)
+    # Uneven block sizes, including blocks too short to produce any output
+    chunks, start = [], 0
+    for size in [1, 479, 960, 3, 2000, 7000, 100_000]:
+        chunks.append(chunked_resampler.process(signal[start:start + size]))
+        start += size
+    np.testing.assert_allclose(np.concatenate(chunks), whole, atol=1e-6)
+
+
+def test_passband_tone_keeps_its_level_and_aliases_are_rejected():
+    passband = PolyphaseResampler(48000, 24000).process(tone(1000, 48000))
+    assert rms(passband[200:]) == pytest.approx(rms(tone(1000, 48000)), rel=0.02)
+    # 20 kHz is above the 12 kHz output Nyquist and would fold to 4 kHz unfiltered
+    aliased = PolyphaseResampler(48000, 24000).process(tone(20000, 48000))
+    assert rms(aliased[200:]) < 0.01 * rms(tone(20000, 48000))
+
+
+def test_target_format_passes_through():
+    converter = InputAudioConverter()
+    data = bytes(range(10))
+    assert converter.passthrough and converter.convert(data) == data
+
+
+def test_stereo_float_is_mixed_resampled_and_split_samples_wait():
+    converter = InputAudioConverter(48000, "float32", 2)
+    left = tone(1000, 48000)
+    stereo = np.stack([left, left], axis=1).astype("<f4").tobytes()
+    # 1001-byte frames end mid-sample (a stereo float32 frame is 8 bytes)
+    out = b"".join(converter.convert(stereo[i:i + 1001]) for i in range(0, len(stereo), 1001))
+    pcm = np.frombuffer(out, dtype="<i2").astype(np.float32) / 32768.0
+    assert abs(pcm.size - left.size // 2) <= 1
+    assert rms(pcm[200:]) == pytest.approx(rms(left), rel=0.02)
+
+
+def test_from_query_validates_the_declared_format():
+    converter = InputAudioConverter.from_query({"rate": "16000", "format": "INT16", "channels": "2"})
+    assert (converter.rate, converter.sample_format, converter.channels) == (16000, "int16", 2)
+    for query in [{"rate": "100"}, {"rate": "191999"}, {"format": "mp3"}, {"channels": "0"}]:
+        with pytest.raises(ValueError):
+            InputAudioConverter.from_query(query)
+
+
+def test_a_rejected_rate_never_builds_a_filter(monkeypatch):
+    built = []
+    monkeypatch.setattr(flask_app, "PolyphaseResampler", lambda *args: built.append(args))
+    with pytest.raises(ValueError):
+        InputAudioConverter.from_query({"rate": "191999"})
+    assert built == []
+
+
+@pytest.mark.parametrize("in_rate", INPUT_SAMPLE_RATES)
+def test_every_accepted_rate_keeps_the_filter_small(in_rate):
+    resampler = PolyphaseResampler(in_rate, 24000)
+    assert resampler.taps * resampler.up <= 4000
@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+import azure.ai.voicelive.aio
+from azure.ai.voicelive.models import AzureStandardVoice
+
+from flask_app import WarmConnection, build_session_config
+
+
+class FakeConnection:
+    """Records session updates; iterating waits until the test ends."""
+
+    def __init__(self):
+        self.updates = []
+        self.session = SimpleNamespace(update=self._update)
+
+    async def _update(self, session):
+        self.updates.append(session)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.Event().wait()
+
+
+class FakeManager:
+    def __init__(self, connection):
+        self.connection = connection
+        self.exited = False
+
+    async def __aenter__(self):
+        return self.connection
+
+    async def __aexit__(self, *exc):
+        self.exited = True
+
+
+def test_locale_voices_use_azure_standard_voice():
+    config = build_session_config("en-US-Ava:DragonHDLatestNeural", "Be brief.")
+    assert isinstance(config.voice, AzureStandardVoice)
+    assert config.voice.name == "en-US-Ava:DragonHDLatestNeural"
+    assert config.instructions == "Be brief."
+    assert build_session_config("alloy", "").voice == "alloy"
+
+
+async def test_warm_connection_sends_the_shared_configuration(monkeypatch):
+    connection = FakeConnection()
+    manager = FakeManager(connection)
+    monkeypatch.setattr(azure.ai.voicelive.aio, "connect", lambda **kwargs: manager)
+
+    warm = await WarmConnection.open("wss://example", None, "model", "alloy", "Be brief.", on_closed=lambda w: None)
+    await warm.aclose()
+
+    (sent,) = connection.updates
+    assert sent.as_dict() == build_session_config("alloy", "Be brief.").as_dict()
+    assert manager.exited
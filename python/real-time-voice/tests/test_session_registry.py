@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import flask_app
+from flask_app import SESSION_LINGER_SECONDS, _create_session, _get_session, _reap_sessions
+
+
+def queued(client):
+    """Decode the SSE frames waiting in a subscriber queue."""
+    return [json.loads(frame[len("data: "):]) for _, frame in client._items]
+
+
+def test_sessions_are_found_by_their_own_id(registry):
+    first, second = _create_session(), _create_session()
+    assert first.id != second.id
+    assert _get_session(first.id) is first and _get_session(second.id) is second
+    assert _get_session("unknown") is None and _get_session(None) is None
+
+
+def test_capacity_counts_only_active_sessions(registry, monkeypatch):
+    monkeypatch.setattr(flask_app, "MAX_SESSIONS", 2)
+    first, second = _create_session(), _create_session()
+    first.set_state("ready", "Ready")
+    second.set_state("listening", "Listening")
+    assert _create_session() is None
+    second.set_state("stopped", "Stopped")
+    assert _create_session() is not None
+
+
+def test_ended_sessions_are_reaped_after_lingering(registry, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(flask_app.time, "time", lambda: now[0])
+    ended, running = _create_session(), _create_session()
+    ended.set_state("ready", "Ready")
+    running.set_state("ready", "Ready")
+    ended.set_state("stopped", "Stopped")
+
+    now[0] += SESSION_LINGER_SECONDS
+    _reap_sessions()
+    assert _get_session(ended.id) is ended
+    now[0] += 1
+    _reap_sessions()
+    assert _get_session(ended.id) is None and _get_session(running.id) is running
+
+
+async def test_events_reach_only_their_own_session(registry):
+    loop = asyncio.get_running_loop()
+    first, second = _create_session(), _create_session()
+    first_client, second_client = first.subscribe(loop), second.subscribe(loop)
+    first.set_state("ready", "Ready")
+    first.broadcast({"type": "log", "msg": "first only"})
+
+    assert [(e["type"], e.get("state")) for e in queued(first_client)] == [
+        ("status", "idle"), ("status", "ready"), ("log", None)]
+    assert [e["state"] for e in queued(second_client)] == ["idle"]
+
+    first.unsubscribe(first_client)
+    assert first.sse_clients == [] and second.sse_clients == [second_client]
+
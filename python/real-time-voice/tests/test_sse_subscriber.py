@@ -0,0 +1,52 @@
+import asyncio
+import threading
+
+from flask_app import SSESubscriber
+
+
+async def drain(sub):
+    items = []
+    while True:
+        data = await sub.get(timeout=0)
+        if not data:
+            return items
+        items.append(data)
+
+
+async def test_drop_audio_drops_the_oldest_audio_first():
+    sub = SSESubscriber(asyncio.get_running_loop(), maxsize=3, policy="drop_audio")
+    for kind, data in [("status", "s1"), ("audio", "a1"), ("audio", "a2"), ("log", "l1"), ("log", "l2")]:
+        assert sub.offer(kind, data)
+    assert await drain(sub) == ["s1", "l1", "l2"]
+    assert sub.stats()["dropped"] == 2 and sub.stats()["high_water"] == 3
+
+
+async def test_drop_audio_falls_back_to_the_oldest_event():
+    sub = SSESubscriber(asyncio.get_running_loop(), maxsize=2, policy="drop_audio")
+    for data in ["l1", "l2", "l3"]:
+        sub.offer("log", data)
+    assert await drain(sub) == ["l2", "l3"]
+
+
+async def test_coalesce_keeps_only_the_newest_status():
+    sub = SSESubscriber(asyncio.get_running_loop(), maxsize=3, policy="coalesce")
+    for kind, data in [("status", "s1"), ("log", "l1"), ("status", "s2"), ("status", "s3")]:
+        assert sub.offer(kind, data)
+    assert await drain(sub) == ["l1", "s3"]
+    assert (sub.coalesced, sub.dropped) == (2, 0)
+
+
+async def test_disconnect_closes_a_client_that_falls_behind():
+    sub = SSESubscriber(asyncio.get_running_loop(), maxsize=2, policy="disconnect")
+    accepted = [sub.offer("log", data) for data in ["l1", "l2", "l3", "l4"]]
+    assert accepted == [True, True, False, False]
+    assert await sub.get(timeout=0) is None and sub.closed and sub.dropped == 3
+
+
+async def test_get_times_out_empty_and_wakes_on_offers_from_other_threads():
+    sub = SSESubscriber(asyncio.get_running_loop(), maxsize=4)
+    assert await sub.get(timeout=0.01) == ""
+    threading.Timer(0.01, sub.offer, ("log", "from-thread")).start()
+    assert await sub.get(timeout=5) == "from-thread"
+    sub.close()
+    assert await sub.get(timeout=5) is None
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import signal
+import threading
+from types import SimpleNamespace
+
+import pytest
+from azure.ai.voicelive.models import ServerEventType
+
+import flask_app
+from flask_app import BasicVoiceAssistant, TurnTrace, TurnTracer
+
+
+def traced_turn(start: float = 10.0) -> TurnTrace:
+    turn = TurnTrace("s1")
+    turn.mark("speech_stopped", start)
+    turn.mark("response_created", start + 0.1)
+    turn.mark("first_audio", start + 0.3)
+    turn.mark("response_done", start + 1.0)
+    return turn
+
+
+def test_record_writes_on_a_background_thread(tmp_path, monkeypatch):
+    path = tmp_path / "turns.jsonl"
+    tracer = TurnTracer(str(path))
+    writers = []
+    append = tracer._append
+
+    def spy(line):
+        writers.append(threading.current_thread())
+        append(line)
+
+    monkeypatch.setattr(tracer, "_append", spy)
+
+    tracer.record(traced_turn(), "completed")
+    tracer.record(traced_turn(20.0), "cancelled")
+    tracer.close()
+
+    assert writers and all(t is not threading.current_thread() for t in writers)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r["turn"], r["status"]) for r in lines] == [(1, "completed"), (2, "cancelled")]
+    assert lines[0]["durations_ms"]["voice.first_audio"] == 300.0
+
+
+def test_record_skips_turns_without_response_done():
+    tracer = TurnTracer()
+    turn = TurnTrace()
+    turn.mark("speech_stopped", 1.0)
+    tracer.record(turn)
+    assert tracer.summary() == {"turns": 0, "spans": {}}
+
+
+def test_summary_percentiles():
+    tracer = TurnTracer(window=100)
+    for i in range(1, 101):
+        turn = TurnTrace()
+        turn.mark("speech_stopped", 0.0)
+        turn.mark("response_done", i / 1000.0)
+        tracer.record(turn)
+    spans = tracer.summary()["spans"]["voice.turn"]
+    assert (spans["count"], spans["p50_ms"], spans["p90_ms"], spans["p99_ms"]) == (100, 50.0, 90.0, 99.0)
+
+
+def event(kind, **fields):
+    return SimpleNamespace(type=kind, **fields)
+
+
+def response_event(kind, response_id, status="completed"):
+    return event(kind, response=SimpleNamespace(id=response_id, status=status))
+
+
+async def test_barge_in_keeps_the_interrupted_turn(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(flask_app.TURN_TRACER, "record", lambda turn, status=None: recorded.append((turn, status)))
+    assistant = BasicVoiceAssistant("wss://example", None, "model", "voice", "")
+    dispatch = assistant.dispatcher.dispatch
+
+    await dispatch(event(ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STOPPED))
+    await dispatch(response_event(ServerEventType.RESPONSE_CREATED, "r1"))
+    await dispatch(event(ServerEventType.RESPONSE_AUDIO_DELTA, response_id="r1", delta=b"\0\0"))
+    # The user barges in and finishes speaking before r1's response.done arrives
+    await dispatch(event(ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STARTED))
+    await dispatch(event(ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STOPPED))
+    await dispatch(response_event(ServerEventType.RESPONSE_DONE, "r1", "cancelled"))
+    await dispatch(response_event(ServerEventType.RESPONSE_CREATED, "r2"))
+    await dispatch(event(ServerEventType.RESPONSE_AUDIO_DELTA, response_id="r2", delta=b"\0\0"))
+    await dispatch(response_event(ServerEventType.RESPONSE_DONE, "r2"))
+
+    (first, first_status), (second, second_status) = recorded
+    assert first_status == "cancelled" and first.interrupted
+    assert first.marks["speech_stopped"] < first.marks["interrupted"] < first.marks["response_done"]
+    assert first.marks["speech_stopped"] < second.marks["speech_stopped"]
+    assert second_status == "completed" and not second.interrupted
+    assert second.marks["speech_stopped"] < second.marks["response_created"] < second.marks["first_audio"]
+    assert assistant._turns == {}
+
+
+def test_main_flushes_turn_traces_when_stopped_with_sigterm(tmp_path, monkeypatch):
+    path = tmp_path / "trace.jsonl"
+    tracer = TurnTracer(str(path))
+    monkeypatch.setattr(flask_app, "TURN_TRACER", tracer)
+    handlers = {}
+    monkeypatch.setattr(flask_app.signal, "signal", lambda signum, handler: handlers.setdefault(signum, handler))
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def no_server(host, port):
+        pass
+
+    class ServingThread:
+        def join(self):
+            tracer.record(traced_turn())  # still queued for the writer when SIGTERM arrives
+            handlers[signal.SIGTERM](signal.SIGTERM, None)
+
+    monkeypatch.setattr(flask_app, "_ensure_io_loop", lambda: loop)
+    monkeypatch.setattr(flask_app, "_start_io_server", no_server)
+    monkeypatch.setattr(flask_app, "io_thread", ServingThread())
+    try:
+        with pytest.raises(SystemExit):
+            flask_app.main()
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    assert tracer._writer is None
+    assert len(path.read_text().splitlines()) == 1
@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+import azure.ai.voicelive.aio
+
+from flask_app import VoiceLivePool
+
+
+class FakeConnection:
+    """Yields the events the test queues; ``None`` ends the stream like a close by the service."""
+
+    def __init__(self):
+        self.session = SimpleNamespace(update=self._update)
+        self.queue = asyncio.Queue()
+
+    async def _update(self, session):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.queue.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+
+class FakeManager:
+    def __init__(self):
+        self.connection = FakeConnection()
+        self.exited = False
+
+    async def __aenter__(self):
+        return self.connection
+
+    async def __aexit__(self, *exc):
+        self.exited = True
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def make_pool(monkeypatch, size, idle_ttl=60.0):
+    """A configured pool whose connects create FakeManagers, returned in order."""
+    managers = []
+
+    def connect(**kwargs):
+        managers.append(FakeManager())
+        return managers[-1]
+
+    monkeypatch.setattr(azure.ai.voicelive.aio, "connect", connect)
+    pool = VoiceLivePool(size, idle_ttl)
+    pool.configure("wss://example", None, "model", "alloy", "Be brief.")
+    return pool, managers
+
+
+async def test_acquire_detaches_the_reader_and_refills(monkeypatch):
+    pool, managers = make_pool(monkeypatch, size=2)
+    await settle()
+    assert pool.idle == 2
+    first = managers[0].connection
+    first.queue.put_nowait("session.created")
+    await settle()
+
+    warm = await pool.acquire()
+    assert warm.connection is first and pool.hits == 1
+    # The idle reader is gone: new events wait for the session, after the ones received while idle
+    first.queue.put_nowait("session.updated")
+    await settle()
+    assert first.queue.qsize() == 1
+    events = warm.events()
+    assert [await events.__anext__(), await events.__anext__()] == ["session.created", "session.updated"]
+
+    await settle()
+    assert pool.idle == 2 and len(managers) == 3
+
+
+async def test_an_empty_pool_is_a_miss_and_is_not_overfilled(monkeypatch):
+    pool, managers = make_pool(monkeypatch, size=1)
+    # The first connection is still being opened
+    assert await pool.acquire() is None and pool.misses == 1
+    await settle()
+    assert pool.idle == 1 and len(managers) == 1
+
+
+async def test_expired_connections_are_closed_instead_of_handed_out(monkeypatch):
+    pool, managers = make_pool(monkeypatch, size=1, idle_ttl=60.0)
+    await settle()
+    pool._idle[0].created_at -= 61
+
+    assert await pool.acquire() is None
+    await settle()
+    assert managers[0].exited
+    assert pool.idle == 1 and pool._idle[0].connection is managers[1].connection
+
+
+async def test_a_connection_closed_while_idle_is_discarded_and_replaced(monkeypatch):
+    pool, managers = make_pool(monkeypatch, size=1)
+    await settle()
+    managers[0].connection.queue.put_nowait(None)
+    await settle()
+
+    assert managers[0].exited
+    assert pool.idle == 1 and pool._idle[0].connection is managers[1].connection
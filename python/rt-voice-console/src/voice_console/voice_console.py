@@ -1,22 +1,30 @@
 import os
 import sys
+import argparse
 import asyncio
-import base64
+import binascii
+import json
 import signal
 import threading
-import queue
+import time
+import uuid
+import wave
+from collections import deque
 from azure.ai.voicelive.models import ServerEventType
-from typing import Union, Optional, TYPE_CHECKING, cast
-from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Union, Optional, TYPE_CHECKING, cast
 import logging
 
 
-# Audio processing imports
+# Audio processing imports (pyaudio is only needed for microphone/speaker audio;
+# file-driven runs work without it)
 try:
     import pyaudio
 except ImportError:
-    print("This sample requires pyaudio. Install with: pip install pyaudio")
-    sys.exit(1)
+    pyaudio = None  # type: ignore[assignment]
+
+# Stream callback return codes (the values of pyaudio.paContinue / pyaudio.paComplete)
+PA_CONTINUE = 0
+PA_COMPLETE = 1
 
 # Environment variable loading
 try:
@@ -51,24 +59,523 @@ from azure.ai.voicelive.models import (
 logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", force=True)
 logger = logging.getLogger(__name__)
 
+# Microphone audio is coalesced into appends of at least this many milliseconds
+UPLINK_BATCH_MS = int(os.environ.get("VOICE_UPLINK_BATCH_MS", "100"))
+# Captured audio the ring can hold if the event loop falls behind
+CAPTURE_BUFFER_SECONDS = 2
+# Appends that may fail in a row (each batch is dropped) before capture stops and the session ends
+SEND_FAILURE_LIMIT = int(os.environ.get("VOICE_SEND_FAILURE_LIMIT", "3"))
+
+
+# Assistant playback: ring capacity and how much audio to buffer before (re)starting output
+PLAYBACK_BUFFER_SECONDS = float(os.environ.get("VOICE_PLAYBACK_BUFFER_SECONDS", "60"))
+PLAYBACK_JITTER_MS = int(os.environ.get("VOICE_PLAYBACK_JITTER_MS", "60"))
+
+# Offline mode: stream microphone audio from a WAV / raw PCM16 file ("-" reads raw PCM16
+# from stdin) and write assistant audio to a WAV / raw file instead of using PyAudio devices
+AUDIO_INPUT_FILE = os.environ.get("VOICE_INPUT_FILE")
+AUDIO_OUTPUT_FILE = os.environ.get("VOICE_OUTPUT_FILE")
+AUDIO_FILE_SPEED = float(os.environ.get("VOICE_FILE_SPEED", "1.0"))  # 1.0 = real time
+AUDIO_TRAILING_SILENCE_MS = int(os.environ.get("VOICE_TRAILING_SILENCE_MS", "1500"))
+
+# Per-turn latency traces, one JSON object per line (devices or files): a flat record
+# ("jsonl") or an OTLP/JSON span export ("otlp")
+TRACE_FILE = os.environ.get("VOICE_TRACE_FILE")
+TRACE_FORMAT = os.environ.get("VOICE_TRACE_FORMAT", "jsonl").strip().lower()
+# Turns kept for the rolling latency percentiles reported at exit
+TRACE_WINDOW = int(os.environ.get("VOICE_TRACE_WINDOW", "200"))
+
+
+class PCMRingBuffer:
+    """
+    Preallocated single-producer/single-consumer ring of PCM16 bytes.
+
+    The event loop writes assistant audio and the PortAudio callback thread
+    reads it. Each side only advances its own monotonically increasing index
+    (plain int assignments, atomic under the GIL), so no lock is taken on the
+    audio path. ``flush()`` is O(1): the producer publishes the current write
+    index as a flush request and the consumer skips to it on its next read.
+    """
+
+    def __init__(self, capacity_bytes: int, sample_width: int = 2):
+        self.sample_width = sample_width
+        self.capacity = max(sample_width, capacity_bytes - capacity_bytes % sample_width)
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)  # Zero-copy slices for the reader
+        self._write = 0  # Total bytes ever written (producer only)
+        self._read = 0  # Total bytes ever read (consumer only)
+        self._flush_to = 0  # Flush request: consumer skips ahead to this write index
+
+        # Counters
+        self.overruns = 0
+        self.dropped_bytes = 0
+        self.flushes = 0
+
+    @property
+    def available(self) -> int:
+        """Bytes buffered and not yet played."""
+        return self._write - max(self._read, self._flush_to)
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        """Copy ``data`` into the ring; audio that does not fit is dropped and counted."""
+        src = memoryview(data).cast("B")
+        n = len(src)
+        free = self.capacity - self.available
+        if n > free:
+            self.overruns += 1
+            keep = free - free % self.sample_width
+            self.dropped_bytes += n - keep
+            n = keep
+        if not n:
+            return 0
+
+        pos = self._write % self.capacity
+        first = min(n, self.capacity - pos)
+        self._buf[pos:pos + first] = src[:first]
+        if first < n:
+            self._buf[:n - first] = src[first:n]
+        # Publish only after the bytes are in place
+        self._write += n
+        return n
+
+    def read_into(self, out: memoryview, n: int) -> int:
+        """Copy up to ``n`` buffered bytes into ``out``; returns the count copied."""
+        flush_to = self._flush_to
+        if flush_to > self._read:
+            self._read = flush_to
+        n = min(n, self._write - self._read)
+        if n <= 0:
+            return 0
+
+        pos = self._read % self.capacity
+        first = min(n, self.capacity - pos)
+        out[:first] = self._view[pos:pos + first]
+        if first < n:
+            out[first:n] = self._view[:n - first]
+        self._read += n
+        return n
+
+    def flush(self):
+        """Discard everything buffered without touching the consumer's index."""
+        self._flush_to = self._write
+        self.flushes += 1
+
+
+class PyAudioBackend:
+    """Microphone and speakers through PyAudio callback-mode streams."""
+
+    def __init__(self):
+        if pyaudio is None:
+            raise RuntimeError("This sample requires pyaudio. Install with: pip install pyaudio (or set VOICE_INPUT_FILE)")
+        self.audio = pyaudio.PyAudio()
+        self.on_input_finished: Optional[Callable[[], None]] = None  # Microphones never finish
+
+    def open_input(self, rate: int, channels: int, frames_per_buffer: int, callback):
+        return self.audio.open(
+            format=pyaudio.paInt16,
+            channels=channels,
+            rate=rate,
+            input=True,
+            frames_per_buffer=frames_per_buffer,
+            stream_callback=callback,
+        )
+
+    def open_output(self, rate: int, channels: int, frames_per_buffer: int, callback):
+        return self.audio.open(
+            format=pyaudio.paInt16,
+            channels=channels,
+            rate=rate,
+            output=True,
+            frames_per_buffer=frames_per_buffer,
+            stream_callback=callback,
+        )
+
+    def terminate(self):
+        self.audio.terminate()
+
+
+class _PacedStream:
+    """Drives a stream callback from a thread on a fixed clock, like a PortAudio stream."""
+
+    def __init__(self, name: str, interval: float):
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _step(self) -> bool:
+        raise NotImplementedError
+
+    def _run(self):
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            if not self._step():
+                break
+            next_at += self._interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+
+    def stop_stream(self):
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def close(self):
+        self.stop_stream()
+
+
+class _FileInputStream(_PacedStream):
+    """Feeds file audio, then trailing silence, to the capture callback."""
+
+    def __init__(self, read, close, callback, frames: int, channels: int, interval: float,
+                 trailing_chunks: int, on_finished: Optional[Callable[[], None]]):
+        self._read = read
+        self._close_reader = close
+        self._callback = callback
+        self._frames = frames
+        self._silence = bytes(frames * channels * 2)
+        self._trailing_left: Optional[int] = None
+        self._trailing_chunks = trailing_chunks
+        self._on_finished = on_finished
+        super().__init__("voice-file-input", interval)
+
+    def _step(self) -> bool:
+        if self._trailing_left is None:
+            data = self._read(self._frames)
+            if data:
+                if len(data) < len(self._silence):
+                    data += self._silence[len(data):]
+                return self._callback(data, self._frames, None, 0)[1] == PA_CONTINUE
+            # End of input: close the file and let server VAD see the end of the last utterance
+            self._close_reader()
+            self._trailing_left = self._trailing_chunks
+        if self._trailing_left > 0:
+            self._trailing_left -= 1
+            return self._callback(self._silence, self._frames, None, 0)[1] == PA_CONTINUE
+        if self._on_finished:
+            self._on_finished()
+        return False
+
+    def stop_stream(self):
+        super().stop_stream()
+        if self._trailing_left is None:
+            self._close_reader()
+            self._trailing_left = 0
+
+
+class _FileOutputStream(_PacedStream):
+    """Pulls playback audio from the output callback and hands it to a writer."""
+
+    def __init__(self, write, callback, frames: int, interval: float):
+        self._write = write
+        self._callback = callback
+        self._frames = frames
+        super().__init__("voice-file-output", interval)
+
+    def _step(self) -> bool:
+        data, flag = self._callback(None, self._frames, None, 0)
+        self._write(data)
+        return flag == PA_CONTINUE
+
+
+class FileAudioBackend:
+    """
+    Offline audio for headless runs and reproducible benchmarks.
+
+    Microphone input is streamed from a WAV or raw PCM16 file (or stdin with
+    ``"-"``) and assistant output is written to a WAV or raw PCM16 file. Both
+    directions run on a clock of ``frames_per_buffer / rate / speed``, so
+    ``speed=1.0`` behaves like a real device and larger values replay faster.
+    After the input ends, ``trailing_silence_ms`` of silence lets server VAD
+    close the last turn before ``on_input_finished`` is called (from the input
+    thread).
+    """
+
+    def __init__(self, input_path: str, output_path: Optional[str] = None, speed: float = 1.0,
+                 trailing_silence_ms: int = 1500):
+        if speed <= 0:
+            raise ValueError("VOICE_FILE_SPEED must be greater than 0")
+        self.input_path = input_path
+        self.output_path = output_path
+        self.speed = speed
+        self.trailing_silence_ms = trailing_silence_ms
+        self.on_input_finished: Optional[Callable[[], None]] = None
+        self._writer: Any = None
+
+    def _open_reader(self, rate: int, channels: int):
+        if self.input_path == "-":
+            stdin = sys.stdin.buffer
+            return (lambda frames: stdin.read(frames * channels * 2)), (lambda: None)
+        if self.input_path.lower().endswith(".wav"):
+            wav = wave.open(self.input_path, "rb")
+            if wav.getframerate() != rate or wav.getnchannels() != channels or wav.getsampwidth() != 2:
+                found = f"{wav.getframerate()} Hz, {wav.getnchannels()} channel(s), {wav.getsampwidth() * 8}-bit"
+                wav.close()
+                raise ValueError(f"{self.input_path}: expected {rate} Hz, {channels} channel(s), 16-bit PCM; got {found}")
+            return wav.readframes, wav.close
+        fh = open(self.input_path, "rb")
+        return (lambda frames: fh.read(frames * channels * 2)), fh.close
+
+    def open_input(self, rate: int, channels: int, frames_per_buffer: int, callback):
+        read, close = self._open_reader(rate, channels)
+        trailing_chunks = self.trailing_silence_ms * rate // 1000 // frames_per_buffer
+        return _FileInputStream(read, close, callback, frames_per_buffer, channels,
+                                frames_per_buffer / rate / self.speed, trailing_chunks,
+                                lambda: self.on_input_finished and self.on_input_finished())
+
+    def open_output(self, rate: int, channels: int, frames_per_buffer: int, callback):
+        if self._writer is None and self.output_path:
+            if self.output_path.lower().endswith(".wav"):
+                self._writer = wave.open(self.output_path, "wb")
+                self._writer.setnchannels(channels)
+                self._writer.setsampwidth(2)
+                self._writer.setframerate(rate)
+            else:
+                self._writer = open(self.output_path, "wb")
+        writer = self._writer
+        if writer is None:
+            write = lambda data: None  # noqa: E731 - no output file: play into the void on the same clock
+        elif isinstance(writer, wave.Wave_write):
+            write = writer.writeframes
+        else:
+            write = writer.write
+        return _FileOutputStream(write, callback, frames_per_buffer, frames_per_buffer / rate / self.speed)
+
+    def terminate(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def create_audio_backend():
+    """Use files when VOICE_INPUT_FILE is set, otherwise the PyAudio microphone and speakers."""
+    if AUDIO_INPUT_FILE:
+        return FileAudioBackend(AUDIO_INPUT_FILE, AUDIO_OUTPUT_FILE, AUDIO_FILE_SPEED, AUDIO_TRAILING_SILENCE_MS)
+    return PyAudioBackend()
+
+
+class TurnTrace:
+    """
+    Timestamps (``time.perf_counter``) of one user turn, from the end of the
+    user's speech to the assistant's ``response.done``.
+    """
+
+    def __init__(self):
+        self.marks: Dict[str, float] = {}
+        self.interrupted = False
+        self.audio_bytes = 0
+
+    def mark(self, name: str, at: Optional[float] = None):
+        """Record ``name`` once; later marks of the same name are ignored."""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() if at is None else at
+
+
+class TurnTracer:
+    """
+    Turns completed :class:`TurnTrace` objects into span records and rolling percentiles.
+
+    Each turn is a ``voice.turn`` span (speech stopped to response done) with
+    child spans for waiting on the response, time to first audio delta, time to
+    first played audio, the audio stream and the response itself. With a path,
+    every turn is appended as one JSON line: a flat record (``"jsonl"``) or an
+    OTLP/JSON ``ExportTraceServiceRequest`` (``"otlp"``). ``summary()`` reports
+    p50/p90/p99 per span over the last ``window`` turns either way.
+    """
+
+    # Child span name -> (start mark, end mark)
+    SPANS = {
+        "voice.response_wait": ("speech_stopped", "response_created"),
+        "voice.first_audio": ("speech_stopped", "first_audio"),
+        "voice.playback_start": ("speech_stopped", "playback_started"),
+        "voice.audio_stream": ("first_audio", "audio_done"),
+        "voice.response": ("response_created", "response_done"),
+    }
+
+    def __init__(self, path: Optional[str] = None, fmt: str = "jsonl", window: int = 200, service: str = "rt-voice-console"):
+        self.format = fmt if fmt in {"jsonl", "otlp"} else "jsonl"
+        self.service = service
+        self.turns = 0
+        self._fh = open(path, "a", encoding="utf-8") if path else None
+        self._window = max(1, window)
+        self._windows: Dict[str, Deque[float]] = {}
+        self._t0 = time.perf_counter()
+        # perf_counter -> Unix epoch nanoseconds, for exported timestamps
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def _unix_ns(self, t: float) -> int:
+        return int(t * 1e9) + self._epoch_offset_ns
+
+    def record(self, trace: TurnTrace, status: Any = None):
+        marks = trace.marks
+        start = marks.get("speech_stopped", marks.get("response_created"))
+        end = marks.get("response_done")
+        if start is None or end is None:
+            return
+        status = getattr(status, "value", status)
+        self.turns += 1
+
+        durations = {"voice.turn": (end - start) * 1000.0}
+        for name, (begin_mark, end_mark) in self.SPANS.items():
+            if begin_mark in marks and end_mark in marks:
+                durations[name] = (marks[end_mark] - marks[begin_mark]) * 1000.0
+        for name, value in durations.items():
+            window = self._windows.get(name)
+            if window is None:
+                window = self._windows[name] = deque(maxlen=self._window)
+            window.append(value)
+
+        if not self._fh:
+            return
+        if self.format == "otlp":
+            record = self._otlp(trace, status, start, end)
+        else:
+            record = {
+                "turn": self.turns,
+                "status": status,
+                "interrupted": trace.interrupted,
+                "audio_ms": round(trace.audio_bytes / 48.0, 1),  # 24 kHz PCM16 mono = 48 bytes per ms
+                "durations_ms": {name: round(value, 1) for name, value in durations.items()},
+                # Milliseconds since the session started
+                "marks_ms": {name: round((t - self._t0) * 1000.0, 1) for name, t in marks.items()},
+            }
+        self._fh.write(json.dumps(record) + "\n")
+        self._fh.flush()
+
+    def _otlp(self, trace: TurnTrace, status: Any, start: float, end: float) -> Dict[str, Any]:
+        trace_id = uuid.uuid4().hex
+        root_id = uuid.uuid4().hex[:16]
+
+        def attr(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        def span(name: str, begin: float, finish: float, span_id: str, parent: str = "", attributes=()) -> Dict[str, Any]:
+            return {
+                "traceId": trace_id,
+                "spanId": span_id,
+                "parentSpanId": parent,
+                "name": name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(self._unix_ns(begin)),
+                "endTimeUnixNano": str(self._unix_ns(finish)),
+                "attributes": list(attributes),
+            }
+
+        root_attrs = [attr("voice.turn", self.turns), attr("voice.interrupted", trace.interrupted),
+                      attr("voice.audio_bytes", trace.audio_bytes)]
+        if status:
+            root_attrs.append(attr("voice.response_status", status))
+        spans = [span("voice.turn", start, end, root_id, attributes=root_attrs)]
+        for name, (begin_mark, end_mark) in self.SPANS.items():
+            if begin_mark in trace.marks and end_mark in trace.marks:
+                spans.append(span(name, trace.marks[begin_mark], trace.marks[end_mark], uuid.uuid4().hex[:16], root_id))
+        return {"resourceSpans": [{
+            "resource": {"attributes": [attr("service.name", self.service)]},
+            "scopeSpans": [{"scope": {"name": "voice.turns"}, "spans": spans}],
+        }]}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Rolling p50/p90/p99 (ms) per span over the last ``window`` turns."""
+
+        def pct(values: List[float], p: float) -> float:
+            return round(values[max(0, -(-len(values) * p // 100) - 1)], 1)
+
+        result = {}
+        for name, window in self._windows.items():
+            values = sorted(window)
+            result[name] = {"count": len(values), "p50_ms": pct(values, 50), "p90_ms": pct(values, 90), "p99_ms": pct(values, 99)}
+        return result
+
+    def close(self):
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+
+EventHandler = Callable[[Any], Awaitable[None]]
+
+
+class EventDispatcher:
+    """
+    Routes VoiceLive server events to handlers registered per event type.
+
+    One dictionary lookup per event instead of an if/elif chain, and every
+    handler call is timed so ``stats()`` shows which event types dominate the
+    event loop. Events without a handler go to ``default`` and are still counted.
+    """
+
+    def __init__(self, default: Optional[EventHandler] = None):
+        self._handlers: Dict[Any, EventHandler] = {}
+        self.default = default
+        # Per event type: [count, total seconds, max seconds]
+        self._timings: Dict[str, List[float]] = {}
+
+    def register(self, event_type: Any, handler: EventHandler):
+        """Route ``event_type`` (a ServerEventType member or its string value) to ``handler``."""
+        self._handlers[event_type] = handler
+
+    def unregister(self, event_type: Any):
+        self._handlers.pop(event_type, None)
+
+    async def dispatch(self, event: Any) -> bool:
+        """Run the handler for ``event``; returns False if it had no registered handler."""
+        event_type = event.type
+        handler = self._handlers.get(event_type)
+        started = time.perf_counter()
+        if handler is not None:
+            await handler(event)
+        elif self.default is not None:
+            await self.default(event)
+        elapsed = time.perf_counter() - started
+
+        timing = self._timings.get(event_type)
+        if timing is None:
+            timing = self._timings[event_type] = [0, 0.0, 0.0]
+        timing[0] += 1
+        timing[1] += elapsed
+        if elapsed > timing[2]:
+            timing[2] = elapsed
+        return handler is not None
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Count, total, mean and max handler time (ms) per event type, busiest first."""
+        ordered = sorted(self._timings.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            str(getattr(event_type, "value", event_type)): {
+                "count": int(count),
+                "total_ms": round(total * 1000.0, 3),
+                "avg_ms": round(total * 1000.0 / count, 3) if count else 0.0,
+                "max_ms": round(longest * 1000.0, 3),
+            }
+            for event_type, (count, total, longest) in ordered
+        }
+
+    def reset_stats(self):
+        self._timings.clear()
+
 
 class AudioProcessor:
     """
     Handles real-time audio capture and playback for the voice assistant.
 
     Threading Architecture:
-    - Main thread: Event loop and UI
-    - Capture thread: PyAudio input stream reading
-    - Send thread: Async audio data transmission to VoiceLive
-    - Playback thread: PyAudio output stream writing
+    - Main thread: Event loop and UI; drains the capture ring into
+      input_audio_buffer.append and writes assistant audio into the playback ring
+    - PortAudio callback threads: push microphone audio into the capture ring
+      and pull playback audio from the playback ring (with FileAudioBackend, two
+      paced threads drive the same callbacks)
     """
 
-    def __init__(self, connection):
+    def __init__(self, connection, backend=None):
         self.connection = connection
-        self.audio = pyaudio.PyAudio()
+        self.backend = backend if backend is not None else create_audio_backend()
 
         # Audio configuration - PCM16, 24kHz, mono as specified
-        self.format = pyaudio.paInt16
         self.channels = 1
         self.rate = 24000
         self.chunk_size = 1024
@@ -76,18 +583,37 @@ class AudioProcessor:
         # Capture and playback state
         self.is_capturing = False
         self.is_playing = False
+        self.playback_paused = False  # Barge-in: output stays open but plays silence
         self.input_stream = None
         self.output_stream = None
 
-        # Audio queues and threading
-        self.audio_queue: "queue.Queue[bytes]" = queue.Queue()
-        self.audio_send_queue: "queue.Queue[str]" = queue.Queue()  # base64 audio to send
-        self.executor = ThreadPoolExecutor(max_workers=3)
-        self.capture_thread: Optional[threading.Thread] = None
-        self.playback_thread: Optional[threading.Thread] = None
-        self.send_thread: Optional[threading.Thread] = None
+        # Playback ring drained by the output stream callback. Output waits until
+        # the jitter target is buffered, and again after running dry mid-response.
+        bytes_per_second = self.rate * 2
+        self.playback_ring = PCMRingBuffer(int(bytes_per_second * PLAYBACK_BUFFER_SECONDS))
+        self.jitter_bytes = min(self.playback_ring.capacity, bytes_per_second * PLAYBACK_JITTER_MS // 1000)
+        self._playback_primed = False
+        self._playback_draining = False  # Response audio is complete; play the tail without waiting
+        self._playback_out = bytearray(self.chunk_size * 2)
+        self._playback_silence = bytes(self.chunk_size * 2)
+        self.underruns = 0
+        self.playback_started_at: Optional[float] = None  # When the current response started playing
+        self._playback_start_armed = True  # Record playback_started_at on the next (re)start
+
+        # Capture ring filled by the input stream callback and drained by a task on
+        # the event loop; the callback wakes the task once a full batch is buffered
+        self.capture_ring = PCMRingBuffer(bytes_per_second * CAPTURE_BUFFER_SECONDS)
+        self.capture_batch_bytes = max(2, bytes_per_second * UPLINK_BATCH_MS // 1000)
+        self._capture_batch = bytearray(self.capture_ring.capacity)
+        self._capture_ready: Optional[asyncio.Event] = None
+        self._capture_signalled = False
+        self._send_task: Optional["asyncio.Task[None]"] = None
+        self.send_error: Optional[Exception] = None  # Why capture stopped, if sending kept failing
         self.loop: Optional[asyncio.AbstractEventLoop] = None  # Store the event loop
 
+        # Set once a file-driven input has been played in completely
+        self.input_finished = asyncio.Event()
+
         logger.info("AudioProcessor initialized with 24kHz PCM16 mono audio")
 
     async def start_capture(self):
@@ -95,32 +621,20 @@ class AudioProcessor:
         if self.is_capturing:
             return
 
-        # Store the current event loop for use in threads
-        self.loop = asyncio.get_event_loop()
+        # Store the current event loop; the capture callback wakes it from the PortAudio thread
+        self.loop = asyncio.get_running_loop()
+        self._capture_ready = asyncio.Event()
+        self._capture_signalled = False
 
         self.is_capturing = True
+        loop = self.loop
+        self.backend.on_input_finished = lambda: loop.call_soon_threadsafe(self.input_finished.set)
 
         try:
-            self.input_stream = self.audio.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.rate,
-                input=True,
-                frames_per_buffer=self.chunk_size,
-                stream_callback=None,
-            )
-
-            self.input_stream.start_stream()
-
-            # Start capture thread
-            self.capture_thread = threading.Thread(target=self._capture_audio_thread)
-            self.capture_thread.daemon = True
-            self.capture_thread.start()
-
-            # Start audio send thread
-            self.send_thread = threading.Thread(target=self._send_audio_thread)
-            self.send_thread.daemon = True
-            self.send_thread.start()
+            self.input_stream = self.backend.open_input(self.rate, self.channels, self.chunk_size, self._capture_callback)
+
+            # Drain captured audio to VoiceLive from the event loop
+            self._send_task = asyncio.create_task(self._send_captured_audio())
 
             logger.info("Started audio capture")
 
@@ -129,47 +643,64 @@ class AudioProcessor:
             self.is_capturing = False
             raise
 
-    def _capture_audio_thread(self):
-        """Audio capture thread - runs in background."""
-        while self.is_capturing and self.input_stream:
-            try:
-                # Read audio data
-                audio_data = self.input_stream.read(self.chunk_size, exception_on_overflow=False)
-
-                if audio_data and self.is_capturing:
-                    # Convert to base64 and queue for sending
-                    audio_base64 = base64.b64encode(audio_data).decode("utf-8")
-                    self.audio_send_queue.put(audio_base64)
-
-            except Exception as e:
-                if self.is_capturing:
-                    logger.error(f"Error in audio capture: {e}")
-                break
+    def _capture_callback(self, in_data, frame_count, time_info, status):
+        """Input stream callback - runs on the PortAudio thread, so it must not block."""
+        if not self.is_capturing:
+            return None, PA_COMPLETE
 
-    def _send_audio_thread(self):
-        """Audio send thread - handles async operations from sync thread."""
-        while self.is_capturing:
+        ring = self.capture_ring
+        ring.write(in_data)
+        # Wake the sender once per batch rather than once per callback
+        if ring.available >= self.capture_batch_bytes and not self._capture_signalled and self.loop:
+            self._capture_signalled = True
             try:
-                # Get audio data from queue (blocking with timeout)
-                audio_base64 = self.audio_send_queue.get(timeout=0.1)
-
-                if audio_base64 and self.is_capturing and self.loop:
-                    # Schedule the async send operation in the main event loop
-                    future = asyncio.run_coroutine_threadsafe(
-                        self.connection.input_audio_buffer.append(audio=audio_base64), self.loop
-                    )
-                    # Don't wait for completion to avoid blocking
+                self.loop.call_soon_threadsafe(self._capture_ready.set)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
+        return None, PA_CONTINUE
+
+    async def _send_captured_audio(self):
+        """Send task - encodes everything buffered in the capture ring as one append."""
+        ring = self.capture_ring
+        ready = self._capture_ready
+        assert ready is not None
+        batch = memoryview(self._capture_batch)
+        failures = 0
+        while self.is_capturing:
+            await ready.wait()
+            # Re-arm before reading so audio captured meanwhile triggers a new wakeup
+            ready.clear()
+            self._capture_signalled = False
 
-            except queue.Empty:
+            n = ring.read_into(batch, len(batch))
+            if not n or not self.is_capturing:
                 continue
+            audio_base64 = binascii.b2a_base64(batch[:n], newline=False).decode("ascii")
+            try:
+                await self.connection.input_audio_buffer.append(audio=audio_base64)
             except Exception as e:
-                if self.is_capturing:
-                    logger.error(f"Error sending audio: {e}")
+                if not self.is_capturing:
+                    break
+                failures += 1
+                if failures < SEND_FAILURE_LIMIT:
+                    logger.warning(f"Error sending audio, dropped {n} bytes ({failures}/{SEND_FAILURE_LIMIT}): {e}")
+                    continue
+                # Still failing: stop capturing and close the connection so the session ends
+                logger.error(f"Error sending audio, ending the session: {e}")
+                print(f"Error: could not send microphone audio: {e}")
+                self.is_capturing = False
+                self.send_error = e
+                try:
+                    await self.connection.close()
+                except Exception as close_error:
+                    logger.debug(f"Error closing connection: {close_error}")
                 break
+            failures = 0
 
     async def stop_capture(self):
         """Stop capturing audio."""
-        if not self.is_capturing:
+        # The send task clears is_capturing itself when sending keeps failing
+        if not self.is_capturing and self.input_stream is None and self._send_task is None:
             return
 
         self.is_capturing = False
@@ -179,18 +710,18 @@ class AudioProcessor:
             self.input_stream.close()
             self.input_stream = None
 
-        if self.capture_thread:
-            self.capture_thread.join(timeout=1.0)
-
-        if self.send_thread:
-            self.send_thread.join(timeout=1.0)
-
-        # Clear the send queue
-        while not self.audio_send_queue.empty():
+        if self._send_task:
+            self._send_task.cancel()
             try:
-                self.audio_send_queue.get_nowait()
-            except queue.Empty:
-                break
+                await self._send_task
+            except asyncio.CancelledError:
+                pass
+            self._send_task = None
+
+        # Drop any partial batch
+        self.capture_ring.flush()
+        if self.capture_ring.overruns:
+            logger.warning("Capture ring overran %d times (%d bytes dropped)", self.capture_ring.overruns, self.capture_ring.dropped_bytes)
 
         logger.info("Stopped audio capture")
 
@@ -200,20 +731,14 @@ class AudioProcessor:
             return
 
         self.is_playing = True
+        self.playback_paused = False
+        self._playback_primed = False
+        self._playback_draining = False
 
         try:
-            self.output_stream = self.audio.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.rate,
-                output=True,
-                frames_per_buffer=self.chunk_size,
-            )
-
-            # Start playback thread
-            self.playback_thread = threading.Thread(target=self._playback_audio_thread)
-            self.playback_thread.daemon = True
-            self.playback_thread.start()
+            # Callback mode: PortAudio pulls audio from the ring when the device needs it.
+            # The stream stays open for the whole session; barge-in pauses and flushes it.
+            self.output_stream = self.backend.open_output(self.rate, self.channels, self.chunk_size, self._playback_callback)
 
             logger.info("Audio playback system ready")
 
@@ -222,61 +747,103 @@ class AudioProcessor:
             self.is_playing = False
             raise
 
-    def _playback_audio_thread(self):
-        """Audio playback thread - runs in background."""
-        while self.is_playing:
-            try:
-                # Get audio data from queue (blocking with timeout)
-                audio_data = self.audio_queue.get(timeout=0.1)
+    def _playback_callback(self, in_data, frame_count, time_info, status):
+        """Output stream callback - runs on the PortAudio thread, so it must not block."""
+        need = frame_count * 2
+        if need > len(self._playback_out):
+            self._playback_out = bytearray(need)
+            self._playback_silence = bytes(need)
+
+        ring = self.playback_ring
+        if self.playback_paused:
+            self._playback_primed = False
+            return self._playback_silence[:need], PA_CONTINUE
+        if not self._playback_primed:
+            if ring.available >= self.jitter_bytes or (self._playback_draining and ring.available):
+                self._playback_primed = True
+                if self._playback_start_armed:
+                    self._playback_start_armed = False
+                    self.playback_started_at = time.perf_counter()
+            else:
+                return self._playback_silence[:need], PA_CONTINUE
+
+        out = memoryview(self._playback_out)
+        got = ring.read_into(out, need)
+        if got < need:
+            out[got:need] = self._playback_silence[: need - got]
+            if not self._playback_draining:
+                # Ran dry mid-response: count it and re-buffer up to the jitter target
+                self.underruns += 1
+            self._playback_primed = False
+        return bytes(out[:need]), PA_CONTINUE
 
-                if audio_data and self.output_stream and self.is_playing:
-                    self.output_stream.write(audio_data)
+    async def queue_audio(self, audio_data: bytes):
+        """Queue audio data for playback; ignored while playback is paused."""
+        if self.is_playing and not self.playback_paused:
+            if self._playback_draining:
+                # First audio of a new response
+                self._playback_start_armed = True
+            self._playback_draining = False
+            self.playback_ring.write(audio_data)
+
+    async def pause_playback(self):
+        """Silence output and discard buffered audio; the device and callback stay open."""
+        if not self.is_playing or self.playback_paused:
+            return
+        # Pause first so the callback plays silence instead of counting the flush as an underrun
+        self.playback_paused = True
+        self.flush_playback()
 
-            except queue.Empty:
-                continue
-            except Exception as e:
-                if self.is_playing:
-                    logger.error(f"Error in audio playback: {e}")
-                break
+    def flush_playback(self):
+        """Discard buffered audio in constant time."""
+        self.playback_ring.flush()
 
-    async def queue_audio(self, audio_data: bytes):
-        """Queue audio data for playback."""
-        if self.is_playing:
-            self.audio_queue.put(audio_data)
+    async def resume_playback(self):
+        """Accept and play assistant audio again after a pause."""
+        if not self.is_playing:
+            await self.start_playback()
+            return
+        self._playback_draining = False
+        self._playback_start_armed = True
+        self.playback_paused = False
+
+    def end_of_audio(self):
+        """The current response has no more audio; play what is buffered without re-buffering."""
+        self._playback_draining = True
+
+    def playback_stats(self) -> dict:
+        ring = self.playback_ring
+        return {
+            "buffered_ms": ring.available * 1000 // (self.rate * 2),
+            "underruns": self.underruns,
+            "overruns": ring.overruns,
+            "dropped_bytes": ring.dropped_bytes,
+            "flushes": ring.flushes,
+        }
 
     async def stop_playback(self):
-        """Stop audio playback and clear queue."""
+        """Close the output stream at the end of the session and clear the buffer."""
         if not self.is_playing:
             return
 
         self.is_playing = False
 
-        # Clear the queue
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except queue.Empty:
-                break
+        self.flush_playback()
 
         if self.output_stream:
             self.output_stream.stop_stream()
             self.output_stream.close()
             self.output_stream = None
 
-        if self.playback_thread:
-            self.playback_thread.join(timeout=1.0)
-
-        logger.info("Stopped audio playback")
+        logger.info("Stopped audio playback (%s)", self.playback_stats())
 
     async def cleanup(self):
         """Clean up audio resources."""
         await self.stop_capture()
         await self.stop_playback()
 
-        if self.audio:
-            self.audio.terminate()
+        self.backend.terminate()
 
-        self.executor.shutdown(wait=True)
         logger.info("Audio processor cleaned up")
 
 
@@ -301,9 +868,18 @@ class BasicVoiceAssistant:
         self.audio_processor: Optional[AudioProcessor] = None
         self.session_ready = False
         self.conversation_started = False
+        self.response_active = False
+        self.tracer = TurnTracer(TRACE_FILE, TRACE_FORMAT, TRACE_WINDOW)
+        self._turn: Optional[TurnTrace] = None  # Turn waiting for its response, from speech stopped
+        self._turns: Dict[str, TurnTrace] = {}  # Turns with a response in flight, by response id, until response done
+
+        # Server event type -> handler, with per-type timing
+        self.dispatcher = EventDispatcher(default=self._on_unhandled)
+        self._register_event_handlers()
 
     async def start(self):
         """Start the voice assistant session."""
+        input_watcher: Optional["asyncio.Task[None]"] = None
         try:
             logger.info(f"Connecting to VoiceLive API with model {self.model}")
 
@@ -331,6 +907,10 @@ class BasicVoiceAssistant:
                 # Start audio systems
                 await ap.start_playback()
 
+                # File input has an end: close the session once it has been answered
+                if isinstance(ap.backend, FileAudioBackend):
+                    input_watcher = asyncio.create_task(self._close_when_input_done())
+
                 logger.info("Voice assistant ready! Start speaking...")
                 print("\n" + "=" * 60)
                 print("🎤 VOICE ASSISTANT READY")
@@ -349,8 +929,30 @@ class BasicVoiceAssistant:
             raise
 
         # Cleanup
+        if input_watcher:
+            input_watcher.cancel()
         if self.audio_processor:
             await self.audio_processor.cleanup()
+        self.tracer.close()
+        logger.info("Event handler timings: %s", json.dumps(self.dispatcher.stats()))
+        if self.tracer.turns:
+            summary = self.tracer.summary()
+            logger.info("Turn latency: %s", json.dumps(summary))
+            first_audio = summary.get("voice.first_audio")
+            if first_audio:
+                print(f"📊 Time to first audio over {first_audio['count']} turns: "
+                      f"p50 {first_audio['p50_ms']} ms, p90 {first_audio['p90_ms']} ms, p99 {first_audio['p99_ms']} ms")
+
+    async def _close_when_input_done(self):
+        """End a file-driven session after the input, the last reply and its playback finish."""
+        ap = self.audio_processor
+        conn = self.connection
+        assert ap is not None and conn is not None
+        await ap.input_finished.wait()
+        while self.response_active or ap.playback_ring.available:
+            await asyncio.sleep(0.05)
+        print("📁 Input file finished")
+        await conn.close()
 
     async def _setup_session(self):
         """Configure the VoiceLive session for audio conversation."""
@@ -398,71 +1000,157 @@ class BasicVoiceAssistant:
             logger.error(f"Error processing events: {e}")
             raise
 
+    def _register_event_handlers(self):
+        """Route VoiceLive server events to their handlers."""
+        register = self.dispatcher.register
+        register(ServerEventType.SESSION_UPDATED, self._on_session_updated)
+        register(ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STARTED, self._on_speech_started)
+        register(ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STOPPED, self._on_speech_stopped)
+        register(ServerEventType.RESPONSE_CREATED, self._on_response_created)
+        register(ServerEventType.RESPONSE_AUDIO_DELTA, self._on_audio_delta)
+        register(ServerEventType.RESPONSE_AUDIO_DONE, self._on_audio_done)
+        register(ServerEventType.RESPONSE_DONE, self._on_response_done)
+        register(ServerEventType.ERROR, self._on_error)
+        register(ServerEventType.CONVERSATION_ITEM_CREATED, self._on_conversation_item_created)
+
+    def event_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-event-type handler count and timings (ms)."""
+        return self.dispatcher.stats()
+
     async def _handle_event(self, event):
         """Handle different types of events from VoiceLive."""
         logger.debug(f"Received event: {event.type}")
+        await self.dispatcher.dispatch(event)
+
+    async def _on_session_updated(self, event):
+        logger.info(f"Session ready: {event.session.id}")
+        self.session_ready = True
+
+        # Start audio capture once session is ready
+        assert self.audio_processor is not None, "AudioProcessor must be initialized"
+        await self.audio_processor.start_capture()
+
+    async def _on_speech_started(self, event):
         ap = self.audio_processor
         conn = self.connection
         assert ap is not None, "AudioProcessor must be initialized"
         assert conn is not None, "Connection must be established"
+        logger.info("🎤 User started speaking - pausing playback")
+        print("🎤 Listening...")
+
+        # Silence and discard current assistant audio (interruption handling)
+        await ap.pause_playback()
+        # Flag the turns being answered; each is still closed by its own response.done
+        interrupted_at = time.perf_counter()
+        for turn in self._turns.values():
+            turn.interrupted = True
+            turn.mark("interrupted", interrupted_at)
+        if self._turn is not None:
+            self._turn.interrupted = True
+
+        # Cancel any ongoing response
+        try:
+            await conn.response.cancel()
+        except Exception as e:
+            logger.debug(f"No response to cancel: {e}")
+
+    async def _on_speech_stopped(self, event):
+        assert self.audio_processor is not None, "AudioProcessor must be initialized"
+        logger.info("🎤 User stopped speaking")
+        print("🤔 Processing...")
+
+        # Resume playback for the response; the output stream was never closed
+        await self.audio_processor.resume_playback()
+        self._turn = TurnTrace()
+        self._turn.mark("speech_stopped")
+
+    async def _on_response_created(self, event):
+        logger.info("🤖 Assistant response created")
+        self.response_active = True
+        # The response takes over the waiting turn; responses not triggered by speech get one of their own
+        turn, self._turn = self._turn, None
+        if turn is None:
+            turn = TurnTrace()
+        turn.mark("response_created")
+        response_id = getattr(getattr(event, "response", None), "id", None)
+        if response_id:
+            self._turns[response_id] = turn
+
+    def _turn_for(self, event) -> Optional[TurnTrace]:
+        response_id = getattr(event, "response_id", None)
+        return self._turns.get(response_id) if response_id else None
+
+    async def _on_audio_delta(self, event):
+        # Stream audio response to speakers
+        assert self.audio_processor is not None, "AudioProcessor must be initialized"
+        await self.audio_processor.queue_audio(event.delta)
+        turn = self._turn_for(event)
+        if turn is not None:
+            turn.mark("first_audio")
+            turn.audio_bytes += len(event.delta)
+
+    async def _on_audio_done(self, event):
+        assert self.audio_processor is not None, "AudioProcessor must be initialized"
+        logger.info("🤖 Assistant finished speaking")
+        self.audio_processor.end_of_audio()
+        turn = self._turn_for(event)
+        if turn is not None:
+            turn.mark("audio_done")
+        print("🎤 Ready for next input...")
+
+    async def _on_response_done(self, event):
+        logger.info("✅ Response complete")
+        self.response_active = False
+        response = getattr(event, "response", None)
+        turn = self._turns.pop(getattr(response, "id", None) or "", None)
+        if turn is not None:
+            turn.mark("response_done")
+            # Only count playback that started after this turn's first audio arrived
+            played = self.audio_processor.playback_started_at if self.audio_processor else None
+            if played is not None and played >= turn.marks.get("first_audio", played + 1):
+                turn.mark("playback_started", played)
+            self.tracer.record(turn, getattr(response, "status", None))
+
+    async def _on_error(self, event):
+        logger.error(f"❌ VoiceLive error: {event.error.message}")
+        print(f"Error: {event.error.message}")
+
+    async def _on_conversation_item_created(self, event):
+        logger.debug(f"Conversation item created: {event.item.id}")
+
+    async def _on_unhandled(self, event):
+        logger.debug(f"Unhandled event type: {event.type}")
 
-        if event.type == ServerEventType.SESSION_UPDATED:
-            logger.info(f"Session ready: {event.session.id}")
-            self.session_ready = True
-
-            # Start audio capture once session is ready
-            await ap.start_capture()
-
-        elif event.type == ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STARTED:
-            logger.info("🎤 User started speaking - stopping playback")
-            print("🎤 Listening...")
-
-            # Stop current assistant audio playback (interruption handling)
-            await ap.stop_playback()
-
-            # Cancel any ongoing response
-            try:
-                await conn.response.cancel()
-            except Exception as e:
-                logger.debug(f"No response to cancel: {e}")
-
-        elif event.type == ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STOPPED:
-            logger.info("🎤 User stopped speaking")
-            print("🤔 Processing...")
-
-            # Restart playback system for response
-            await ap.start_playback()
-
-        elif event.type == ServerEventType.RESPONSE_CREATED:
-            logger.info("🤖 Assistant response created")
-
-        elif event.type == ServerEventType.RESPONSE_AUDIO_DELTA:
-            # Stream audio response to speakers
-            logger.debug("Received audio delta")
-            await ap.queue_audio(event.delta)
-
-        elif event.type == ServerEventType.RESPONSE_AUDIO_DONE:
-            logger.info("🤖 Assistant finished speaking")
-            print("🎤 Ready for next input...")
-
-        elif event.type == ServerEventType.RESPONSE_DONE:
-            logger.info("✅ Response complete")
 
-        elif event.type == ServerEventType.ERROR:
-            logger.error(f"❌ VoiceLive error: {event.error.message}")
-            print(f"Error: {event.error.message}")
+## Removed command-line argument parsing; configuration now sourced from environment variables (.env supported)
 
-        elif event.type == ServerEventType.CONVERSATION_ITEM_CREATED:
-            logger.debug(f"Conversation item created: {event.item.id}")
 
-        else:
-            logger.debug(f"Unhandled event type: {event.type}")
+def create_credential(use_api_key: bool = False) -> Union[AzureKeyCredential, TokenCredential]:
+    """DefaultAzureCredential, or AZURE_VOICE_LIVE_API_KEY when ``use_api_key`` is set.
 
-
-## Removed command-line argument parsing; configuration now sourced from environment variables (.env supported)
+    Key authentication is only for local test endpoints and benchmarks; a key
+    in the environment is ignored unless it is asked for explicitly.
+    """
+    if not use_api_key:
+        return DefaultAzureCredential()  # type: ignore[return-value]
+    api_key = os.environ.get("AZURE_VOICE_LIVE_API_KEY")
+    if not api_key:
+        raise ValueError("--api-key requires the AZURE_VOICE_LIVE_API_KEY environment variable")
+    return AzureKeyCredential(api_key)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Basic voice assistant with the Azure VoiceLive SDK")
+    parser.add_argument(
+        "--api-key",
+        action="store_true",
+        help="authenticate with AZURE_VOICE_LIVE_API_KEY instead of DefaultAzureCredential "
+        "(for local test endpoints and benchmarks)",
+    )
+    return parser.parse_args(argv)
 
 
-async def main_async():
+async def main_async(args: Optional[argparse.Namespace] = None):
     """Main coroutine function.
 
     Renamed from `main` to `main_async` so we can expose a synchronous
@@ -482,9 +1170,15 @@ async def main_async():
         logging.getLogger().setLevel(logging.DEBUG)
         logger.debug("Verbose logging enabled via VOICELIVE_VERBOSE env var")
 
-    # Authentication now fixed to DefaultAzureCredential (API key removed)
-    credential: Union[AzureKeyCredential, TokenCredential] = DefaultAzureCredential()  # type: ignore[assignment]
-    auth_mode = "default-azure-credential"
+    # Authenticate with DefaultAzureCredential unless key auth is requested with --api-key
+    # (e.g. for a local test endpoint in file-driven benchmark runs)
+    use_api_key = bool(args and args.api_key)
+    try:
+        credential = create_credential(use_api_key)
+    except ValueError as e:
+        logger.error("%s", e)
+        raise SystemExit(1)
+    auth_mode = "api-key" if use_api_key else "default-azure-credential"
 
     # Basic required env validation
     missing = []
@@ -546,7 +1240,7 @@ def main():
     environments that expect a regular callable. This avoids returning a
     coroutine object to callers that won't await it.
     """
-    asyncio.run(main_async())
+    asyncio.run(main_async(parse_args()))
 
 
 def run():
@@ -559,12 +1253,13 @@ def run():
 
 
 if __name__ == "__main__":
-    # Check for required dependencies
+    # Check for required dependencies (pyaudio only when using audio devices)
     dependencies = {
-        "pyaudio": "Audio processing",
         "azure.ai.voicelive": "Azure VoiceLive SDK",
         "azure.core": "Azure Core libraries",
     }
+    if not AUDIO_INPUT_FILE:
+        dependencies["pyaudio"] = "Audio processing"
 
     missing_deps = []
     for dep, description in dependencies.items():
@@ -580,33 +1275,34 @@ if __name__ == "__main__":
         print("\nInstall with: pip install azure-ai-voicelive pyaudio python-dotenv")
         sys.exit(1)
 
-    # Check audio system
-    try:
-        p = pyaudio.PyAudio()
-        # Check for input devices
-        input_devices = [
-            i
-            for i in range(p.get_device_count())
-            if cast(Union[int, float], p.get_device_info_by_index(i).get("maxInputChannels", 0) or 0) > 0
-        ]
-        # Check for output devices
-        output_devices = [
-            i
-            for i in range(p.get_device_count())
-            if cast(Union[int, float], p.get_device_info_by_index(i).get("maxOutputChannels", 0) or 0) > 0
-        ]
-        p.terminate()
-
-        if not input_devices:
-            print("❌ No audio input devices found. Please check your microphone.")
-            sys.exit(1)
-        if not output_devices:
-            print("❌ No audio output devices found. Please check your speakers.")
-            sys.exit(1)
+    # Check audio system (not needed when audio comes from and goes to files)
+    if not AUDIO_INPUT_FILE:
+        try:
+            p = pyaudio.PyAudio()
+            # Check for input devices
+            input_devices = [
+                i
+                for i in range(p.get_device_count())
+                if cast(Union[int, float], p.get_device_info_by_index(i).get("maxInputChannels", 0) or 0) > 0
+            ]
+            # Check for output devices
+            output_devices = [
+                i
+                for i in range(p.get_device_count())
+                if cast(Union[int, float], p.get_device_info_by_index(i).get("maxOutputChannels", 0) or 0) > 0
+            ]
+            p.terminate()
+
+            if not input_devices:
+                print("❌ No audio input devices found. Please check your microphone.")
+                sys.exit(1)
+            if not output_devices:
+                print("❌ No audio output devices found. Please check your speakers.")
+                sys.exit(1)
 
-    except Exception as e:
-        print(f"❌ Audio system check failed: {e}")
-        sys.exit(1)
+        except Exception as e:
+            print(f"❌ Audio system check failed: {e}")
+            sys.exit(1)
 
     print("🎙️  Basic Voice Assistant with Azure VoiceLive SDK")
     print("=" * 50)
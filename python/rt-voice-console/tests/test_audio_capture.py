@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+
+from voice_console import voice_console
+from voice_console.voice_console import AudioProcessor
+
+
+class FakeStream:
+    def __init__(self):
+        self.closed = False
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBackend:
+    """Hands the capture callback to the test instead of opening a microphone."""
+
+    def __init__(self):
+        self.on_input_finished = None
+        self.callback = None
+        self.stream = FakeStream()
+
+    def open_input(self, rate, channels, frames_per_buffer, callback):
+        self.callback = callback
+        return self.stream
+
+
+class FakeConnection:
+    """``append`` raises the scripted errors in order, then succeeds."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.appended = []
+        self.closed = False
+        self.input_audio_buffer = SimpleNamespace(append=self._append)
+
+    async def _append(self, audio):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.appended.append(audio)
+
+    async def close(self):
+        self.closed = True
+
+
+async def capture_batches(processor, backend, count):
+    """Feed ``count`` full batches through the capture callback, letting the sender run after each."""
+    for _ in range(count):
+        backend.callback(bytes(processor.capture_batch_bytes), 0, None, 0)
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+
+async def test_send_survives_a_transient_append_error():
+    connection = FakeConnection([ConnectionError("blip")])
+    backend = FakeBackend()
+    processor = AudioProcessor(connection, backend)
+
+    await processor.start_capture()
+    await capture_batches(processor, backend, 3)
+    assert processor.is_capturing
+    await processor.stop_capture()
+    assert len(connection.appended) == 2
+    assert processor.send_error is None and not connection.closed
+
+
+async def test_repeated_append_errors_end_the_session(monkeypatch):
+    monkeypatch.setattr(voice_console, "SEND_FAILURE_LIMIT", 2)
+    errors = [ConnectionError("closed"), ConnectionError("closed")]
+    connection = FakeConnection(errors + [ConnectionError("never reached")])
+    backend = FakeBackend()
+    processor = AudioProcessor(connection, backend)
+
+    await processor.start_capture()
+    await capture_batches(processor, backend, 3)
+    assert not processor.is_capturing
+    await processor.stop_capture()
+    assert processor.send_error is errors[1]
+    assert connection.closed and not connection.appended
+    # stop_capture still releases the input stream after the sender gave up
+    assert backend.stream.closed and processor.input_stream is None
@@ -0,0 +1,23 @@
+import pytest
+from azure.core.credentials import AzureKeyCredential
+from azure.identity import DefaultAzureCredential
+
+from voice_console.voice_console import create_credential, parse_args
+
+
+def test_a_key_in_the_environment_is_ignored_by_default(monkeypatch):
+    monkeypatch.setenv("AZURE_VOICE_LIVE_API_KEY", "secret")
+    assert parse_args([]).api_key is False
+    assert isinstance(create_credential(parse_args([]).api_key), DefaultAzureCredential)
+
+
+def test_api_key_is_an_explicit_opt_in(monkeypatch):
+    monkeypatch.setenv("AZURE_VOICE_LIVE_API_KEY", "secret")
+    credential = create_credential(parse_args(["--api-key"]).api_key)
+    assert isinstance(credential, AzureKeyCredential) and credential.key == "secret"
+
+
+def test_api_key_without_a_key_is_an_error(monkeypatch):
+    monkeypatch.delenv("AZURE_VOICE_LIVE_API_KEY", raising=False)
+    with pytest.raises(ValueError, match="AZURE_VOICE_LIVE_API_KEY"):
+        create_credential(True)
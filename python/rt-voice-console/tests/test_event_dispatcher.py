@@ -0,0 +1,21 @@
+from types import SimpleNamespace
+
+from azure.ai.voicelive.models import ServerEventType
+
+from voice_console.voice_console import EventDispatcher
+
+
+async def test_dispatch_routes_and_times_events():
+    seen = []
+
+    async def on_done(event):
+        seen.append(event.type)
+
+    dispatcher = EventDispatcher()
+    dispatcher.register(ServerEventType.RESPONSE_DONE, on_done)
+
+    assert await dispatcher.dispatch(SimpleNamespace(type=ServerEventType.RESPONSE_DONE))
+    assert not await dispatcher.dispatch(SimpleNamespace(type=ServerEventType.ERROR))
+    assert seen == [ServerEventType.RESPONSE_DONE]
+    stats = dispatcher.stats()
+    assert stats["response.done"]["count"] == 1 and stats["error"]["count"] == 1
@@ -0,0 +1,154 @@
+import threading
+import time
+import wave
+
+import pytest
+
+from voice_console.voice_console import PA_COMPLETE, PA_CONTINUE, FileAudioBackend, _PacedStream
+
+RATE = 24000
+FRAMES = 240
+
+
+class Steps(_PacedStream):
+    """Counts steps; ``limit`` ends the stream from its own thread."""
+
+    def __init__(self, interval, limit=None, stop_itself=False):
+        self.times = []
+        self.limit = limit
+        self.stop_itself = stop_itself
+        self.done = threading.Event()
+        super().__init__("test-paced", interval)
+
+    def _step(self):
+        self.times.append(time.perf_counter())
+        if self.limit is not None and len(self.times) >= self.limit:
+            if self.stop_itself:
+                self.stop_stream()
+            self.done.set()
+            return False
+        return True
+
+
+def write_wav(path, pcm, rate=RATE, channels=1):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm)
+
+
+class Capture:
+    """Stands in for the capture callback and records every chunk."""
+
+    def __init__(self, stop_after=None):
+        self.chunks = []
+        self.stop_after = stop_after
+
+    def __call__(self, in_data, frame_count, time_info, status):
+        self.chunks.append(in_data)
+        if self.stop_after is not None and len(self.chunks) >= self.stop_after:
+            return None, PA_COMPLETE
+        return None, PA_CONTINUE
+
+
+def test_paced_stream_steps_on_its_interval():
+    stream = Steps(0.01, limit=5)
+    assert stream.done.wait(2)
+    gaps = [b - a for a, b in zip(stream.times, stream.times[1:])]
+    assert len(stream.times) == 5 and min(gaps) >= 0.008
+    stream.close()
+
+
+def test_paced_stream_stop_wakes_a_waiting_thread():
+    stream = Steps(10.0)
+    started = time.perf_counter()
+    stream.stop_stream()
+    assert time.perf_counter() - started < 1.0
+    assert not stream._thread.is_alive() and stream.times
+
+
+def test_paced_stream_can_stop_itself():
+    stream = Steps(0.001, limit=3, stop_itself=True)
+    assert stream.done.wait(2)
+    stream._thread.join(1)
+    assert not stream._thread.is_alive() and len(stream.times) == 3
+
+
+def test_wav_input_is_replayed_then_followed_by_trailing_silence(tmp_path):
+    pcm = bytes(range(256)) * 4  # 512 frames: two full chunks and a partial one
+    write_wav(tmp_path / "in.wav", pcm)
+    backend = FileAudioBackend(str(tmp_path / "in.wav"), speed=1000, trailing_silence_ms=30)
+    finished = threading.Event()
+    backend.on_input_finished = finished.set
+    capture = Capture()
+
+    stream = backend.open_input(RATE, 1, FRAMES, capture)
+    assert finished.wait(2)
+    stream.close()
+
+    chunk = FRAMES * 2
+    assert all(len(data) == chunk for data in capture.chunks)
+    # The partial last chunk is padded with silence, then 30 ms of silence (3 chunks) follows
+    assert b"".join(capture.chunks[:3]) == pcm + bytes(3 * chunk - len(pcm))
+    assert capture.chunks[3:] == [bytes(chunk)] * 3
+
+
+def test_raw_input_stops_when_the_callback_completes(tmp_path):
+    (tmp_path / "in.pcm").write_bytes(bytes(FRAMES * 2 * 10))
+    backend = FileAudioBackend(str(tmp_path / "in.pcm"), speed=1000)
+    finished = threading.Event()
+    backend.on_input_finished = finished.set
+    capture = Capture(stop_after=2)
+
+    stream = backend.open_input(RATE, 1, FRAMES, capture)
+    stream._thread.join(2)
+    stream.close()
+    assert len(capture.chunks) == 2 and not finished.is_set()
+
+
+def test_wav_input_in_another_format_is_rejected(tmp_path):
+    write_wav(tmp_path / "in.wav", bytes(FRAMES * 2), rate=16000)
+    backend = FileAudioBackend(str(tmp_path / "in.wav"))
+    with pytest.raises(ValueError, match="expected 24000 Hz"):
+        backend.open_input(RATE, 1, FRAMES, Capture())
+
+
+def test_speed_must_be_positive():
+    with pytest.raises(ValueError):
+        FileAudioBackend("in.wav", speed=0)
+
+
+def test_playback_is_written_to_a_wav_file(tmp_path):
+    backend = FileAudioBackend("unused.wav", str(tmp_path / "out.wav"), speed=1000)
+    chunk = bytes([1, 0]) * FRAMES
+    pulled = []
+
+    def playback(in_data, frame_count, time_info, status):
+        pulled.append(frame_count)
+        return chunk, PA_COMPLETE if len(pulled) == 4 else PA_CONTINUE
+
+    stream = backend.open_output(RATE, 1, FRAMES, playback)
+    stream._thread.join(2)
+    stream.close()
+    backend.terminate()
+
+    assert pulled == [FRAMES] * 4
+    with wave.open(str(tmp_path / "out.wav"), "rb") as wav:
+        assert (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (RATE, 1, 2)
+        assert wav.readframes(wav.getnframes()) == chunk * 4
+
+
+def test_playback_without_an_output_file_still_runs_on_the_clock():
+    backend = FileAudioBackend("unused.wav", speed=1000)
+    pulled = []
+
+    def playback(in_data, frame_count, time_info, status):
+        pulled.append(frame_count)
+        return bytes(frame_count * 2), PA_COMPLETE if len(pulled) == 3 else PA_CONTINUE
+
+    stream = backend.open_output(RATE, 1, FRAMES, playback)
+    stream._thread.join(2)
+    stream.close()
+    backend.terminate()
+    assert pulled == [FRAMES] * 3
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from voice_console.voice_console import PCMRingBuffer
+
+
+def read_all(ring, n=None):
+    out = bytearray(ring.capacity)
+    count = ring.read_into(memoryview(out), ring.capacity if n is None else n)
+    return bytes(out[:count])
+
+
+def test_capacity_is_whole_samples():
+    assert PCMRingBuffer(11).capacity == 10
+    assert PCMRingBuffer(1).capacity == 2
+
+
+def test_reads_wrap_around_the_end():
+    ring = PCMRingBuffer(8)
+    ring.write(b"abcdef")
+    assert read_all(ring, 4) == b"abcd"
+    assert ring.write(b"ghijkl") == 6  # wraps past the end of the buffer
+    assert ring.available == 8
+    assert read_all(ring) == b"efghijkl"
+    assert ring.available == 0 and read_all(ring) == b""
+
+
+def test_overrun_keeps_whole_samples_and_counts_the_rest():
+    ring = PCMRingBuffer(8)
+    ring.write(b"abc")
+    assert ring.write(b"0123456") == 4  # 5 bytes free, rounded down to whole samples
+    assert (ring.overruns, ring.dropped_bytes) == (1, 3)
+    assert read_all(ring) == b"abc0123"
+
+
+def test_flush_discards_buffered_audio():
+    ring = PCMRingBuffer(8)
+    ring.write(b"abcd")
+    ring.flush()
+    assert ring.available == 0 and ring.flushes == 1
+    # The flushed space is free again for the next response
+    assert ring.write(b"efghijkl") == 8
+    assert read_all(ring) == b"efghijkl"
+
+
+def test_producer_and_consumer_threads_keep_order():
+    ring = PCMRingBuffer(256)
+    data = bytes(i % 251 for i in range(20_000))
+    received = bytearray()
+
+    def produce():
+        sent = 0
+        while sent < len(data):
+            chunk = data[sent:sent + 96]
+            written = ring.write(chunk)
+            sent += written
+            if written < len(chunk):
+                time.sleep(0)  # Full: let the consumer run
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    out = memoryview(bytearray(64))
+    while len(received) < len(data):
+        n = ring.read_into(out, len(out))
+        received += out[:n]
+        if n < len(out):
+            time.sleep(0)  # Drained: let the producer run
+    producer.join()
+    assert bytes(received) == data
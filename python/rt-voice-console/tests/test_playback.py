@@ -0,0 +1,72 @@
+from voice_console.voice_console import AudioProcessor
+
+
+class FakeStream:
+    def __init__(self):
+        self.closed = False
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBackend:
+    """Opens fake output streams; keeps the callback for the test to drive."""
+
+    def __init__(self):
+        self.opened = 0
+        self.callback = None
+
+    def open_output(self, rate, channels, frames_per_buffer, callback):
+        self.opened += 1
+        self.callback = callback
+        return FakeStream()
+
+    def terminate(self):
+        pass
+
+
+def playback_processor():
+    return AudioProcessor(None, FakeBackend())
+
+
+def pull(processor, frames=128):
+    """Ask for ``frames`` samples the way the output device would."""
+    data, _ = processor.backend.callback(None, frames, None, 0)
+    return data
+
+
+async def test_barge_in_pauses_flushes_and_resumes_on_one_stream():
+    processor = playback_processor()
+    await processor.start_playback()
+    stream = processor.output_stream
+    speech = b"\x01\x02" * processor.jitter_bytes
+    await processor.queue_audio(speech)
+    assert pull(processor) == speech[:256]
+
+    await processor.pause_playback()
+    assert processor.playback_ring.available == 0 and processor.playback_ring.flushes == 1
+    await processor.queue_audio(b"\x03\x04" * 64)  # late audio from the cancelled response
+    assert processor.playback_ring.available == 0
+    assert pull(processor) == bytes(256)
+    assert processor.underruns == 0
+
+    await processor.resume_playback()
+    reply = b"\x05\x06" * 128
+    await processor.queue_audio(reply)
+    processor.end_of_audio()  # shorter than the jitter target: play it without waiting
+    assert pull(processor) == reply
+    assert processor.output_stream is stream and processor.backend.opened == 1
+
+    await processor.stop_playback()
+    assert stream.closed and processor.output_stream is None
+
+
+async def test_resume_opens_playback_that_never_started():
+    processor = playback_processor()
+    await processor.pause_playback()
+    assert not processor.playback_paused
+    await processor.resume_playback()
+    assert processor.is_playing and processor.backend.opened == 1